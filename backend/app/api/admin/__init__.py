@@ -0,0 +1,3 @@
+from app.api.admin import jobs, export, profiles
+
+__all__ = ["jobs", "export", "profiles"]
@@ -0,0 +1,35 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.core.dependencies import get_admin_user
+from app.models.user import User
+from app.services.analytics.history_export import FILE_EXTENSIONS, MEDIA_TYPES, history_exporter
+
+router = APIRouter()
+
+@router.get("/")
+async def export_history(
+    kind: str = Query("sessions", regex="^(all|sessions|interactions)$"),
+    format: str = Query("ndjson", regex="^(ndjson|csv|arrow)$"),
+    user_id: Optional[int] = None,
+    workers: int = Query(4, ge=1, le=16),
+    include_archived: bool = False,
+    admin: User = Depends(get_admin_user)
+):
+    """Stream one user's history, or every user's when no user_id is given"""
+    try:
+        history_exporter.validate(kind, format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    scope = user_id if user_id is not None else "all"
+    return StreamingResponse(
+        history_exporter.stream(
+            kind, format, user_id=user_id, workers=workers, include_archived=include_archived
+        ),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="history-{scope}-{kind}.{FILE_EXTENSIONS[format]}"'
+        }
+    )
@@ -0,0 +1,35 @@
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import BaseModel
+
+from app.core.dependencies import get_admin_user
+from app.models.user import User
+from app.services.jobs import job_runner
+
+router = APIRouter()
+
+class JobRunRequest(BaseModel):
+    kwargs: Dict[str, Any] = {}
+    idempotency_key: Optional[str] = None
+
+@router.get("/")
+async def get_job_metrics(admin: User = Depends(get_admin_user)):
+    """Registered jobs with their schedules and runtime metrics"""
+    return await job_runner.metrics()
+
+@router.post("/{job_name}/run", status_code=status.HTTP_202_ACCEPTED)
+async def run_job(
+    job_name: str,
+    request: JobRunRequest,
+    admin: User = Depends(get_admin_user)
+):
+    """Enqueue a job run now"""
+    if job_name not in job_runner.registry:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    message_id = await job_runner.enqueue(job_name, request.kwargs, request.idempotency_key)
+    return {
+        "job": job_name,
+        "message_id": message_id,
+        "duplicate": message_id is None
+    }
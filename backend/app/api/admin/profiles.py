@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+
+from app.core.dependencies import get_admin_user
+from app.core.profiling import profile_store
+from app.models.user import User
+
+router = APIRouter()
+
+@router.get("/")
+async def list_profiles(
+    limit: int = Query(100, ge=1, le=1000),
+    admin: User = Depends(get_admin_user)
+):
+    """Stored request profiles, newest first"""
+    return profile_store.list(limit)
+
+@router.get("/{profile_id}")
+async def get_profile(profile_id: str, admin: User = Depends(get_admin_user)):
+    """Summary of one profile with its hottest functions"""
+    summary = profile_store.get(profile_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return summary
+
+@router.get("/{profile_id}/collapsed")
+async def download_collapsed_stacks(profile_id: str, admin: User = Depends(get_admin_user)):
+    """Collapsed stacks for flamegraph.pl, speedscope or inferno"""
+    path = profile_store.file(profile_id, "collapsed")
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    
+    return FileResponse(path, media_type="text/plain", filename=f"profile-{profile_id}.collapsed")
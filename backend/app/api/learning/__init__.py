@@ -1,3 +1,3 @@
-from app.api.learning import sessions, progress, analytics
+from app.api.learning import sessions, progress, analytics, export
 
-__all__ = ["sessions", "progress", "analytics"]
\ No newline at end of file
+__all__ = ["sessions", "progress", "analytics", "export"]
\ No newline at end of file
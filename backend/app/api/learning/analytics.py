@@ -3,20 +3,25 @@ from sqlalchemy.orm import Session
 from typing import Optional
 from datetime import datetime, timedelta
 
-from app.database import get_db
+from app.database import get_read_db
 from app.core.dependencies import get_current_user
+from app.core.serialization import FastJSONResponse
 from app.models.user import User
 from app.schemas.learning import AnalyticsResponse
 from app.services.analytics.learning_insights import LearningInsightsService
+from app.services.analytics.voice_metrics import VoiceMetricsAnalyzer
 
 router = APIRouter()
 insights_service = LearningInsightsService()
+voice_metrics = VoiceMetricsAnalyzer()
+# Aggregations tolerate replica lag; see DATABASE_READ_MAX_STALENESS_SECONDS
+read_db = get_read_db("analytics")
 
 @router.get("/dashboard", response_model=AnalyticsResponse)
 async def get_analytics_dashboard(
     timeframe: str = Query("week", regex="^(week|month|year)$"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(read_db)
 ):
     """Get analytics dashboard data"""
     analytics = await insights_service.generate_dashboard(
@@ -24,12 +29,13 @@ async def get_analytics_dashboard(
         timeframe=timeframe,
         db=db
     )
-    return analytics
+    # Already in AnalyticsResponse shape; skip re-validating the daily stats
+    return FastJSONResponse(analytics)
 
 @router.get("/insights")
 async def get_learning_insights(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(read_db)
 ):
     """Get personalized learning insights"""
     insights = await insights_service.generate_insights(
@@ -43,7 +49,7 @@ async def get_performance_trends(
     metric: str = Query("accuracy", regex="^(accuracy|pronunciation|fluency|time)$"),
     days: int = Query(30, ge=7, le=365),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(read_db)
 ):
     """Get performance trends over time"""
     trends = await insights_service.calculate_trends(
@@ -54,10 +60,26 @@ async def get_performance_trends(
     )
     return {"trends": trends}
 
+@router.get("/voice-trends")
+async def get_voice_trends(
+    days: int = Query(30, ge=1, le=730),
+    include_archived: bool = Query(False, description="Include interactions moved to the archive"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(read_db)
+):
+    """Get daily pronunciation, fluency and confidence trends"""
+    trends = voice_metrics.get_voice_trends(
+        user_id=current_user.id,
+        days=days,
+        db=db,
+        include_archived=include_archived
+    )
+    return {"trends": trends}
+
 @router.get("/recommendations")
 async def get_study_recommendations(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(read_db)
 ):
     """Get personalized study recommendations"""
     recommendations = await insights_service.generate_recommendations(
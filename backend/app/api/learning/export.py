@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.core.dependencies import get_current_user
+from app.models.user import User
+from app.services.analytics.history_export import FILE_EXTENSIONS, MEDIA_TYPES, history_exporter
+
+router = APIRouter()
+
+@router.get("/")
+async def export_learning_history(
+    kind: str = Query("all", regex="^(all|sessions|interactions)$"),
+    format: str = Query("ndjson", regex="^(ndjson|csv|arrow)$"),
+    include_archived: bool = False,
+    current_user: User = Depends(get_current_user)
+):
+    """Stream the current user's sessions and voice interactions"""
+    try:
+        history_exporter.validate(kind, format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Sync generator: Starlette iterates it in a worker thread
+    return StreamingResponse(
+        history_exporter.stream(kind, format, user_id=current_user.id, include_archived=include_archived),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="history-{current_user.id}-{kind}.{FILE_EXTENSIONS[format]}"'
+        }
+    )
@@ -1,40 +1,51 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import SessionLocal, get_db, get_read_db
 from app.core.dependencies import get_current_user
+from app.core.serialization import FastJSONResponse
 from app.models.user import User
 from app.models.progress import Progress, Achievement
 from app.schemas.learning import ProgressResponse, AchievementResponse
 from app.services.analytics.learning_insights import LearningInsightsService
+from app.services.learning.progress_tracker import ProgressTracker
+from app.services.learning.streak_engine import StreakEngine
+from app.services.learning.achievement_engine import AchievementEngine
 
 router = APIRouter()
 insights_service = LearningInsightsService()
+progress_tracker = ProgressTracker()
+streak_engine = StreakEngine()
+achievement_engine = AchievementEngine()
+read_db = get_read_db("progress")
 
 @router.get("/", response_model=ProgressResponse)
 async def get_user_progress(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(read_db)
 ):
     """Get user's overall progress"""
-    progress = db.query(Progress).filter(
-        Progress.user_id == current_user.id
-    ).first()
+    progress = progress_tracker.build_progress_response(db, current_user.id)
     
     if not progress:
-        # Create default progress entry
-        progress = Progress(user_id=current_user.id)
-        db.add(progress)
-        db.commit()
-        db.refresh(progress)
+        # Create default progress entry; db may be a read-only replica session
+        primary = SessionLocal()
+        try:
+            if not primary.query(Progress.id).filter(Progress.user_id == current_user.id).first():
+                primary.add(Progress(user_id=current_user.id))
+                primary.commit()
+            progress = progress_tracker.build_progress_response(primary, current_user.id)
+        finally:
+            primary.close()
     
-    return progress
+    # build_progress_response fills every ProgressResponse field with its type
+    return FastJSONResponse(progress)
 
 @router.get("/achievements", response_model=List[AchievementResponse])
 async def get_user_achievements(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(read_db)
 ):
     """Get user's achievements"""
     achievements = db.query(Achievement).filter(
@@ -48,39 +59,10 @@ async def update_study_streak(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Update user's study streak"""
-    progress = db.query(Progress).filter(
-        Progress.user_id == current_user.id
-    ).first()
-    
-    if not progress:
-        raise HTTPException(status_code=404, detail="Progress not found")
-    
-    # Update streak logic
-    from datetime import datetime, timedelta
-    today = datetime.utcnow().date()
-    
-    if progress.last_study_date:
-        last_study = progress.last_study_date.date()
-        days_diff = (today - last_study).days
-        
-        if days_diff == 1:
-            # Continue streak
-            progress.current_streak += 1
-            if progress.current_streak > progress.longest_streak:
-                progress.longest_streak = progress.current_streak
-        elif days_diff > 1:
-            # Break streak
-            progress.current_streak = 1
-    else:
-        # First study session
-        progress.current_streak = 1
-        progress.longest_streak = 1
-    
-    progress.last_study_date = datetime.utcnow()
+    """Check in study for today and return the user's streak"""
+    streak_engine.check_in(db, current_user.id)
+    streak = streak_engine.get_streak(db, current_user.id)
+    achievement_engine.on_streak(db, current_user.id, streak["current_streak"])
     db.commit()
     
-    return {
-        "current_streak": progress.current_streak,
-        "longest_streak": progress.longest_streak
-    }
\ No newline at end of file
+    return streak
\ No newline at end of file
@@ -1,37 +1,100 @@
 from fastapi import APIRouter, Depends, Query, HTTPException
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timedelta
+import uuid
 
-from app.database import get_db
-from app.core.dependencies import get_current_user
+from app.database import get_db, get_read_db
+from app.core.dependencies import get_current_user, PaginationParams
+from app.core.serialization import FastJSONResponse
 from app.models.user import User
 from app.models.learning_session import LearningSession
+from app.models.voice_interaction import VoiceInteraction
 from app.schemas.learning import LearningSessionResponse
+from app.services.analytics.interaction_archive import interaction_archive, record_key
+from app.services.analytics.voice_metrics import VoiceMetricsAnalyzer
 
 router = APIRouter()
+voice_metrics = VoiceMetricsAnalyzer()
+read_db = get_read_db("sessions")
+
+# Columns needed to build LearningSessionResponse; config and other large
+# columns are never loaded for listings
+SESSION_LIST_FIELDS = list(LearningSessionResponse.model_fields)
 
 @router.get("/", response_model=List[LearningSessionResponse])
 async def get_user_sessions(
-    limit: int = Query(10, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    pagination: PaginationParams = Depends(),
     session_type: Optional[str] = None,
+    fields: Optional[str] = Query(
+        None, description="Comma-separated subset of session fields to return"
+    ),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(read_db)
 ):
-    """Get user's learning sessions"""
-    query = db.query(LearningSession).filter(
+    """Get user's learning sessions, newest first
+    
+    Pages are keyed on (started_at, id); pass the ``X-Next-Cursor`` header of
+    a response as ``cursor`` to fetch the following page.
+    """
+    selected = SESSION_LIST_FIELDS
+    if fields:
+        selected = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = set(selected) - set(SESSION_LIST_FIELDS)
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+            )
+    
+    # The sort key is always loaded so the next cursor can be built
+    columns = {name: getattr(LearningSession, name) for name in selected}
+    columns.setdefault("started_at", LearningSession.started_at)
+    columns.setdefault("id", LearningSession.id)
+    
+    query = db.query(*[column.label(name) for name, column in columns.items()]).filter(
         LearningSession.user_id == current_user.id
     )
     
     if session_type:
         query = query.filter(LearningSession.type == session_type)
     
-    sessions = query.order_by(
-        LearningSession.started_at.desc()
-    ).offset(offset).limit(limit).all()
+    cursor = pagination.decode_cursor()
+    if cursor:
+        try:
+            last_started_at, last_id = datetime.fromisoformat(cursor[0]), str(uuid.UUID(cursor[1]))
+        except (ValueError, TypeError, AttributeError, IndexError):
+            raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+        query = query.filter(or_(
+            LearningSession.started_at < last_started_at,
+            and_(
+                LearningSession.started_at == last_started_at,
+                LearningSession.id < last_id
+            )
+        ))
+    
+    query = query.order_by(
+        LearningSession.started_at.desc(),
+        LearningSession.id.desc()
+    )
+    if not cursor and pagination.skip:
+        query = query.offset(pagination.skip)
+    
+    rows = query.limit(pagination.limit).all()
+    
+    headers = {}
+    if len(rows) == pagination.limit:
+        headers["X-Next-Cursor"] = PaginationParams.encode_cursor(
+            rows[-1].started_at, rows[-1].id
+        )
     
-    return sessions
+    # Rows hold exactly the selected model columns, typed by the database, so
+    # they are rendered directly instead of being validated one by one
+    return FastJSONResponse(
+        [{name: getattr(row, name) for name in selected} for row in rows],
+        headers=headers
+    )
 
 @router.get("/{session_id}", response_model=LearningSessionResponse)
 async def get_session_details(
@@ -50,11 +113,64 @@ async def get_session_details(
     
     return session
 
+@router.get("/{session_id}/interactions")
+async def get_session_interactions(
+    session_id: str,
+    include_archived: bool = Query(False, description="Also return interactions moved to the archive"),
+    limit: int = Query(500, ge=1, le=5000),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get the interactions of a session, oldest first"""
+    owned = db.query(LearningSession.id).filter(
+        LearningSession.id == session_id,
+        LearningSession.user_id == current_user.id
+    ).first()
+    
+    if not owned:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    interactions = []
+    if include_archived:
+        interactions = interaction_archive.read(current_user.id, session_id=owned.id)
+    
+    rows = db.query(VoiceInteraction).filter(
+        VoiceInteraction.session_id == owned.id,
+        VoiceInteraction.user_id == current_user.id
+    ).order_by(VoiceInteraction.timestamp, VoiceInteraction.id).limit(limit).all()
+    archived = {record_key(record) for record in interactions}
+    for row in rows:
+        record = interaction_archive.to_record(row)
+        if record_key(record) not in archived:
+            interactions.append(record)
+    
+    return FastJSONResponse({"interactions": interactions[:limit]})
+
+@router.get("/{session_id}/voice-metrics")
+async def get_session_voice_metrics(
+    session_id: str,
+    include_archived: bool = Query(False, description="Include interactions moved to the archive"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get speaking metrics for a session"""
+    owned = db.query(LearningSession.id).filter(
+        LearningSession.id == session_id,
+        LearningSession.user_id == current_user.id
+    ).first()
+    
+    if not owned:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    return voice_metrics.calculate_speaking_metrics(
+        current_user.id, owned.id, db, include_archived=include_archived
+    )
+
 @router.get("/recent/summary")
 async def get_recent_sessions_summary(
     days: int = Query(7, ge=1, le=30),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(read_db)
 ):
     """Get summary of recent sessions"""
     since_date = datetime.utcnow() - timedelta(days=days)
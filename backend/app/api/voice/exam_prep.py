@@ -6,10 +6,9 @@ from app.database import get_db
 from app.core.dependencies import get_current_user
 from app.models.user import User
 from app.schemas.voice import VoiceSessionCreate, VoiceSessionResponse
-from app.services.omnidim.voice_session import VoiceSessionManager
+from app.services.container import services
 
 router = APIRouter()
-session_manager = VoiceSessionManager()
 
 @router.post("/start", response_model=VoiceSessionResponse)
 async def start_exam_prep_session(
@@ -21,7 +20,7 @@ async def start_exam_prep_session(
 ):
     """Start an exam preparation session"""
     try:
-        session = await session_manager.create_exam_prep_session(
+        session = await services.session_manager.create_exam_prep_session(
             user_id=current_user.id,
             exam_type=exam_type,
             topics=topics,
@@ -6,10 +6,9 @@ from app.database import get_db
 from app.core.dependencies import get_current_user
 from app.models.user import User
 from app.schemas.voice import VoiceSessionCreate, VoiceSessionResponse
-from app.services.omnidim.voice_session import VoiceSessionManager
+from app.services.container import services
 
 router = APIRouter()
-session_manager = VoiceSessionManager()
 
 @router.post("/start", response_model=VoiceSessionResponse)
 async def start_language_practice(
@@ -21,7 +20,7 @@ async def start_language_practice(
 ):
     """Start a language practice session"""
     try:
-        session = await session_manager.create_language_practice_session(
+        session = await services.session_manager.create_language_practice_session(
             user_id=current_user.id,
             target_language=target_language,
             native_language=current_user.preferred_language,
@@ -5,10 +5,9 @@ from app.database import get_db
 from app.core.dependencies import get_current_user
 from app.models.user import User
 from app.schemas.voice import PronunciationAnalysis
-from app.services.omnidim.speech_analysis import SpeechAnalyzer
+from app.services.container import services
 
 router = APIRouter()
-speech_analyzer = SpeechAnalyzer()
 
 @router.post("/analyze", response_model=PronunciationAnalysis)
 async def analyze_pronunciation(
@@ -22,7 +21,7 @@ async def analyze_pronunciation(
     try:
         audio_data = await audio_file.read()
         
-        analysis = await speech_analyzer.analyze_pronunciation(
+        analysis = await services.speech_analyzer.analyze_pronunciation(
             audio_data=audio_data,
             target_text=target_text,
             language=language,
@@ -41,7 +40,7 @@ async def practice_word_pronunciation(
 ):
     """Get pronunciation guide for a specific word"""
     try:
-        guide = await speech_analyzer.get_pronunciation_guide(word, language)
+        guide = await services.speech_analyzer.get_pronunciation_guide(word, language)
         return guide
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -53,7 +52,7 @@ async def get_common_pronunciation_mistakes(
     current_user: User = Depends(get_current_user)
 ):
     """Get common pronunciation mistakes for language learners"""
-    mistakes = await speech_analyzer.get_common_mistakes(
+    mistakes = await services.speech_analyzer.get_common_mistakes(
         target_language=language,
         native_language=native_language or current_user.preferred_language
     )
@@ -6,7 +6,7 @@ from app.database import get_db
 from app.core.dependencies import get_current_user
 from app.models.user import User
 from app.schemas.voice import VoiceSessionCreate, VoiceSessionResponse
-from app.services.omnidim.voice_session import VoiceSessionManager
+from app.services.container import services
 
 router = APIRouter()
 
@@ -18,10 +18,8 @@ async def start_tutor_session(
 ):
     """Start an AI tutor voice session"""
     try:
-        session_manager = VoiceSessionManager()
-        
         # Create session with proper parameters
-        session = await session_manager.create_tutor_session(
+        session = await services.session_manager.create_tutor_session(
             user_id=current_user.id,
             subject=session_data.subject,
             difficulty=session_data.difficulty,
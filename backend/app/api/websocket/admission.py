@@ -0,0 +1,186 @@
+from typing import Awaitable, Callable, Deque, Dict, Optional
+from collections import deque
+import asyncio
+import logging
+import os
+import time
+
+from app.config import settings
+from app.core.loop_monitor import loop_monitor
+from app.core.metrics import (
+    VOICE_STREAM_QUEUE_WAIT,
+    VOICE_STREAMS_ADMITTED,
+    VOICE_STREAMS_QUEUED,
+    VOICE_STREAMS_REJECTED,
+)
+
+logger = logging.getLogger(__name__)
+
+# Close code asking the client to try again later (RFC 6455 "Try Again Later")
+CLOSE_TRY_AGAIN_LATER = 1013
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+def resident_memory() -> Optional[int]:
+    """Bytes of RAM the process uses now, or None where /proc isn't available"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+class StreamRejected(Exception):
+    """A new voice stream was turned away; the client may retry after ``retry_after`` seconds"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Voice stream rejected: {reason}")
+        self.reason = reason
+        self.retry_after = retry_after
+
+class AdmissionController:
+    """Decides whether this worker takes on another upstream voice stream
+
+    A stream needs a free slot under ``max_streams`` and its user below
+    ``max_per_user``, and the worker must be healthy: smoothed event loop
+    lag under ``max_loop_lag`` and resident memory under ``max_memory``.
+    Otherwise the connection waits in a FIFO queue, told its position as it
+    moves, until it can be admitted or ``max_wait`` passes. Users over
+    their own limit and arrivals to a full queue are rejected at once.
+    """
+
+    # How often queued connections look at the loop and memory signals again
+    RECHECK_INTERVAL = 0.5
+
+    def __init__(
+        self,
+        max_streams: int,
+        max_per_user: int,
+        queue_size: int,
+        max_wait: float,
+        max_loop_lag: float = 0.0,
+        max_memory: int = 0,
+        retry_after: int = 10,
+        lag: Callable[[], float] = lambda: loop_monitor.lag,
+        memory: Callable[[], Optional[int]] = resident_memory
+    ):
+        self.max_streams = max_streams
+        self.max_per_user = max_per_user
+        self.queue_size = queue_size
+        self.max_wait = max_wait
+        self.max_loop_lag = max_loop_lag
+        self.max_memory = max_memory
+        self.retry_after = retry_after
+        self._lag = lag
+        self._memory = memory
+        self.admitted = 0
+        # Admitted and queued streams per user
+        self._per_user: Dict[int, int] = {}
+        self._queue: Deque[asyncio.Event] = deque()
+
+    def pressure(self) -> Optional[str]:
+        """Why a new stream can't start now, or None"""
+        if self.admitted >= self.max_streams:
+            return "capacity"
+        if self.max_loop_lag and self._lag() > self.max_loop_lag:
+            return "loop_lag"
+        if self.max_memory:
+            memory = self._memory()
+            if memory is not None and memory > self.max_memory:
+                return "memory"
+        return None
+
+    async def acquire(self, user_id: int, on_queued: Optional[Callable[[int], Awaitable[None]]] = None):
+        """Take a stream slot for the user, waiting in the queue if needed
+
+        ``on_queued`` is called with the 1-based queue position whenever it
+        changes. Raises StreamRejected; the caller must ``release`` the
+        user's slot once the stream ends.
+        """
+        if self._per_user.get(user_id, 0) >= self.max_per_user:
+            self._reject("user_limit")
+        reason = self.pressure()
+        if reason is None and not self._queue:
+            self._admit(user_id)
+            return
+        if len(self._queue) >= self.queue_size:
+            self._reject(reason or "capacity")
+
+        turn = asyncio.Event()
+        self._queue.append(turn)
+        self._per_user[user_id] = self._per_user.get(user_id, 0) + 1
+        VOICE_STREAMS_QUEUED.inc()
+        started = time.monotonic()
+        deadline = started + self.max_wait
+        outcome = "timeout"
+        position = 0
+        try:
+            while True:
+                if self._queue[0] is turn:
+                    reason = self.pressure()
+                    if reason is None:
+                        outcome = "admitted"
+                        break
+                index = self._queue.index(turn) + 1
+                if index != position and on_queued is not None:
+                    await on_queued(index)
+                position = index
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                turn.clear()
+                try:
+                    await asyncio.wait_for(turn.wait(), min(remaining, self.RECHECK_INTERVAL))
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            outcome = "abandoned"
+            raise
+        finally:
+            self._queue.remove(turn)
+            self._per_user[user_id] -= 1
+            VOICE_STREAMS_QUEUED.dec()
+            VOICE_STREAM_QUEUE_WAIT.labels(outcome).observe(time.monotonic() - started)
+            self._wake()
+
+        if outcome != "admitted":
+            self._reject(reason or "capacity")
+        self._admit(user_id)
+
+    def release(self, user_id: int):
+        """Give back a slot taken by ``acquire``"""
+        self.admitted -= 1
+        VOICE_STREAMS_ADMITTED.dec()
+        remaining = self._per_user.get(user_id, 0) - 1
+        if remaining > 0:
+            self._per_user[user_id] = remaining
+        else:
+            self._per_user.pop(user_id, None)
+        self._wake()
+
+    def _admit(self, user_id: int):
+        self.admitted += 1
+        VOICE_STREAMS_ADMITTED.inc()
+        self._per_user[user_id] = self._per_user.get(user_id, 0) + 1
+
+    def _reject(self, reason: str):
+        VOICE_STREAMS_REJECTED.labels(reason).inc()
+        logger.info(f"Rejected voice stream: {reason}")
+        raise StreamRejected(reason, self.retry_after)
+
+    def _wake(self):
+        # Queued connections re-check their position and the worker's health
+        for turn in self._queue:
+            turn.set()
+
+admission = AdmissionController(
+    max_streams=settings.WS_MAX_STREAMS,
+    max_per_user=settings.WS_MAX_STREAMS_PER_USER,
+    queue_size=settings.WS_ADMISSION_QUEUE_SIZE,
+    max_wait=settings.WS_ADMISSION_MAX_WAIT_SECONDS,
+    max_loop_lag=settings.WS_ADMISSION_MAX_LOOP_LAG_MS / 1000,
+    max_memory=settings.WS_ADMISSION_MAX_RSS_MB * 1024 * 1024,
+    retry_after=settings.WS_ADMISSION_RETRY_AFTER_SECONDS
+)
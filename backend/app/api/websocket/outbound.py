@@ -0,0 +1,192 @@
+from typing import Any, Deque, Dict, Optional, Tuple
+from collections import deque
+import asyncio
+import logging
+import time
+
+from fastapi import WebSocket
+
+from app.api.websocket.protocol import WireProtocol
+from app.core.metrics import (
+    WEBSOCKET_BYTES_SENT,
+    WEBSOCKET_EVENTS_COALESCED,
+    WEBSOCKET_EVENTS_DROPPED,
+    WEBSOCKET_FRAMES_SENT,
+    WEBSOCKET_SEND_LATENCY,
+)
+
+logger = logging.getLogger(__name__)
+
+# Priority classes, highest first
+AUDIO = "audio"
+INTERACTIVE = "interactive"
+TELEMETRY = "telemetry"
+PRIORITY_CLASSES = (AUDIO, INTERACTIVE, TELEMETRY)
+
+# State updates where only the latest value matters to the client
+TELEMETRY_TYPES = frozenset({"emotion", "metrics"})
+
+def classify(event: Dict[str, Any]) -> str:
+    event_type = event.get("type")
+    if event_type == "audio":
+        return AUDIO
+    if event_type in TELEMETRY_TYPES:
+        return TELEMETRY
+    return INTERACTIVE
+
+class OutboundScheduler:
+    """Orders the outbound events of one voice stream connection by priority
+
+    A single writer task sends audio first, then interactive events
+    (transcripts, pronunciation feedback, status), then telemetry, so a
+    burst of analytics never delays speech. Audio and interactive queues
+    are bounded and apply backpressure to the producer once full.
+
+    Telemetry is never waited on. With a coalescing protocol the latest
+    update of each type is kept and sent once per interval in a single
+    ``batch`` frame; otherwise updates queue up to a bound, dropping the
+    oldest. Either way, updates older than ``max_telemetry_age`` are
+    discarded instead of sent.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        protocol: WireProtocol,
+        interval: float,
+        audio_queue_size: int = 256,
+        interactive_queue_size: int = 128,
+        telemetry_queue_size: int = 32,
+        max_telemetry_age: float = 1.0
+    ):
+        self.websocket = websocket
+        self.protocol = protocol
+        self.interval = interval
+        self.max_telemetry_age = max_telemetry_age
+        # Entries are (enqueued at, event)
+        self._queues: Dict[str, asyncio.Queue] = {
+            AUDIO: asyncio.Queue(audio_queue_size),
+            INTERACTIVE: asyncio.Queue(interactive_queue_size),
+        }
+        self._telemetry: Deque[Tuple[float, Dict[str, Any]]] = deque(maxlen=telemetry_queue_size)
+        self._latest: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._next_batch_at = 0.0
+        self._wakeup = asyncio.Event()
+        self._send_lock = asyncio.Lock()
+        self._writer: Optional[asyncio.Task] = None
+        self.closed = False
+        self._latency = {cls: WEBSOCKET_SEND_LATENCY.labels(cls) for cls in PRIORITY_CLASSES}
+        self._frames = WEBSOCKET_FRAMES_SENT.labels(protocol.label)
+        self._bytes = WEBSOCKET_BYTES_SENT.labels(protocol.label)
+
+    def start(self):
+        self._writer = asyncio.create_task(self._write())
+
+    async def close(self):
+        """Stop sending; whatever is still queued is discarded"""
+        self.closed = True
+        if self._writer is not None:
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+            self._writer = None
+        self._discard()
+
+    async def send(self, event: Dict[str, Any]):
+        """Queue an event; waits only while its audio or interactive queue is full"""
+        if self.closed:
+            return
+        cls = classify(event)
+        now = time.monotonic()
+        if cls != TELEMETRY:
+            await self._queues[cls].put((now, event))
+        elif self.protocol.coalesce:
+            if event["type"] in self._latest:
+                WEBSOCKET_EVENTS_COALESCED.inc()
+            self._latest[event["type"]] = (now, event)
+        else:
+            if len(self._telemetry) == self._telemetry.maxlen:
+                WEBSOCKET_EVENTS_DROPPED.labels(TELEMETRY, "overflow").inc()
+            self._telemetry.append((now, event))
+        self._wakeup.set()
+
+    async def drain(self):
+        """Send everything queued now, held telemetry included, in priority order"""
+        self._next_batch_at = 0.0
+        while True:
+            item = self._next(time.monotonic())
+            if item is None:
+                return
+            await self._send(*item)
+
+    def _next(self, now: float):
+        """(class, enqueued at, ASGI message) to send next, or None"""
+        for cls in (AUDIO, INTERACTIVE):
+            queue = self._queues[cls]
+            if not queue.empty():
+                enqueued_at, event = queue.get_nowait()
+                return cls, enqueued_at, self.protocol.encode(event)
+
+        cutoff = now - self.max_telemetry_age
+        if self._latest and now >= self._next_batch_at:
+            self._next_batch_at = now + self.interval
+            fresh = [(at, event) for at, event in self._latest.values() if at >= cutoff]
+            self._drop_stale(len(self._latest) - len(fresh))
+            self._latest.clear()
+            if fresh:
+                oldest = min(at for at, _ in fresh)
+                return TELEMETRY, oldest, self.protocol.encode_batch([event for _, event in fresh])
+
+        while self._telemetry:
+            enqueued_at, event = self._telemetry.popleft()
+            if enqueued_at >= cutoff:
+                return TELEMETRY, enqueued_at, self.protocol.encode(event)
+            self._drop_stale(1)
+        return None
+
+    def _drop_stale(self, count: int):
+        if count:
+            WEBSOCKET_EVENTS_DROPPED.labels(TELEMETRY, "stale").inc(count)
+
+    async def _write(self):
+        try:
+            while True:
+                item = self._next(time.monotonic())
+                if item is not None:
+                    await self._send(*item)
+                    continue
+                self._wakeup.clear()
+                timeout = None
+                if self._latest:
+                    timeout = max(self._next_batch_at - time.monotonic(), 0)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # The client is gone; stop accepting events and release waiting producers
+            logger.info(f"Voice stream writer stopped: {e}")
+            self.closed = True
+            self._discard()
+
+    async def _send(self, cls: str, enqueued_at: float, message: Dict[str, Any]):
+        async with self._send_lock:
+            await self.websocket.send(message)
+        self._latency[cls].observe(time.monotonic() - enqueued_at)
+        payload = message.get("bytes")
+        if payload is None:
+            # Characters, the same as bytes for ASCII JSON
+            payload = message["text"]
+        self._frames.inc()
+        self._bytes.inc(len(payload))
+
+    def _discard(self):
+        for queue in self._queues.values():
+            while not queue.empty():
+                queue.get_nowait()
+        self._telemetry.clear()
+        self._latest.clear()
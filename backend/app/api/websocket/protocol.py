@@ -0,0 +1,98 @@
+from typing import Any, Dict, List, Optional, Sequence
+from abc import ABC, abstractmethod
+import logging
+
+from app.core.serialization import dumps, loads
+
+try:
+    import msgpack
+except ImportError:  # optional; clients then negotiate JSON
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+SUBPROTOCOL_MSGPACK = "zenith.msgpack.v1"
+SUBPROTOCOL_JSON = "zenith.json.v1"
+
+class WireProtocol(ABC):
+    """How events are framed on the voice stream WebSocket
+
+    ``name`` is the negotiated ``Sec-WebSocket-Protocol``; None is the
+    original stream for clients that offer none. Protocols with
+    ``coalesce`` set accept ``batch`` frames of low-priority events;
+    ``sequenced`` ones get ``seq`` numbers and can resume a dropped stream.
+    """
+
+    name: Optional[str] = None
+    label = "json-legacy"
+    coalesce = False
+    sequenced = False
+
+    @abstractmethod
+    def encode(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """ASGI ``websocket.send`` message for one event"""
+
+    def encode_batch(self, events: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return self.encode({"type": "batch", "events": events})
+
+    @abstractmethod
+    def decode(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Event from an ASGI ``websocket.receive`` message"""
+
+class JSONProtocol(WireProtocol):
+    """JSON text frames; audio travels as raw binary frames"""
+
+    def __init__(self, name: Optional[str] = None, coalesce: bool = False):
+        self.name = name
+        self.coalesce = coalesce
+        self.sequenced = name is not None
+        self.label = "json" if name else "json-legacy"
+
+    def encode(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        if event.get("type") == "audio":
+            return {"type": "websocket.send", "bytes": event["data"]}
+        return {"type": "websocket.send", "text": dumps(event).decode("utf-8")}
+
+    def decode(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        if message.get("bytes") is not None:
+            return {"type": "audio", "data": message["bytes"]}
+        return loads(message["text"])
+
+class MessagePackProtocol(WireProtocol):
+    """Every event, audio included, is one MessagePack map in a binary frame
+
+    Audio keeps its bytes as a MessagePack ``bin`` under ``data``. Text
+    frames from the client are still read as JSON.
+    """
+
+    name = SUBPROTOCOL_MSGPACK
+    label = "msgpack"
+    coalesce = True
+    sequenced = True
+
+    def encode(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        return {"type": "websocket.send", "bytes": msgpack.packb(event, default=str)}
+
+    def decode(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        if message.get("bytes") is not None:
+            return msgpack.unpackb(message["bytes"])
+        return loads(message["text"])
+
+LEGACY = JSONProtocol()
+
+def supported_protocols() -> List[WireProtocol]:
+    """Protocols in server preference order"""
+    protocols: List[WireProtocol] = []
+    if msgpack is not None:
+        protocols.append(MessagePackProtocol())
+    protocols.append(JSONProtocol(SUBPROTOCOL_JSON, coalesce=True))
+    return protocols
+
+def negotiate(offered: Sequence[str]) -> WireProtocol:
+    """Best protocol the client offered, or the legacy JSON stream"""
+    for protocol in supported_protocols():
+        if protocol.name in offered:
+            return protocol
+    if offered:
+        logger.info(f"No supported WebSocket subprotocol in {list(offered)}, using legacy JSON")
+    return LEGACY
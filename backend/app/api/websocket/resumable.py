@@ -0,0 +1,165 @@
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+from collections import deque
+import asyncio
+import logging
+import secrets
+
+from fastapi import WebSocket
+
+from app.api.websocket.outbound import TELEMETRY, OutboundScheduler, classify
+from app.core.metrics import WEBSOCKET_EVENTS_REPLAYED, WEBSOCKET_STREAMS_LINGERING
+
+logger = logging.getLogger(__name__)
+
+# Close code for a resume that can't be honoured; the client starts over
+CLOSE_RESUME_FAILED = 4410
+# Close code for a connection replaced by a newer one for the same session
+CLOSE_SUPERSEDED = 4000
+
+class ResumableStream:
+    """The upstream voice stream of one session, outliving its client connections
+
+    Audio and interactive events get the next ``seq`` and are kept in a
+    bounded replay buffer. While the client is away events only go to the
+    buffer; a reconnect presenting ``resume_token`` and the last ``seq`` it
+    saw gets the missed ones replayed before any live event. Audio may
+    overtake interactive events on the wire, so clients resume from the
+    highest ``seq`` received without a gap before it and drop duplicates.
+    Telemetry has no sequence number and is never replayed, only its latest
+    value matters. Clients on the legacy JSON stream get events without
+    ``seq`` and can't resume.
+    """
+
+    def __init__(self, session_id: str, user_id: int, replay_size: int = 512):
+        self.session_id = session_id
+        self.user_id = user_id
+        self.resume_token = secrets.token_urlsafe(16)
+        self.seq = 0
+        self._replay: Deque[Dict[str, Any]] = deque(maxlen=replay_size)
+        self.websocket: Optional[WebSocket] = None
+        self.outbound: Optional[OutboundScheduler] = None
+        self.upstream: Optional[asyncio.Task] = None
+        # Pending end of the session while no client is attached
+        self.expiry: Optional[asyncio.Task] = None
+        # Connections in the middle of ``attach``
+        self.attaching = 0
+
+    @property
+    def alive(self) -> bool:
+        return self.upstream is not None and not self.upstream.done()
+
+    def accepts(self, user_id: int, resume_token: str) -> bool:
+        return user_id == self.user_id and secrets.compare_digest(self.resume_token, resume_token)
+
+    async def emit(self, event: Dict[str, Any]):
+        """Number and buffer an event, then send it to the attached client if any"""
+        unsequenced = event
+        if classify(event) != TELEMETRY:
+            self.seq += 1
+            event = {**event, "seq": self.seq}
+            self._replay.append(event)
+        outbound = self.outbound
+        if outbound is not None:
+            await outbound.send(event if outbound.protocol.sequenced else unsequenced)
+
+    async def attach(
+        self,
+        websocket: WebSocket,
+        outbound: OutboundScheduler,
+        last_seq: Optional[int] = None
+    ) -> int:
+        """Make this connection the stream's client, replaying events after ``last_seq``
+
+        Sequenced clients first get a ``session`` event with the resume
+        token and ``missed``, the number of events after ``last_seq`` that
+        had already left the replay buffer. Without ``last_seq`` the client
+        only gets events from now on.
+        """
+        self.cancel_expiry()
+        self.attaching += 1
+        try:
+            return await self._attach(websocket, outbound, last_seq)
+        finally:
+            self.attaching -= 1
+
+    async def _attach(
+        self,
+        websocket: WebSocket,
+        outbound: OutboundScheduler,
+        last_seq: Optional[int]
+    ) -> int:
+        await self._supersede()
+        if not outbound.protocol.sequenced:
+            self.websocket = websocket
+            self.outbound = outbound
+            return 0
+
+        missed = 0
+        if last_seq is not None:
+            next_seq = last_seq + 1
+            if self._replay and self._replay[0]["seq"] > next_seq:
+                missed = self._replay[0]["seq"] - next_seq
+            elif not self._replay:
+                missed = max(self.seq - last_seq, 0)
+        await outbound.send({
+            "type": "session",
+            "resume_token": self.resume_token,
+            "resumed": last_seq is not None,
+            "missed": missed,
+        })
+        # On the wire before any replayed audio can overtake it
+        await outbound.drain()
+        if last_seq is not None:
+            # Events emitted while replaying are picked up by the next pass
+            while True:
+                pending = [event for event in self._replay if event["seq"] >= next_seq]
+                if not pending:
+                    break
+                for event in pending:
+                    await outbound.send(event)
+                next_seq = pending[-1]["seq"] + 1
+                WEBSOCKET_EVENTS_REPLAYED.inc(len(pending))
+        self.websocket = websocket
+        self.outbound = outbound
+        return missed
+
+    def detach(self, websocket: WebSocket) -> bool:
+        """Forget the client; False when a newer connection had already replaced it"""
+        if self.websocket is not websocket:
+            return False
+        self.websocket = None
+        self.outbound = None
+        return True
+
+    def linger(self, grace: float, on_expired: Callable[[], Awaitable[None]]):
+        """Keep buffering without a client for ``grace`` seconds, then call ``on_expired``"""
+        async def expire():
+            await asyncio.sleep(grace)
+            self.expiry = None
+            WEBSOCKET_STREAMS_LINGERING.dec()
+            await on_expired()
+
+        self.expiry = asyncio.create_task(expire())
+        WEBSOCKET_STREAMS_LINGERING.inc()
+
+    def cancel_expiry(self) -> bool:
+        """Stop waiting for a client; False when the stream wasn't waiting"""
+        if self.expiry is None:
+            return False
+        self.expiry.cancel()
+        self.expiry = None
+        WEBSOCKET_STREAMS_LINGERING.dec()
+        return True
+
+    async def _supersede(self):
+        websocket, outbound = self.websocket, self.outbound
+        if websocket is None:
+            return
+        self.websocket = None
+        self.outbound = None
+        await outbound.close()
+        try:
+            await websocket.close(code=CLOSE_SUPERSEDED, reason="Superseded by a newer connection")
+        except Exception as e:
+            # A half-open connection is the usual reason for the reconnect
+            logger.debug(f"Could not close replaced connection for session {self.session_id}: {e}")
@@ -4,22 +4,24 @@ import logging
 
 from app.models.user import User
 from app.core.dependencies import get_current_user_ws
-from app.services.omnidim.client import OmnidimClient
-from app.api.websocket.voice_stream_handler import VoiceStreamHandler
+from app.services.container import services
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-# Global handler instance
-voice_handler = VoiceStreamHandler()
-
 @router.websocket("/voice/{session_id}")
 async def voice_stream_endpoint(
     websocket: WebSocket,
     session_id: str,
-    token: Optional[str] = None
+    token: Optional[str] = None,
+    resume_token: Optional[str] = None,
+    last_seq: int = 0
 ):
-    """WebSocket endpoint for voice streaming"""
+    """WebSocket endpoint for voice streaming
+
+    After a dropped connection, reconnect with the ``resume_token`` from the
+    ``session`` event and the last ``seq`` received to continue the stream.
+    """
     try:
         # Authenticate user from token
         user = await get_current_user_ws(token)
@@ -28,10 +30,12 @@ async def voice_stream_endpoint(
             return
         
         # Handle voice stream
-        await voice_handler.handle_connection(
+        await services.voice_stream_handler.handle_connection(
             websocket=websocket,
             session_id=session_id,
-            user_id=user.id
+            user_id=user.id,
+            resume_token=resume_token,
+            last_seq=last_seq
         )
         
     except WebSocketDisconnect:
@@ -1,107 +1,265 @@
 import asyncio
-import json
 import logging
 from typing import Dict, Optional
-from fastapi import WebSocket
+from fastapi import WebSocket, WebSocketDisconnect
 from sqlalchemy.orm import Session
 
-from app.database import SessionLocal
+from app.api.websocket.admission import CLOSE_TRY_AGAIN_LATER, StreamRejected, admission
+from app.api.websocket.outbound import OutboundScheduler
+from app.api.websocket.protocol import WireProtocol, negotiate
+from app.api.websocket.resumable import CLOSE_RESUME_FAILED, ResumableStream
+from app.config import settings
+from app.core.metrics import WEBSOCKET_RESUMES, WEBSOCKET_SESSIONS
+from app.core.tracing import SERVER, start_span
+from app.database import write_queue
 from app.services.omnidim.client import OmnidimClient
+from app.services.omnidim.voice_session import VoiceSessionManager
 from app.models.learning_session import LearningSession
 from app.models.voice_interaction import VoiceInteraction, InteractionType
+from app.services.learning.progress_tracker import ProgressTracker
+from app.services.learning.streak_engine import StreakEngine
+from app.services.learning.achievement_engine import AchievementEngine
 
 logger = logging.getLogger(__name__)
 
+progress_tracker = ProgressTracker()
+streak_engine = StreakEngine()
+achievement_engine = AchievementEngine()
+
 class VoiceStreamHandler:
     """Handles WebSocket connections for voice streaming"""
     
     def __init__(self):
         self.omnidim_client = OmnidimClient()
         self.active_connections: Dict[str, WebSocket] = {}
+        # Upstream streams by session, kept across client reconnects
+        self.streams: Dict[str, ResumableStream] = {}
         
     async def handle_connection(
         self,
         websocket: WebSocket,
         session_id: str,
-        user_id: int
+        user_id: int,
+        resume_token: Optional[str] = None,
+        last_seq: int = 0
     ):
-        """Handle a WebSocket connection for voice streaming"""
-        await websocket.accept()
+        """Handle a WebSocket connection for voice streaming
+
+        A connection for a session that is still streaming takes it over
+        from the previous one; with the stream's ``resume_token`` it is
+        also replayed the events after ``last_seq``. New streams go through
+        admission control first and may be queued or turned away.
+        """
+        protocol = negotiate(websocket.scope.get("subprotocols", []))
+        await websocket.accept(subprotocol=protocol.name)
+        stream = self.streams.get(session_id)
+        if resume_token is not None and (stream is None or not stream.accepts(user_id, resume_token)):
+            WEBSOCKET_RESUMES.labels("rejected").inc()
+            await websocket.close(code=CLOSE_RESUME_FAILED, reason="Session cannot be resumed")
+            return
+        if stream is not None and stream.user_id != user_id:
+            await websocket.close(code=1008, reason="Unauthorized")
+            return
+        
         self.active_connections[session_id] = websocket
+        WEBSOCKET_SESSIONS.inc()
+        outbound = OutboundScheduler(
+            websocket,
+            protocol,
+            interval=settings.WS_COALESCE_INTERVAL_MS / 1000,
+            audio_queue_size=settings.WS_AUDIO_QUEUE_SIZE,
+            interactive_queue_size=settings.WS_INTERACTIVE_QUEUE_SIZE,
+            telemetry_queue_size=settings.WS_TELEMETRY_QUEUE_SIZE,
+            max_telemetry_age=settings.WS_TELEMETRY_MAX_AGE_MS / 1000
+        )
+        outbound.start()
         
         try:
-            # Connect to Omnidim WebSocket
-            await self.omnidim_client.connect_voice_stream(
-                session_id=session_id,
-                on_message_callback=lambda data: self._handle_omnidim_message(
-                    websocket, session_id, user_id, data
-                )
-            )
+            if stream is None:
+                async def report_position(position: int):
+                    if outbound.closed:
+                        # The client left while queued; give up its place
+                        raise WebSocketDisconnect()
+                    await outbound.send({"type": "queued", "position": position})
+                
+                try:
+                    await admission.acquire(user_id, on_queued=report_position)
+                except StreamRejected as e:
+                    await self._turn_away(websocket, outbound, e)
+                    return
+                except WebSocketDisconnect:
+                    return
+                # Another connection may have started the stream meanwhile
+                stream = self.streams.get(session_id)
+                if stream is not None:
+                    admission.release(user_id)
+                else:
+                    stream = ResumableStream(session_id, user_id, replay_size=settings.WS_REPLAY_BUFFER_SIZE)
+                    self.streams[session_id] = stream
+            try:
+                missed = await stream.attach(websocket, outbound, last_seq if resume_token is not None else None)
+            except BaseException:
+                await self._abandon(stream, protocol)
+                stream = None
+                raise
+            if stream.upstream is None:
+                # Connect to Omnidim WebSocket; it runs alongside the client loop
+                stream.upstream = asyncio.create_task(self._run_upstream(stream))
+            if resume_token is not None:
+                WEBSOCKET_RESUMES.labels("partial" if missed else "resumed").inc()
             
             # Handle incoming messages from client
             while True:
                 data = await websocket.receive()
                 
                 if data["type"] == "websocket.receive":
-                    if "bytes" in data:
-                        # Forward audio to Omnidim
-                        await self._forward_audio_to_omnidim(session_id, data["bytes"])
-                    elif "text" in data:
-                        # Handle text commands
-                        await self._handle_client_message(
-                            websocket, session_id, user_id, json.loads(data["text"])
-                        )
+                    # Each message is its own trace, tagged with the session
+                    with start_span("ws.client_message", SERVER, {"ws.session_id": session_id}):
+                        message = protocol.decode(data)
+                        if message.get("type") == "audio":
+                            # Forward audio to Omnidim
+                            await self._forward_audio_to_omnidim(session_id, message["data"])
+                        else:
+                            # Handle text commands
+                            await self._handle_client_message(stream, session_id, user_id, message)
                 elif data["type"] == "websocket.disconnect":
                     break
                     
         except Exception as e:
             logger.error(f"WebSocket error for session {session_id}: {e}")
         finally:
-            if session_id in self.active_connections:
+            await outbound.close()
+            WEBSOCKET_SESSIONS.dec()
+            if self.active_connections.get(session_id) is websocket:
                 del self.active_connections[session_id]
-            await self._cleanup_session(session_id, user_id)
+            if stream is not None and stream.detach(websocket):
+                await self._release(stream, protocol)
+    
+    async def close(self):
+        """End streams still waiting for a client, then close the Omnidim client"""
+        for stream in list(self.streams.values()):
+            if stream.websocket is None:
+                stream.cancel_expiry()
+                await self._finish(stream)
+        await self.omnidim_client.close()
+    
+    async def _turn_away(self, websocket: WebSocket, outbound: OutboundScheduler, rejection: StreamRejected):
+        """Tell the client why it was rejected and when to retry, then close"""
+        await outbound.send({
+            "type": "rejected",
+            "reason": rejection.reason,
+            "retry_after": rejection.retry_after,
+        })
+        await outbound.drain()
+        await websocket.close(
+            code=CLOSE_TRY_AGAIN_LATER,
+            reason=f"Server busy, retry after {rejection.retry_after}s"
+        )
+    
+    async def _run_upstream(self, stream: ResumableStream):
+        """Relay Omnidim events into the stream until Omnidim closes it"""
+        try:
+            await self.omnidim_client.connect_voice_stream(
+                session_id=stream.session_id,
+                on_message_callback=lambda data: self._handle_omnidim_message(
+                    stream, stream.session_id, stream.user_id, data
+                )
+            )
+        except Exception as e:
+            logger.error(f"Voice stream for session {stream.session_id} failed: {e}")
+            if stream.websocket is not None:
+                # The client loop ends the session once the close completes
+                try:
+                    await stream.websocket.close(code=1011, reason="Voice stream unavailable")
+                except Exception:
+                    pass
+            elif stream.cancel_expiry():
+                # Nothing left to resume
+                await self._finish(stream)
+    
+    async def _abandon(self, stream: ResumableStream, protocol: WireProtocol):
+        """A connection failed to attach: leave the stream to whoever still owns it"""
+        if stream.websocket is not None or stream.attaching:
+            # A newer connection took the stream over meanwhile
+            if stream.upstream is None:
+                stream.upstream = asyncio.create_task(self._run_upstream(stream))
+        elif stream.upstream is None:
+            # The stream never started; give back its slot
+            if self.streams.get(stream.session_id) is stream:
+                del self.streams[stream.session_id]
+            admission.release(stream.user_id)
+        else:
+            await self._release(stream, protocol)
+    
+    async def _release(self, stream: ResumableStream, protocol: WireProtocol):
+        """The client left: keep the stream for it to resume, or end the session"""
+        if protocol.sequenced and stream.alive and settings.WS_RESUME_GRACE_SECONDS > 0:
+            stream.linger(settings.WS_RESUME_GRACE_SECONDS, lambda: self._expire(stream))
+        else:
+            await self._finish(stream)
+    
+    async def _expire(self, stream: ResumableStream):
+        logger.info(f"Voice session {stream.session_id} was not resumed in time")
+        WEBSOCKET_RESUMES.labels("expired").inc()
+        await self._finish(stream)
+    
+    async def _finish(self, stream: ResumableStream):
+        """Stop the upstream stream and end the learning session"""
+        if self.streams.get(stream.session_id) is stream:
+            del self.streams[stream.session_id]
+        admission.release(stream.user_id)
+        # A failed upstream ends its own session from inside its task
+        if stream.alive and stream.upstream is not asyncio.current_task():
+            stream.upstream.cancel()
+            try:
+                await stream.upstream
+            except BaseException:
+                pass
+        await self._cleanup_session(stream.session_id, stream.user_id)
     
     async def _handle_omnidim_message(
         self,
-        websocket: WebSocket,
+        stream: ResumableStream,
         session_id: str,
         user_id: int,
         data: Dict
     ):
         """Handle messages from Omnidim"""
-        try:
-            if data["type"] == "audio":
-                # Forward audio to client
-                await websocket.send_bytes(data["data"])
-                
-            elif data["type"] == "transcript":
-                # Save transcript and forward to client
-                await self._save_interaction(
-                    session_id, user_id, data["text"], data.get("speaker", "ai")
-                )
-                await websocket.send_json(data)
-                
-            elif data["type"] == "emotion":
-                # Forward emotion data
-                await websocket.send_json(data)
-                
-            elif data["type"] == "pronunciation":
-                # Save and forward pronunciation score
-                await self._save_pronunciation_score(
-                    session_id, user_id, data["score"], data.get("feedback")
-                )
-                await websocket.send_json(data)
-                
-            else:
-                # Forward other messages
-                await websocket.send_json(data)
-                
-        except Exception as e:
-            logger.error(f"Error handling Omnidim message: {e}")
+        with start_span("ws.omnidim_message", SERVER, {"ws.session_id": session_id, "ws.type": data.get("type")}):
+            try:
+                if data["type"] == "audio":
+                    # Forward audio to client
+                    await stream.emit(data)
+                    
+                elif data["type"] == "transcript":
+                    # Save transcript and forward to client
+                    await self._save_interaction(
+                        session_id, user_id, data["text"], data.get("speaker", "ai"),
+                        duration_seconds=data.get("duration")
+                    )
+                    await stream.emit(data)
+                    
+                elif data["type"] == "emotion":
+                    # Forward emotion data
+                    await stream.emit(data)
+                    
+                elif data["type"] == "pronunciation":
+                    # Save and forward pronunciation score
+                    await self._save_pronunciation_score(
+                        session_id, user_id, data["score"], data.get("feedback")
+                    )
+                    await stream.emit(data)
+                    
+                else:
+                    # Forward other messages
+                    await stream.emit(data)
+                    
+            except Exception as e:
+                logger.error(f"Error handling Omnidim message: {e}")
     
     async def _handle_client_message(
         self,
-        websocket: WebSocket,
+        stream: ResumableStream,
         session_id: str,
         user_id: int,
         message: Dict
@@ -113,9 +271,9 @@ class VoiceStreamHandler:
             # Handle voice commands
             command = message.get("command")
             if command == "pause":
-                await websocket.send_json({"type": "status", "message": "Session paused"})
+                await stream.emit({"type": "status", "message": "Session paused"})
             elif command == "resume":
-                await websocket.send_json({"type": "status", "message": "Session resumed"})
+                await stream.emit({"type": "status", "message": "Session resumed"})
                 
         elif msg_type == "text":
             # Forward text to Omnidim for processing
@@ -136,18 +294,21 @@ class VoiceStreamHandler:
         session_id: str,
         user_id: int,
         transcript: str,
-        speaker: str
+        speaker: str,
+        duration_seconds: Optional[float] = None
     ):
         """Save voice interaction to database"""
-        db = SessionLocal()
-        try:
+        def save(db: Session):
             interaction = VoiceInteraction(
                 session_id=session_id,
                 user_id=user_id,
                 type=InteractionType.USER_SPEECH if speaker == "user" else InteractionType.AI_RESPONSE,
-                transcript=transcript
+                transcript=transcript,
+                # Utterance length reported by Omnidim, used for speaking time metrics
+                interaction_metadata={"duration_seconds": duration_seconds} if duration_seconds is not None else None
             )
             db.add(interaction)
+            achievement_engine.on_interaction(db, interaction)
             
             # Update session interaction count
             session = db.query(LearningSession).filter(
@@ -155,13 +316,11 @@ class VoiceStreamHandler:
             ).first()
             if session:
                 session.interaction_count += 1
-                
-            db.commit()
+        
+        try:
+            await write_queue.run(save)
         except Exception as e:
             logger.error(f"Error saving interaction: {e}")
-            db.rollback()
-        finally:
-            db.close()
     
     async def _save_pronunciation_score(
         self,
@@ -171,8 +330,7 @@ class VoiceStreamHandler:
         feedback: Optional[str]
     ):
         """Save pronunciation score"""
-        db = SessionLocal()
-        try:
+        def save(db: Session):
             interaction = VoiceInteraction(
                 session_id=session_id,
                 user_id=user_id,
@@ -181,32 +339,29 @@ class VoiceStreamHandler:
                 transcript=feedback
             )
             db.add(interaction)
-            db.commit()
+            achievement_engine.on_interaction(db, interaction)
+        
+        try:
+            await write_queue.run(save)
         except Exception as e:
             logger.error(f"Error saving pronunciation score: {e}")
-            db.rollback()
-        finally:
-            db.close()
     
     async def _cleanup_session(self, session_id: str, user_id: int):
         """Cleanup when session ends"""
-        db = SessionLocal()
-        try:
-            session = db.query(LearningSession).filter(
+        def finish(db: Session):
+            # Sessions already ended through the REST API are left alone so
+            # their time isn't counted twice
+            session = VoiceSessionManager.claim_end(
+                db,
                 LearningSession.id == session_id,
                 LearningSession.user_id == user_id
-            ).first()
-            
+            )
             if session:
-                from datetime import datetime
-                session.ended_at = datetime.utcnow()
-                session.status = "completed"
-                session.duration_seconds = int(
-                    (session.ended_at - session.started_at).total_seconds()
-                )
-                db.commit()
+                progress_tracker.record_session(db, session)
+                streak_engine.record_activity(db, user_id, session.ended_at)
+                achievement_engine.on_session_end(db, session)
+        
+        try:
+            await write_queue.run(finish)
         except Exception as e:
-            logger.error(f"Error cleaning up session: {e}")
-            db.rollback()
-        finally:
-            db.close()
\ No newline at end of file
+            logger.error(f"Error cleaning up session: {e}")
\ No newline at end of file
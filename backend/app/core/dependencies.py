@@ -1,6 +1,9 @@
 from fastapi import Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from jose import JWTError, jwt
+from typing import Any, List, Optional
+import base64
+import json
 
 from app.database import get_db, SessionLocal
 from app.models.user import User
@@ -36,12 +39,54 @@ def get_premium_user(current_user: User = Depends(get_current_user)) -> User:
         )
     return current_user
 
+def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
+    """Require an administrator (``is_admin`` set by scripts/grant_admin.py)"""
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return current_user
+
 class PaginationParams:
-    """Common pagination parameters"""
+    """Common pagination parameters
+
+    Supports offset pagination via ``skip`` and keyset pagination via an
+    opaque ``cursor`` holding the sort key of the last row already returned.
+    """
     def __init__(
         self,
         skip: int = Query(0, ge=0),
-        limit: int = Query(10, ge=1, le=100)
+        limit: int = Query(10, ge=1, le=100),
+        cursor: Optional[str] = Query(None, description="Opaque cursor from the previous page")
     ):
         self.skip = skip
-        self.limit = limit
\ No newline at end of file
+        self.limit = limit
+        self.cursor = cursor
+    
+    @staticmethod
+    def encode_cursor(*values: Any) -> str:
+        """Encode a row's sort key into an opaque cursor"""
+        payload = json.dumps(
+            [v.isoformat() if hasattr(v, "isoformat") else v for v in values],
+            separators=(",", ":")
+        )
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+    
+    def decode_cursor(self) -> Optional[List[Any]]:
+        """Decode the request cursor back into sort key values"""
+        if not self.cursor:
+            return None
+        
+        try:
+            padded = self.cursor + "=" * (-len(self.cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except (ValueError, TypeError):
+            values = None
+        
+        if not isinstance(values, list):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid pagination cursor"
+            )
+        return values
\ No newline at end of file
@@ -0,0 +1,157 @@
+from typing import Callable, Optional, Set, Tuple
+from pathlib import Path
+import asyncio
+import functools
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from app.config import settings
+from app.core.metrics import EVENT_LOOP_BLOCKING_CALLS, EVENT_LOOP_LAG, EVENT_LOOP_STALLS
+
+logger = logging.getLogger(__name__)
+
+_BACKEND_DIR = str(Path(__file__).resolve().parents[2])
+
+class LoopMonitor:
+    """Measures event loop lag and reports what the loop is stuck on
+
+    A task sleeps for LOOP_MONITOR_INTERVAL_MS at a time and records how
+    late it wakes up. A watchdog thread watches the same heartbeat; when the
+    loop has not come back for LOOP_BLOCK_THRESHOLD_MS it logs the loop
+    thread's stack while the blocking call is still running. ``lag`` is a
+    smoothed recent value for load decisions; it stays 0 while stopped.
+    """
+
+    def __init__(self, interval: float, threshold: float):
+        self.interval = interval
+        self.threshold = threshold
+        self.loop_thread_id: Optional[int] = None
+        self.lag = 0.0
+        self._heartbeat = 0.0
+        self._reported_heartbeat = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    async def start(self):
+        self.loop_thread_id = threading.get_ident()
+        self._heartbeat = time.perf_counter()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._measure())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        if settings.LOOP_BLOCKING_CALL_DETECTION:
+            install_blocking_call_detector(self.loop_thread_id)
+
+    async def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.lag = 0.0
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=5)
+            self._watchdog = None
+
+    async def _measure(self):
+        while True:
+            self._heartbeat = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(time.perf_counter() - self._heartbeat - self.interval, 0.0)
+            EVENT_LOOP_LAG.observe(lag)
+            # Roughly the last second at the default interval
+            self.lag += (lag - self.lag) * 0.2
+
+    def _watch(self):
+        while not self._stop.wait(self.threshold / 2):
+            heartbeat = self._heartbeat
+            stalled = time.perf_counter() - heartbeat - self.interval
+            if stalled < self.threshold or heartbeat == self._reported_heartbeat:
+                continue
+            # One report per stall, taken while the loop is still blocked
+            self._reported_heartbeat = heartbeat
+            EVENT_LOOP_STALLS.inc()
+            frame = sys._current_frames().get(self.loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else "unavailable"
+            logger.warning(f"Event loop blocked for {stalled * 1000:.0f} ms, loop thread stack:\n{stack}")
+
+loop_monitor = LoopMonitor(
+    interval=settings.LOOP_MONITOR_INTERVAL_MS / 1000,
+    threshold=settings.LOOP_BLOCK_THRESHOLD_MS / 1000
+)
+
+# Synchronous calls known to block the loop when made from async handlers
+def _blocking_calls():
+    from passlib.context import CryptContext
+    from sqlalchemy.orm import Session
+    import wave
+
+    calls = [
+        (Session, "execute", "Session.execute"),
+        (wave, "open", "wave.open"),
+        (CryptContext, "hash", "pwd_context.hash"),
+        (CryptContext, "verify", "pwd_context.verify"),
+    ]
+    try:
+        import av
+        calls.append((av, "open", "av.open"))
+    except ImportError:
+        pass
+    return calls
+
+_installed = False
+_reported_sites: Set[Tuple[str, str, int]] = set()
+
+def install_blocking_call_detector(loop_thread_id: int):
+    """Warn when a known blocking call runs on the event loop thread
+
+    Each call site is logged once and every call is counted in
+    ``event_loop_blocking_calls_total``. Calls made from worker threads
+    (``run_in_executor``, the write queue) are not flagged.
+    """
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    for owner, attribute, name in _blocking_calls():
+        setattr(owner, attribute, _flag_on_loop(getattr(owner, attribute), name, loop_thread_id))
+    logger.info("Blocking call detection enabled")
+
+def _flag_on_loop(func: Callable, name: str, loop_thread_id: int) -> Callable:
+    counter = EVENT_LOOP_BLOCKING_CALLS.labels(name)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if threading.get_ident() == loop_thread_id:
+            counter.inc()
+            _report(name)
+        return func(*args, **kwargs)
+    return wrapper
+
+def _report(name: str):
+    caller = _app_caller(sys._getframe(2))
+    site = (name, caller.f_code.co_filename, caller.f_lineno)
+    if site in _reported_sites:
+        return
+    _reported_sites.add(site)
+    logger.warning(
+        f"Blocking call {name} on the event loop thread from "
+        f"{caller.f_code.co_name} ({caller.f_code.co_filename}:{caller.f_lineno})"
+    )
+
+def _app_caller(frame):
+    """Innermost application frame, skipping library internals"""
+    first = frame
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_BACKEND_DIR) and filename != __file__:
+            return frame
+        frame = frame.f_back
+    return first
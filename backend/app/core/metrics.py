@@ -0,0 +1,359 @@
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Union
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+import functools
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Seconds; covers fast handlers through slow upstream calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Pool waits are normally far below a millisecond
+WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+# A healthy loop wakes within a millisecond or two
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# Admission queue waits run to tens of seconds
+QUEUE_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+GaugeValue = Union[float, Dict[Tuple[str, ...], float]]
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), registry: Optional["Registry"] = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        # Same children keyed by the raw label values callers pass
+        self._lookup: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self._new_child()
+        (registry or REGISTRY).register(self)
+
+    def labels(self, *values):
+        """Child metric for a label combination; cache it on hot paths"""
+        child = self._lookup.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(tuple(str(v) for v in values), self._new_child())
+                self._lookup[values] = child
+        return child
+
+    def _samples(self) -> List[Tuple[Tuple[str, ...], object]]:
+        if not self.labelnames:
+            return [((), self._default)]
+        with self._lock:
+            return list(self._children.items())
+
+    @abstractmethod
+    def _new_child(self):
+        ...
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in self._samples():
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def _render_child(self, values, child) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.get())}"]
+
+class _Value:
+    __slots__ = ("value", "lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self.lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self.lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+    def get(self) -> float:
+        return self.value
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+class Gauge(_Metric):
+    """Value that goes up and down, or is read from a function at scrape time"""
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._function: Optional[Callable[[], GaugeValue]] = None
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._default.dec(amount)
+
+    def set(self, value: float):
+        self._default.set(value)
+
+    def set_function(self, function: Callable[[], GaugeValue]):
+        """Read the value at scrape time; labelled gauges return {labels: value}"""
+        self._function = function
+
+    def _samples(self):
+        if self._function is None:
+            return super()._samples()
+        try:
+            value = self._function()
+        except Exception as e:
+            logger.warning(f"Gauge {self.name} callback failed: {e}")
+            return []
+        if not self.labelnames:
+            return [((), _Constant(value))]
+        return [(tuple(str(v) for v in key), _Constant(v)) for key, v in value.items()]
+
+class _Constant:
+    __slots__ = ("value",)
+
+    def __init__(self, value: float):
+        self.value = value
+
+    def get(self) -> float:
+        return self.value
+
+class _HistogramValue:
+    __slots__ = ("buckets", "counts", "sum", "lock")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+
+class Histogram(_Metric):
+    """Distribution of observations in fixed cumulative buckets"""
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Sequence[float] = DEFAULT_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        self._default.observe(value)
+
+    def _render_child(self, values, child) -> List[str]:
+        with child.lock:
+            counts = list(child.counts)
+            total = child.sum
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, values, f'le="{_format_value(bound)}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+class Registry:
+    """Metrics exposed together in Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Awaitable[None]]] = []
+
+    def register(self, metric: _Metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def add_collector(self, collector: Callable[[], Awaitable[None]]):
+        """Coroutine run before each scrape, for values that need awaiting"""
+        self._collectors.append(collector)
+
+    async def render(self) -> str:
+        for collector in self._collectors:
+            try:
+                await collector()
+            except Exception as e:
+                logger.warning(f"Metrics collector failed: {e}")
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+# HTTP
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route and status",
+    ["method", "route", "status"]
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route",
+    ["method", "route"]
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge("http_requests_in_progress", "HTTP requests being served")
+
+# Database pool
+DB_POOL_CHECKOUTS = Counter("db_pool_checkouts_total", "Connections checked out of the pool", ["engine"])
+DB_POOL_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection",
+    ["engine"], buckets=WAIT_BUCKETS
+)
+DB_POOL_CONNECTIONS = Gauge("db_pool_connections", "Pooled connections by state", ["engine", "state"])
+
+# Omnidim
+OMNIDIM_REQUEST_DURATION = Histogram(
+    "omnidim_request_duration_seconds", "Omnidim API call latency by endpoint", ["endpoint"]
+)
+OMNIDIM_ERRORS = Counter(
+    "omnidim_request_errors_total", "Failed Omnidim API calls by endpoint and error", ["endpoint", "error"]
+)
+
+# Event loop
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds", "How late the event loop ran a scheduled wakeup", buckets=LAG_BUCKETS
+)
+EVENT_LOOP_STALLS = Counter("event_loop_stalls_total", "Event loop blocks over the stack capture threshold")
+EVENT_LOOP_BLOCKING_CALLS = Counter(
+    "event_loop_blocking_calls_total", "Known blocking calls made on the event loop thread", ["call"]
+)
+
+# Sessions and queues
+WEBSOCKET_SESSIONS = Gauge("websocket_sessions_active", "Open voice streaming WebSockets")
+WEBSOCKET_FRAMES_SENT = Counter(
+    "websocket_frames_sent_total", "Voice stream frames sent to clients by wire protocol", ["protocol"]
+)
+WEBSOCKET_BYTES_SENT = Counter(
+    "websocket_bytes_sent_total", "Voice stream payload bytes sent to clients by wire protocol", ["protocol"]
+)
+WEBSOCKET_EVENTS_COALESCED = Counter(
+    "websocket_events_coalesced_total", "Low-priority events replaced by a newer one before sending"
+)
+WEBSOCKET_EVENTS_DROPPED = Counter(
+    "websocket_events_dropped_total", "Voice stream events discarded before sending", ["class", "reason"]
+)
+WEBSOCKET_SEND_LATENCY = Histogram(
+    "websocket_send_latency_seconds", "Time voice stream events wait in the outbound queue by priority class",
+    ["class"], buckets=WAIT_BUCKETS
+)
+WEBSOCKET_RESUMES = Counter(
+    "websocket_resumes_total", "Voice stream reconnects with a resume token by outcome", ["outcome"]
+)
+WEBSOCKET_EVENTS_REPLAYED = Counter(
+    "websocket_events_replayed_total", "Voice stream events resent to a resumed connection"
+)
+WEBSOCKET_STREAMS_LINGERING = Gauge(
+    "websocket_streams_lingering", "Voice streams kept alive for a client to resume"
+)
+VOICE_STREAMS_ADMITTED = Gauge("voice_streams_admitted", "Upstream voice streams holding an admission slot")
+VOICE_STREAMS_QUEUED = Gauge("voice_streams_queued", "Voice stream connections waiting for an admission slot")
+VOICE_STREAMS_REJECTED = Counter(
+    "voice_streams_rejected_total", "Voice stream connections turned away by admission control", ["reason"]
+)
+VOICE_STREAM_QUEUE_WAIT = Histogram(
+    "voice_stream_queue_wait_seconds", "Time voice stream connections waited for admission by outcome",
+    ["outcome"], buckets=QUEUE_BUCKETS
+)
+VOICE_SESSIONS = Gauge("voice_sessions_active", "Voice sessions tracked in memory")
+WRITE_QUEUE_PENDING = Gauge("write_queue_pending", "Database writes queued or running on the writer threads")
+JOB_QUEUE_DEPTH = Gauge("job_queue_depth", "Messages waiting in the job broker")
+JOBS_RUNNING = Gauge("jobs_running", "Running jobs by name", ["job"])
+
+def observe_omnidim(endpoint: str):
+    """Decorator timing an async Omnidim API call and counting its failures"""
+    duration = OMNIDIM_REQUEST_DURATION.labels(endpoint)
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                status = getattr(getattr(e, "response", None), "status_code", None)
+                OMNIDIM_ERRORS.labels(endpoint, status or type(e).__name__).inc()
+                raise
+            finally:
+                duration.observe(time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+class MetricsMiddleware:
+    """Counts HTTP requests and times them per route template
+
+    Paths that match no route are reported as ``unmatched`` to keep the
+    label set bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_REQUESTS_IN_PROGRESS.dec()
+            route = scope.get("route")
+            template = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            HTTP_REQUEST_DURATION.labels(method, template).observe(elapsed)
+            HTTP_REQUESTS.labels(method, template, status[0]).inc()
@@ -0,0 +1,274 @@
+from typing import Any, Dict, List, Optional
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+
+from jose import JWTError, jwt
+
+from app.config import settings
+from app.core.tracing import current_span
+from app.database import SessionLocal
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+PROFILE_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+PROFILE_HEADER = b"x-profile"
+
+class StackSampler:
+    """Statistical profiler sampling one thread's Python stack on a timer
+
+    Stacks are counted in collapsed form (``outer;inner;leaf``), the input
+    format of flamegraph.pl, speedscope and similar tools. Sampling runs on
+    its own thread, so the profiled code is only slowed by the GIL handoff.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._labels: Dict[Any, str] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.stacks[self._collapse(frame)] += 1
+            self.samples += 1
+
+    def _collapse(self, frame) -> str:
+        labels = []
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                label = f"{code.co_qualname} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+                self._labels[code] = label
+            labels.append(label)
+            frame = frame.f_back
+        return ";".join(reversed(labels))
+
+_BACKEND_DIR = str(Path(__file__).resolve().parents[2])
+_SITE_PACKAGES = "site-packages" + os.sep
+
+def _short_path(filename: str) -> str:
+    """File name relative to the backend or site-packages; bare name otherwise"""
+    if filename.startswith(_BACKEND_DIR):
+        return os.path.relpath(filename, _BACKEND_DIR)
+    index = filename.rfind(_SITE_PACKAGES)
+    if index != -1:
+        return filename[index + len(_SITE_PACKAGES):]
+    return os.path.basename(filename)
+
+def collapsed_text(stacks: Counter) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+def top_functions(stacks: Counter, limit: int = 20) -> List[Dict[str, Any]]:
+    """Functions ranked by samples in which they were running (self) or on the stack (total)"""
+    own: Counter = Counter()
+    total: Counter = Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(";")
+        own[frames[-1]] += count
+        for frame in set(frames):
+            total[frame] += count
+    return [
+        {"function": frame, "self": own[frame], "total": total[frame]}
+        for frame, _ in own.most_common(limit)
+    ]
+
+class ProfileStore:
+    """Request profiles on disk with count and size based retention
+
+    Each profile is a ``<id>.json`` summary next to a ``<id>.collapsed``
+    stack file; the oldest pairs are deleted once either limit is passed.
+    """
+
+    def __init__(self, directory: str, max_files: int, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def save(self, profile_id: str, summary: Dict[str, Any], collapsed: str):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            # The summary is written last; listings only show complete profiles
+            self._path(profile_id, "collapsed").write_text(collapsed, encoding="utf-8")
+            self._path(profile_id, "json").write_text(json.dumps(summary), encoding="utf-8")
+            self._prune()
+
+    def list(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Summaries of stored profiles, newest first"""
+        if not self.directory.exists():
+            return []
+        paths = sorted(self.directory.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+        profiles = []
+        for path in paths[:limit]:
+            try:
+                profiles.append(json.loads(path.read_text(encoding="utf-8")))
+            except (OSError, ValueError):
+                continue
+        return profiles
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        path = self.file(profile_id, "json")
+        if path is None:
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def file(self, profile_id: str, kind: str) -> Optional[Path]:
+        """Path of a stored profile file, or None for unknown or malformed ids"""
+        if not PROFILE_ID_PATTERN.match(profile_id):
+            return None
+        path = self._path(profile_id, kind)
+        return path if path.exists() else None
+
+    def _path(self, profile_id: str, kind: str) -> Path:
+        return self.directory / f"{profile_id}.{kind}"
+
+    def _prune(self):
+        summaries = sorted(self.directory.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+        kept_bytes = 0
+        for index, summary in enumerate(summaries):
+            files = [summary, summary.with_suffix(".collapsed")]
+            size = sum(f.stat().st_size for f in files if f.exists())
+            if index < self.max_files and kept_bytes + size <= self.max_bytes:
+                kept_bytes += size
+                continue
+            for f in files:
+                try:
+                    f.unlink()
+                except FileNotFoundError:
+                    pass
+
+profile_store = ProfileStore(
+    settings.PROFILE_DIR,
+    max_files=settings.PROFILE_MAX_FILES,
+    max_bytes=settings.PROFILE_MAX_MB * 1024 * 1024
+)
+
+def _is_admin_token(authorization: Optional[str]) -> bool:
+    """Whether the bearer token belongs to a user flagged ``is_admin``; queries the database"""
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return False
+    try:
+        payload = jwt.decode(authorization[7:], settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return False
+    db = SessionLocal()
+    try:
+        return bool(db.query(User.is_admin).filter(User.username == payload.get("sub")).scalar())
+    finally:
+        db.close()
+
+class ProfilingMiddleware:
+    """Samples the stacks of selected requests and stores them as profiles
+
+    A request is profiled when it carries ``X-Profile: 1`` with an admin
+    bearer token, or is picked at PROFILE_SAMPLE_RATE from the paths in
+    PROFILE_PATHS. Sampled requests faster than PROFILE_MIN_DURATION_MS are
+    discarded so retention goes to the slow ones. The profile id is returned
+    in ``X-Profile-Id``.
+
+    Handlers run on the event loop thread, so a profile also contains
+    whatever other requests ran on the loop at the same time.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.interval = settings.PROFILE_INTERVAL_MS / 1000
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trigger = await self._trigger(scope)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        status = [500]
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        span = current_span()
+        started_at = datetime.utcnow()
+        started = time.perf_counter()
+        sampler = StackSampler(threading.get_ident(), self.interval)
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            sampler.stop()
+            duration_ms = (time.perf_counter() - started) * 1000
+            if trigger == "header" or duration_ms >= settings.PROFILE_MIN_DURATION_MS:
+                route = scope.get("route")
+                summary = {
+                    "id": profile_id,
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": getattr(route, "path", None),
+                    "status": status[0],
+                    "trigger": trigger,
+                    "trace_id": span.trace_id if span is not None else None,
+                    "started_at": started_at.isoformat(),
+                    "duration_ms": round(duration_ms, 1),
+                    "interval_ms": settings.PROFILE_INTERVAL_MS,
+                    "samples": sampler.samples,
+                    "top_functions": top_functions(sampler.stacks),
+                }
+                await self._save(profile_id, summary, sampler.stacks)
+
+    async def _trigger(self, scope) -> Optional[str]:
+        headers = dict(scope.get("headers", []))
+        if headers.get(PROFILE_HEADER) in (b"1", b"true"):
+            authorization = headers.get(b"authorization", b"").decode("latin-1")
+            loop = asyncio.get_running_loop()
+            if await loop.run_in_executor(None, _is_admin_token, authorization):
+                return "header"
+
+        if settings.PROFILE_SAMPLE_RATE <= 0:
+            return None
+        paths = settings.PROFILE_PATHS
+        if paths and not any(scope["path"].startswith(prefix) for prefix in paths):
+            return None
+        if random.random() < settings.PROFILE_SAMPLE_RATE:
+            return "sampled"
+        return None
+
+    async def _save(self, profile_id: str, summary: Dict[str, Any], stacks: Counter):
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, profile_store.save, profile_id, summary, collapsed_text(stacks))
+        except OSError as e:
+            logger.warning(f"Could not store profile {profile_id}: {e}")
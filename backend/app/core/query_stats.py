@@ -0,0 +1,131 @@
+from typing import List, Optional, Tuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import heapq
+import logging
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class QueryStats:
+    """SQL statements executed within one request or tracked block"""
+    count: int = 0
+    total_ms: float = 0.0
+    # Min-heap of (ms, statement) holding the slowest statements
+    slowest: List[Tuple[float, str]] = field(default_factory=list)
+
+    def record(self, statement: str, elapsed_ms: float):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        entry = (elapsed_ms, statement)
+        if len(self.slowest) < settings.SLOW_QUERY_TOP_N:
+            heapq.heappush(self.slowest, entry)
+        elif entry > self.slowest[0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def top(self) -> List[Tuple[float, str]]:
+        """Slowest statements, slowest first"""
+        return sorted(self.slowest, reverse=True)
+
+# Mutable stats object shared with the threads a request's work runs in
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Stats of the request or block being tracked, if any"""
+    return _current.get()
+
+@contextmanager
+def track_queries():
+    """Count the SQL statements executed inside the block"""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+def instrument_engine(engine: Engine):
+    """Time every statement on ``engine`` and log slow ones"""
+    if getattr(engine, "_query_stats_installed", False):
+        return
+    engine._query_stats_installed = True
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started_at"].pop()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        stats = _current.get()
+        if stats is not None:
+            stats.record(statement, elapsed_ms)
+        if elapsed_ms >= settings.SLOW_QUERY_MS:
+            logger.warning(f"Slow query ({elapsed_ms:.1f} ms): {_shorten(statement)}")
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        # Keep the timing stack balanced when a statement fails
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_started_at"):
+            conn.info["query_started_at"].pop()
+
+def _shorten(statement: str, limit: int = 500) -> str:
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= limit else statement[:limit] + "..."
+
+class QueryStatsMiddleware:
+    """Per-request SQL accounting
+
+    Counts statements and database time for every HTTP request, logs
+    requests over REQUEST_QUERY_COUNT_WARN statements or
+    REQUEST_DB_TIME_WARN_MS of database time with their slowest statements,
+    and in debug mode reports the numbers in ``X-DB-*`` and ``Server-Timing``
+    response headers. Statements a streamed body issues after the headers
+    are sent are logged but not in the headers.
+    """
+
+    def __init__(self, app, debug_headers: Optional[bool] = None):
+        self.app = app
+        self.debug_headers = settings.DEBUG if debug_headers is None else debug_headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start" and self.debug_headers:
+                headers = list(message.get("headers", []))
+                headers += [
+                    (b"x-db-query-count", str(stats.count).encode()),
+                    (b"x-db-time-ms", f"{stats.total_ms:.1f}".encode()),
+                    (b"server-timing", f'db;dur={stats.total_ms:.1f};desc="{stats.count} queries"'.encode()),
+                ]
+                if stats.slowest:
+                    headers.append((b"x-db-slowest-ms", ",".join(f"{ms:.1f}" for ms, _ in stats.top()).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        with track_queries() as stats:
+            try:
+                await self.app(scope, receive, send_with_stats)
+            finally:
+                if (
+                    stats.count > settings.REQUEST_QUERY_COUNT_WARN
+                    or stats.total_ms > settings.REQUEST_DB_TIME_WARN_MS
+                ):
+                    slowest = "; ".join(f"{ms:.1f} ms: {_shorten(sql, 200)}" for ms, sql in stats.top())
+                    logger.warning(
+                        f"{scope['method']} {scope['path']} ran {stats.count} queries "
+                        f"in {stats.total_ms:.1f} ms (slowest: {slowest})"
+                    )
@@ -7,6 +7,7 @@ from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 
 from app.config import settings
+from app.core.tracing import start_span
 from app.database import get_db
 from app.models.user import User
 
@@ -37,6 +38,10 @@ async def get_current_user(
     db: Session = Depends(get_db)
 ) -> User:
     """Get current user from JWT token"""
+    with start_span("auth.get_current_user"):
+        return _authenticate(token, db)
+
+def _authenticate(token: str, db: Session) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -0,0 +1,40 @@
+from typing import Any
+from decimal import Decimal
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+# Aware datetimes end in "Z", as Pydantic renders them for response models
+OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_UTC_Z
+
+def _default(obj: Any) -> Any:
+    """Types orjson doesn't serialize natively"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, Decimal):
+        # As FastAPI's jsonable_encoder: whole numbers stay integers
+        return int(obj) if obj.as_tuple().exponent >= 0 else float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode("utf-8", errors="replace")
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON; datetimes, UUIDs, enums, dataclasses and NumPy values included"""
+    return orjson.dumps(obj, default=_default, option=OPTIONS)
+
+def loads(data):
+    return orjson.loads(data)
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson; the app's default response class
+
+    FastAPI still validates and converts ``response_model`` results before
+    rendering. Hot endpoints whose content is already in the response
+    shape return a ``FastJSONResponse`` themselves to skip that step.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
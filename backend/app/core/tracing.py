@@ -0,0 +1,381 @@
+from typing import Any, Dict, List, Optional
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+import functools
+import json
+import logging
+import queue
+import random
+import threading
+import time
+
+import httpx
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# OTLP span kinds
+INTERNAL = 1
+SERVER = 2
+CLIENT = 3
+
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+class Span:
+    """A timed operation within a trace"""
+
+    __slots__ = (
+        "trace_id", "span_id", "parent_id", "name", "kind", "sampled",
+        "attributes", "start_ns", "end_ns", "status", "status_message"
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str],
+        sampled: bool,
+        kind: int = INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None
+    ):
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.sampled = sampled
+        self.attributes = attributes or {}
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.status = STATUS_OK
+        self.status_message: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any):
+        if self.sampled:
+            self.attributes[key] = value
+
+    def record_error(self, error: BaseException):
+        self.status = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            if self.sampled:
+                span_processor.on_end(self)
+
+    @property
+    def traceparent(self) -> str:
+        """W3C trace context header value"""
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": self.status},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+def _should_sample() -> bool:
+    return settings.TRACE_EXPORTER != "none" and random.random() < settings.TRACE_SAMPLE_RATE
+
+def parse_traceparent(value: Optional[str]):
+    """(trace_id, parent span id, sampled) from a traceparent header, or None"""
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16), int(parts[3], 16)
+    except ValueError:
+        return None
+    return parts[1], parts[2], bool(int(parts[3], 16) & 1)
+
+def new_span(
+    name: str,
+    kind: int = INTERNAL,
+    attributes: Optional[Dict[str, Any]] = None,
+    traceparent: Optional[str] = None
+) -> Span:
+    """Child of the current span, or a new root when there is none
+
+    Roots sample at TRACE_SAMPLE_RATE unless an incoming ``traceparent``
+    already decided; children follow their parent. Unsampled spans still
+    carry trace ids for propagation but are never exported.
+    """
+    parent = _current_span.get()
+    if parent is not None:
+        return Span(name, parent.trace_id, parent.span_id, parent.sampled, kind, attributes)
+
+    remote = parse_traceparent(traceparent)
+    if remote is not None:
+        trace_id, parent_id, sampled = remote
+        sampled = sampled and settings.TRACE_EXPORTER != "none"
+        return Span(name, trace_id, parent_id, sampled, kind, attributes)
+    return Span(name, f"{random.getrandbits(128):032x}", None, _should_sample(), kind, attributes)
+
+@contextmanager
+def start_span(
+    name: str,
+    kind: int = INTERNAL,
+    attributes: Optional[Dict[str, Any]] = None,
+    traceparent: Optional[str] = None
+):
+    """Run the block inside a span that becomes the current span"""
+    span = new_span(name, kind, attributes, traceparent)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+
+def traced(name: str, kind: int = INTERNAL):
+    """Decorator running an async function inside a span"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with start_span(name, kind):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def trace_headers() -> Dict[str, str]:
+    """Headers propagating the current trace to an upstream service"""
+    span = _current_span.get()
+    if span is None:
+        return {}
+    return {"traceparent": span.traceparent, "X-Trace-Id": span.trace_id}
+
+async def inject_trace_headers(request: httpx.Request):
+    """httpx request hook adding the current trace headers"""
+    request.headers.update(trace_headers())
+
+def instrument_engine_tracing(engine: Engine):
+    """Record a span for every SQL statement run inside a sampled trace"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        parent = _current_span.get()
+        if parent is None or not parent.sampled:
+            return
+        span = Span("db.query", parent.trace_id, parent.span_id, True, CLIENT, {
+            "db.system": engine.dialect.name,
+            "db.statement": statement[:1000],
+        })
+        conn.info.setdefault("trace_spans", []).append(span)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        spans = conn.info.get("trace_spans")
+        if spans:
+            spans.pop().end()
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        conn = exception_context.connection
+        spans = conn.info.get("trace_spans") if conn is not None else None
+        if spans:
+            span = spans.pop()
+            span.record_error(exception_context.original_exception)
+            span.end()
+
+class SpanExporter(ABC):
+    @abstractmethod
+    def export(self, spans: List[Span]):
+        ...
+
+    def shutdown(self):
+        pass
+
+class FileSpanExporter(SpanExporter):
+    """Appends spans as OTLP JSON, one span per line"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def export(self, spans: List[Span]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for span in spans:
+                f.write(json.dumps(span.to_otlp(), separators=(",", ":")))
+                f.write("\n")
+
+class OTLPHttpSpanExporter(SpanExporter):
+    """Posts spans to an OTLP/HTTP JSON endpoint (``/v1/traces``)"""
+
+    def __init__(self, endpoint: str, service_name: str):
+        self.endpoint = endpoint
+        self.resource = {"attributes": [_otlp_attribute("service.name", service_name)]}
+        self._client = httpx.Client(timeout=5.0)
+
+    def export(self, spans: List[Span]):
+        payload = {"resourceSpans": [{
+            "resource": self.resource,
+            "scopeSpans": [{
+                "scope": {"name": __name__},
+                "spans": [span.to_otlp() for span in spans],
+            }],
+        }]}
+        response = self._client.post(self.endpoint, json=payload)
+        response.raise_for_status()
+
+    def shutdown(self):
+        self._client.close()
+
+class BatchSpanProcessor:
+    """Exports finished spans in batches from a background thread
+
+    The queue is bounded; when the exporter falls behind, new spans are
+    dropped rather than slowing requests down.
+    """
+
+    def __init__(self, exporter: Optional[SpanExporter], max_queue: int, batch_size: int, interval: float):
+        self.exporter = exporter
+        self.batch_size = batch_size
+        self.interval = interval
+        self.dropped = 0
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def on_end(self, span: Span):
+        if self.exporter is None:
+            return
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def shutdown(self):
+        """Export what is queued and stop the export thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+        if self.exporter is not None:
+            self._flush()
+            self.exporter.shutdown()
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._flush()
+
+    def _flush(self):
+        while True:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return
+            try:
+                self.exporter.export(batch)
+            except Exception as e:
+                logger.warning(f"Dropped {len(batch)} spans, export failed: {e}")
+
+def _build_exporter() -> Optional[SpanExporter]:
+    if settings.TRACE_EXPORTER == "file":
+        return FileSpanExporter(settings.TRACE_FILE_PATH)
+    if settings.TRACE_EXPORTER == "otlp":
+        return OTLPHttpSpanExporter(settings.TRACE_OTLP_ENDPOINT, settings.APP_NAME)
+    return None
+
+span_processor = BatchSpanProcessor(
+    _build_exporter(),
+    max_queue=settings.TRACE_MAX_QUEUE_SIZE,
+    batch_size=settings.TRACE_EXPORT_BATCH_SIZE,
+    interval=settings.TRACE_EXPORT_INTERVAL_SECONDS
+)
+
+class TracingMiddleware:
+    """Wraps each HTTP request in a server span
+
+    Continues an incoming ``traceparent`` and returns the trace id in the
+    ``X-Trace-Id`` response header. The span is named after the matched
+    route template once routing has run.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for name, value in scope.get("headers", []):
+            if name == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+
+        with start_span(f"{scope['method']} {scope['path']}", SERVER, traceparent=traceparent) as span:
+            span.set_attribute("http.method", scope["method"])
+            span.set_attribute("http.target", scope["path"])
+
+            async def send_with_trace(message):
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.status = STATUS_ERROR
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-trace-id", span.trace_id.encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_trace)
+            finally:
+                route = scope.get("route")
+                if route is not None:
+                    span.name = f"{scope['method']} {route.path}"
+                    span.set_attribute("http.route", route.path)
@@ -1,38 +1,272 @@
-from sqlalchemy import create_engine, event
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from sqlalchemy.pool import QueuePool
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Generator, Optional, TypeVar
+import asyncio
+import contextvars
+import logging
+import threading
+import time
 
 from app.config import settings
+from app.core.metrics import (
+    DB_POOL_CHECKOUTS, DB_POOL_CONNECTIONS, DB_POOL_WAIT, WRITE_QUEUE_PENDING
+)
+from app.core.query_stats import instrument_engine
+from app.core.tracing import instrument_engine_tracing
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+def sqlite_pragmas(profile: str) -> list:
+    """PRAGMA statements run on every new SQLite connection of a profile"""
+    pragmas = ["PRAGMA foreign_keys=ON"]
+    if profile == "performance":
+        pragmas += [
+            "PRAGMA journal_mode=WAL",
+            # Durable at checkpoints; a power loss can only drop the latest commits
+            "PRAGMA synchronous=NORMAL",
+            f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+            f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}",
+            # Negative sizes are KiB rather than pages
+            f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KB}",
+            "PRAGMA temp_store=MEMORY",
+        ]
+    elif settings.DATABASE_READ_URL:
+        # WAL lets the read pool's connections run alongside writes
+        pragmas.append("PRAGMA journal_mode=WAL")
+    return pragmas
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that reports how long checkouts wait for a connection"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT.labels(self._orig_logging_name or "primary").observe(time.perf_counter() - started)
+
+def build_engine(
+    url: str,
+    read_only: bool = False,
+    sqlite_profile: Optional[str] = None,
+    name: str = "primary"
+) -> Engine:
+    """Engine for ``url``; read-only engines refuse writes on SQLite"""
+    # The name labels the engine's pool metrics and survives pool recreation
+    options = {"pool_logging_name": name}
+    if url.startswith("sqlite"):
+        profile = sqlite_profile or settings.SQLITE_PROFILE
+        if ":memory:" not in url and "mode=memory" not in url:
+            options["poolclass"] = TimedQueuePool
+            if profile == "performance":
+                # Readers never block in WAL, so the pool can cover the threadpool's
+                # concurrent requests instead of queueing them on 5 connections
+                options["pool_size"] = settings.SQLITE_POOL_SIZE
+                options["max_overflow"] = settings.SQLITE_MAX_OVERFLOW
+
+        # SQLite specific settings
+        sqlite_engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False},  # Needed for SQLite
+            **options
+        )
+        pragmas = sqlite_pragmas(profile)
+
+        @event.listens_for(sqlite_engine, "connect")
+        def set_sqlite_pragma(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for pragma in pragmas:
+                cursor.execute(pragma)
+            if read_only:
+                cursor.execute("PRAGMA query_only=ON")
+            cursor.close()
+
+        return sqlite_engine
 
-# Create engine with SQLite-specific settings
-if settings.DATABASE_URL.startswith("sqlite"):
-    # SQLite specific settings
-    engine = create_engine(
-        settings.DATABASE_URL,
-        connect_args={"check_same_thread": False}  # Needed for SQLite
-    )
-    
-    # Enable foreign keys for SQLite
-    @event.listens_for(engine, "connect")
-    def set_sqlite_pragma(dbapi_connection, connection_record):
-        cursor = dbapi_connection.cursor()
-        cursor.execute("PRAGMA foreign_keys=ON")
-        cursor.close()
-else:
     # PostgreSQL, MySQL, etc.
-    engine = create_engine(settings.DATABASE_URL)
+    return create_engine(url, pool_pre_ping=read_only, poolclass=TimedQueuePool, **options)
+
+# Primary: all writes and session lifecycle
+engine = build_engine(settings.DATABASE_URL)
+
+# Read engine: the replica when configured, otherwise the primary itself
+read_engine = (
+    build_engine(settings.DATABASE_READ_URL, read_only=True, name="read")
+    if settings.DATABASE_READ_URL else engine
+)
+
+ENGINES = {"primary": engine}
+if read_engine is not engine:
+    ENGINES["read"] = read_engine
+
+def _count_checkouts(name: str, target: Engine):
+    checkouts = DB_POOL_CHECKOUTS.labels(name)
+
+    @event.listens_for(target, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checkouts.inc()
+
+def _pool_connections():
+    values = {}
+    for name, target in ENGINES.items():
+        pool = target.pool
+        if isinstance(pool, QueuePool):
+            values[(name, "checked_out")] = pool.checkedout()
+            values[(name, "idle")] = pool.checkedin()
+            values[(name, "overflow")] = max(pool.overflow(), 0)
+    return values
+
+for _name, _engine in ENGINES.items():
+    instrument_engine(_engine)
+    instrument_engine_tracing(_engine)
+    _count_checkouts(_name, _engine)
+DB_POOL_CONNECTIONS.set_function(_pool_connections)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 # Create Base class
 Base = declarative_base()
 
+class ReplicaMonitor:
+    """Caches the read engine's replication lag
+
+    Lag is measured at most every ``check_interval`` seconds. ``None`` means
+    the replica is unreachable or not replicating; reads then go to the
+    primary. A SQLite read pool on the primary's own file never lags.
+    """
+
+    def __init__(self, read_engine: Engine, check_interval: float):
+        self.read_engine = read_engine
+        self.check_interval = check_interval
+        self._lag: Optional[float] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def lag_seconds(self) -> Optional[float]:
+        """Last measured lag, refreshed when older than the check interval"""
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            with self._lock:
+                if time.monotonic() - self._checked_at >= self.check_interval:
+                    self._lag = self._measure()
+                    self._checked_at = time.monotonic()
+        return self._lag
+
+    def within(self, max_staleness: float) -> bool:
+        """Whether the replica is fresh enough for a route's tolerance"""
+        lag = self.lag_seconds()
+        return lag is not None and lag <= max_staleness
+
+    def _measure(self) -> Optional[float]:
+        dialect = self.read_engine.dialect.name
+        if dialect == "sqlite":
+            return 0.0
+        try:
+            with self.read_engine.connect() as conn:
+                if dialect == "postgresql":
+                    lag = conn.execute(text(
+                        "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                        "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+                    )).scalar()
+                elif dialect in ("mysql", "mariadb"):
+                    status = conn.execute(text("SHOW REPLICA STATUS")).mappings().first()
+                    if status is None:
+                        return None
+                    lag = status.get("Seconds_Behind_Source", status.get("Seconds_Behind_Master"))
+                else:
+                    lag = 0.0
+            return float(lag) if lag is not None else None
+        except Exception as e:
+            logger.warning(f"Could not measure replica lag: {e}")
+            return None
+
+replica_monitor = ReplicaMonitor(read_engine, settings.DATABASE_REPLICA_LAG_CHECK_SECONDS)
+
+class WriteQueue:
+    """Runs database writes from async code on dedicated writer threads
+
+    ``await write_queue.run(fn)`` calls ``fn(db)`` with a fresh session off
+    the event loop and commits. SQLite allows one writer at a time, so its
+    queue has a single thread: coroutines' writes are serialized in-process
+    instead of racing for the database lock. ``fn`` should return plain
+    values, since its session is closed afterwards.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], workers: int = 1):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.pending = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def run(self, fn: Callable[[Session], T]) -> T:
+        """Run ``fn(db)`` in a write transaction and return its result"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="db-writer")
+        self.pending += 1
+        try:
+            # Carry the caller's context so its query accounting sees the write
+            context = contextvars.copy_context()
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, context.run, self._execute, fn
+            )
+        finally:
+            self.pending -= 1
+
+    def shutdown(self):
+        """Finish queued writes and stop the writer threads"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _execute(self, fn: Callable[[Session], T]) -> T:
+        db = self.session_factory()
+        try:
+            result = fn(db)
+            db.commit()
+            return result
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+write_queue = WriteQueue(SessionLocal, workers=1 if engine.dialect.name == "sqlite" else 4)
+WRITE_QUEUE_PENDING.set_function(lambda: write_queue.pending)
+
 def get_db() -> Generator[Session, None, None]:
     """Dependency to get database session"""
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def get_read_db(route: str) -> Callable[[], Generator[Session, None, None]]:
+    """Dependency factory for read-only sessions of a route group
+
+    Sessions come from the read engine while its lag is within the group's
+    DATABASE_READ_MAX_STALENESS_SECONDS entry, otherwise from the primary.
+    Groups without an entry always read from the primary.
+    """
+    max_staleness = settings.DATABASE_READ_MAX_STALENESS_SECONDS.get(route)
+
+    def dependency() -> Generator[Session, None, None]:
+        use_replica = (
+            read_engine is not engine
+            and max_staleness is not None
+            and replica_monitor.within(max_staleness)
+        )
+        db = ReadSessionLocal() if use_replica else SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    return dependency
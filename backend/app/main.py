@@ -1,70 +1,117 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import logging
 
 from app.config import settings
-from app.database import engine, Base
-from app.api import auth, voice, learning, websocket
+from app.core.loop_monitor import loop_monitor
+from app.core.metrics import REGISTRY, MetricsMiddleware
+from app.core.profiling import ProfilingMiddleware
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.serialization import FastJSONResponse
+from app.core.tracing import TracingMiddleware, span_processor
+from app.database import write_queue
+from app.api import auth, voice, learning, websocket, admin
 from app.api.voice import tutor, language_practice, exam_prep, pronunciation
+from app.services.container import services
+from app.services.jobs import job_runner
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager"""
     logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
+    # Tables come from migrations (alembic upgrade head), not from startup
+    services.warm()
+    await job_runner.start()
+    if settings.LOOP_MONITOR_ENABLED:
+        await loop_monitor.start()
     yield
     logger.info("Shutting down...")
+    await loop_monitor.stop()
+    await job_runner.stop()
+    await services.close()
+    write_queue.shutdown()
+    span_processor.shutdown()
 
-# Create FastAPI app
-app = FastAPI(
-    title=settings.APP_NAME,
-    version=settings.APP_VERSION,
-    lifespan=lifespan,
-    docs_url="/api/docs",
-    redoc_url="/api/redoc"
-)
-
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.CORS_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routers
-app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
-app.include_router(voice.tutor.router, prefix="/api/voice/tutor", tags=["Voice Tutor"])
-app.include_router(voice.language_practice.router, prefix="/api/voice/language", tags=["Language Practice"])
-app.include_router(voice.exam_prep.router, prefix="/api/voice/exam", tags=["Exam Prep"])
-app.include_router(voice.pronunciation.router, prefix="/api/voice/pronunciation", tags=["Pronunciation"])
-app.include_router(learning.sessions.router, prefix="/api/learning/sessions", tags=["Learning Sessions"])
-app.include_router(learning.progress.router, prefix="/api/learning/progress", tags=["Progress"])
-app.include_router(learning.analytics.router, prefix="/api/learning/analytics", tags=["Analytics"])
-app.include_router(websocket.voice_stream.router, prefix="/api/ws", tags=["WebSocket"])
-
-@app.get("/")
-async def root():
-    """Root endpoint"""
-    return {
-        "app": settings.APP_NAME,
-        "version": settings.APP_VERSION,
-        "status": "running",
-        "docs": "/api/docs"
-    }
+def create_app() -> FastAPI:
+    """Build the FastAPI application; services are created in its lifespan"""
+    app = FastAPI(
+        title=settings.APP_NAME,
+        version=settings.APP_VERSION,
+        lifespan=lifespan,
+        default_response_class=FastJSONResponse,
+        docs_url="/api/docs",
+        redoc_url="/api/redoc"
+    )
+    
+    # CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.CORS_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "X-DB-Query-Count", "X-DB-Time-Ms", "X-DB-Slowest-Ms", "Server-Timing", "X-Trace-Id", "X-Profile-Id"],
+    )
+    
+    # Per-request SQL statement accounting
+    app.add_middleware(QueryStatsMiddleware)
+    
+    # Request counts and latency per route
+    app.add_middleware(MetricsMiddleware)
+    
+    # Stack sampling for admin-requested and sampled requests
+    app.add_middleware(ProfilingMiddleware)
+    
+    # Outermost, so every other layer runs inside the request's span
+    app.add_middleware(TracingMiddleware)
+    
+    # Include routers
+    app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
+    app.include_router(voice.tutor.router, prefix="/api/voice/tutor", tags=["Voice Tutor"])
+    app.include_router(voice.language_practice.router, prefix="/api/voice/language", tags=["Language Practice"])
+    app.include_router(voice.exam_prep.router, prefix="/api/voice/exam", tags=["Exam Prep"])
+    app.include_router(voice.pronunciation.router, prefix="/api/voice/pronunciation", tags=["Pronunciation"])
+    app.include_router(learning.sessions.router, prefix="/api/learning/sessions", tags=["Learning Sessions"])
+    app.include_router(learning.progress.router, prefix="/api/learning/progress", tags=["Progress"])
+    app.include_router(learning.analytics.router, prefix="/api/learning/analytics", tags=["Analytics"])
+    app.include_router(learning.export.router, prefix="/api/learning/export", tags=["Export"])
+    app.include_router(websocket.voice_stream.router, prefix="/api/ws", tags=["WebSocket"])
+    app.include_router(admin.jobs.router, prefix="/api/admin/jobs", tags=["Admin"])
+    app.include_router(admin.export.router, prefix="/api/admin/export", tags=["Admin"])
+    app.include_router(admin.profiles.router, prefix="/api/admin/profiles", tags=["Admin"])
+    
+    @app.get("/")
+    async def root():
+        """Root endpoint"""
+        return {
+            "app": settings.APP_NAME,
+            "version": settings.APP_VERSION,
+            "status": "running",
+            "docs": "/api/docs"
+        }
+    
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus metrics"""
+        return PlainTextResponse(
+            await REGISTRY.render(),
+            media_type="text/plain; version=0.0.4"
+        )
+    
+    @app.get("/health")
+    async def health_check():
+        """Health check endpoint"""
+        return {
+            "status": "healthy",
+            "environment": settings.ENVIRONMENT
+        }
+    
+    return app
 
-@app.get("/health")
-async def health_check():
-    """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "environment": settings.ENVIRONMENT
-    }
\ No newline at end of file
+app = create_app()
@@ -1,15 +1,19 @@
 from app.models.user import User
-from app.models.learning_session import LearningSession, SessionType
+from app.models.learning_session import LearningSession, SessionType, SessionConfig
 from app.models.voice_interaction import VoiceInteraction, InteractionType
-from app.models.progress import Progress, Achievement, StudyStreak
+from app.models.progress import Progress, SubjectProgress, Achievement, AchievementCounter, StudyStreak, StudyCheckIn
 
 __all__ = [
     "User",
     "LearningSession",
     "SessionType",
+    "SessionConfig",
     "VoiceInteraction",
     "InteractionType",
     "Progress",
+    "SubjectProgress",
     "Achievement",
-    "StudyStreak"
+    "AchievementCounter",
+    "StudyStreak",
+    "StudyCheckIn"
 ]
\ No newline at end of file
@@ -1,10 +1,11 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, JSON, Enum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, JSON, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from datetime import datetime
 import enum
-import uuid
 
 from app.database import Base
+from app.models.types import CompactUUID, uuid7
 
 class SessionType(str, enum.Enum):
     TUTOR = "tutor"
@@ -17,10 +18,22 @@ class SessionStatus(str, enum.Enum):
     COMPLETED = "completed"
     ABANDONED = "abandoned"
 
+class SessionConfig(Base):
+    """Content-addressed voice session configuration shared across sessions"""
+    __tablename__ = "session_configs"
+    
+    hash = Column(String(64), primary_key=True)
+    config = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
 class LearningSession(Base):
     __tablename__ = "learning_sessions"
+    __table_args__ = (
+        # Keyset pagination of a user's sessions orders by (started_at, id)
+        Index("ix_learning_sessions_user_started", "user_id", "started_at", "id"),
+    )
     
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(CompactUUID, primary_key=True, default=uuid7)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     omnidim_session_id = Column(String, unique=True, nullable=False)
     
@@ -32,7 +45,9 @@ class LearningSession(Base):
     difficulty = Column(String)
     
     # Timing
-    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Set in Python as well so every row is stored in the format bound cursor
+    # values compare against (SQLite's CURRENT_TIMESTAMP drops microseconds)
+    started_at = Column(DateTime(timezone=True), default=datetime.utcnow, server_default=func.now())
     ended_at = Column(DateTime(timezone=True))
     duration_seconds = Column(Integer, default=0)
     
@@ -42,8 +57,11 @@ class LearningSession(Base):
     pronunciation_score = Column(Float)
     comprehension_score = Column(Float)
     
-    # Configuration
+    # Configuration: shared part lives in session_configs, keyed by content
+    # hash; config holds full blobs written before deduplication
     config = Column(JSON)
+    config_hash = Column(String(64), ForeignKey("session_configs.hash"))
+    config_overrides = Column(JSON)
     
     # Relationships
     user = relationship("User", back_populates="learning_sessions")
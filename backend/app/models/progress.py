@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, JSON, Boolean
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Float, JSON, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -22,7 +22,7 @@ class Progress(Base):
     pronunciation_average = Column(Float, default=0.0)
     fluency_average = Column(Float, default=0.0)
     
-    # Subject progress
+    # Legacy per-subject blob, superseded by the subject_progress table
     subject_progress = Column(JSON, default={})
     
     # Level/XP system
@@ -36,8 +36,31 @@ class Progress(Base):
     # Relationships
     user = relationship("User", back_populates="progress")
 
+class SubjectProgress(Base):
+    __tablename__ = "subject_progress"
+    
+    # One row per user and subject, updated with atomic increments
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    subject = Column(String, primary_key=True)
+    
+    total_time = Column(Integer, nullable=False, default=0)  # seconds
+    sessions = Column(Integer, nullable=False, default=0)
+    accuracy_sum = Column(Float, nullable=False, default=0.0)
+    accuracy_count = Column(Integer, nullable=False, default=0)
+    experience_points = Column(Integer, nullable=False, default=0)
+    
+    last_studied_at = Column(DateTime(timezone=True))
+    
+    @property
+    def average_accuracy(self) -> float:
+        return self.accuracy_sum / self.accuracy_count if self.accuracy_count else 0.0
+
 class Achievement(Base):
     __tablename__ = "achievements"
+    __table_args__ = (
+        # Each achievement is awarded at most once per user
+        Index("uq_achievements_user_name", "user_id", "name", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -56,8 +79,22 @@ class Achievement(Base):
     # Relationships
     user = relationship("User", back_populates="achievements")
 
+class AchievementCounter(Base):
+    __tablename__ = "achievement_counters"
+    
+    # Incrementally maintained value an achievement rule is checked against;
+    # daily counters carry the UTC date in their name, e.g. "daily_sessions:2026-10-19"
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    name = Column(String, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True))
+
 class StudyStreak(Base):
     __tablename__ = "study_streaks"
+    __table_args__ = (
+        # Active-streak lookups on every session end
+        Index("ix_study_streaks_user_active", "user_id", "is_active"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -70,4 +107,13 @@ class StudyStreak(Base):
     
     # Freeze protection
     freeze_used = Column(Boolean, default=False)
-    freeze_date = Column(DateTime(timezone=True))
\ No newline at end of file
+    freeze_date = Column(DateTime(timezone=True))
+
+class StudyCheckIn(Base):
+    __tablename__ = "study_check_ins"
+    
+    # A day of study reported by the client rather than by a completed
+    # session; the nightly streak recompute counts both
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,58 @@
+from sqlalchemy.types import TypeDecorator, BINARY, LargeBinary
+from sqlalchemy.dialects import postgresql
+import os
+import time
+import uuid
+
+def uuid7() -> str:
+    """Generate a time-ordered UUID (version 7) as a canonical string
+
+    The leading 48 bits are the Unix time in milliseconds, so keys generated
+    later sort after earlier ones and inserts append to the right edge of the
+    primary key index instead of landing on random pages.
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+
+    value = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= 0x7 << 76                          # version
+    value |= ((rand >> 62) & 0xFFF) << 64
+    value |= 0b10 << 62                         # RFC 4122 variant
+    value |= rand & 0x3FFF_FFFF_FFFF_FFFF
+
+    return str(uuid.UUID(int=value))
+
+class CompactUUID(TypeDecorator):
+    """UUID stored in 16 bytes, exposed to Python as its canonical string
+
+    PostgreSQL uses its native ``uuid`` type, MySQL/MariaDB a ``BINARY(16)``
+    column and SQLite a ``BLOB``. Values that don't parse as UUIDs bind
+    as NULL, so lookups by a malformed id simply match nothing.
+    """
+
+    impl = LargeBinary(16)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=True))
+        if dialect.name in ("mysql", "mariadb"):
+            return dialect.type_descriptor(BINARY(16))
+        return dialect.type_descriptor(LargeBinary(16))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if not isinstance(value, uuid.UUID):
+            try:
+                value = uuid.UUID(str(value))
+            except ValueError:
+                return None
+        return value if dialect.name == "postgresql" else value.bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        return str(uuid.UUID(bytes=bytes(value)))
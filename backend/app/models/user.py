@@ -29,6 +29,8 @@ class User(Base):
     is_active = Column(Boolean, default=True)
     is_premium = Column(Boolean, default=False)
     is_verified = Column(Boolean, default=False)
+    # Granted with scripts/grant_admin.py, never through the API
+    is_admin = Column(Boolean, default=False, server_default="0", nullable=False)
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,9 +1,10 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Text, JSON, Enum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Text, JSON, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
 
 from app.database import Base
+from app.models.types import CompactUUID
 
 class InteractionType(str, enum.Enum):
     USER_SPEECH = "user_speech"
@@ -14,9 +15,16 @@ class InteractionType(str, enum.Enum):
 
 class VoiceInteraction(Base):
     __tablename__ = "voice_interactions"
+    __table_args__ = (
+        # Per-session metrics and per-user daily trends are aggregated on these
+        Index("ix_voice_interactions_session_user", "session_id", "user_id"),
+        Index("ix_voice_interactions_user_timestamp", "user_id", "timestamp"),
+        # Archival and retention scan by age across all users
+        Index("ix_voice_interactions_timestamp", "timestamp"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    session_id = Column(String, ForeignKey("learning_sessions.id"), nullable=False)
+    session_id = Column(CompactUUID, ForeignKey("learning_sessions.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     
     # Interaction details
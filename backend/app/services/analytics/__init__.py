@@ -1,4 +1,6 @@
 from app.services.analytics.voice_metrics import VoiceMetricsAnalyzer
 from app.services.analytics.learning_insights import LearningInsightsService
+from app.services.analytics.interaction_archive import InteractionArchive
+from app.services.analytics.history_export import HistoryExporter
 
-__all__ = ["VoiceMetricsAnalyzer", "LearningInsightsService"]
\ No newline at end of file
+__all__ = ["VoiceMetricsAnalyzer", "LearningInsightsService", "InteractionArchive", "HistoryExporter"]
\ No newline at end of file
@@ -0,0 +1,359 @@
+from typing import Dict, List, Optional, Any, Iterator, Tuple
+from datetime import datetime, timezone
+import csv
+import enum
+import importlib.util
+import io
+import json
+import logging
+import queue
+import threading
+
+from sqlalchemy import select, func, Boolean, DateTime, Float, Integer, JSON
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.learning_session import LearningSession
+from app.models.user import User
+from app.models.voice_interaction import VoiceInteraction
+from app.services.analytics.interaction_archive import InteractionArchive, interaction_archive
+from app.services.omnidim.session_config_store import session_config_store
+
+# Arrow export is optional; pyarrow (and the NumPy it loads) is imported on first use
+ARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+logger = logging.getLogger(__name__)
+
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_TABLES = {
+    "sessions": (
+        LearningSession.__table__,
+        LearningSession.__table__.c.started_at
+    ),
+    "interactions": (
+        VoiceInteraction.__table__,
+        VoiceInteraction.__table__.c.timestamp
+    ),
+}
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+FILE_EXTENSIONS = {"ndjson": "ndjson", "csv": "csv", "arrow": "arrows"}
+
+class HistoryExporter:
+    """Streams users' sessions and voice interactions in bounded memory
+
+    Rows are read with server-side cursors (``yield_per``) in batches of
+    ``batch_size`` and encoded batch by batch as NDJSON, CSV or Arrow IPC.
+    Exports for all users split the user-id space into ranges that worker
+    threads read concurrently; finished batches pass through a bounded queue
+    to the single encoder.
+    """
+
+    def __init__(self, batch_size: int = EXPORT_BATCH_SIZE, archive: InteractionArchive = interaction_archive):
+        self.batch_size = batch_size
+        self.archive = archive
+
+    def validate(self, kind: str, fmt: str):
+        """Raise ValueError for unsupported kind/format combinations"""
+        if kind not in ("all", *EXPORT_TABLES):
+            raise ValueError(f"Unknown export kind: {kind}")
+        if fmt not in MEDIA_TYPES:
+            raise ValueError(f"Unknown export format: {fmt}")
+        if kind == "all" and fmt != "ndjson":
+            raise ValueError("CSV and Arrow exports hold a single kind; choose sessions or interactions")
+        if fmt == "arrow" and not ARROW_AVAILABLE:
+            raise ValueError("Arrow export requires pyarrow to be installed")
+
+    def stream(
+        self,
+        kind: str,
+        fmt: str,
+        user_id: Optional[int] = None,
+        workers: int = 1,
+        include_archived: bool = False
+    ) -> Iterator[bytes]:
+        """Encoded export chunks for one user, or all users when ``user_id`` is None"""
+        self.validate(kind, fmt)
+        kinds = list(EXPORT_TABLES) if kind == "all" else [kind]
+
+        for current in kinds:
+            table = EXPORT_TABLES[current][0]
+            encoder = self._encoder(fmt, table, tagged=kind == "all" and current)
+            header = encoder.header()
+            if header:
+                yield header
+
+            if user_id is not None:
+                batches = self._read_range(current, user_id, user_id + 1, include_archived)
+            else:
+                batches = self._read_parallel(current, workers, include_archived)
+            for batch in batches:
+                yield encoder.encode(batch)
+
+            footer = encoder.footer()
+            if footer:
+                yield footer
+
+    def _encoder(self, fmt: str, table, tagged):
+        if fmt == "csv":
+            return _CsvEncoder(table)
+        if fmt == "arrow":
+            return _ArrowEncoder(table)
+        return _NdjsonEncoder(tagged or None)
+
+    def _read_range(
+        self,
+        kind: str,
+        low: int,
+        high: int,
+        include_archived: bool,
+        stop: Optional[threading.Event] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Batches of rows for users in [low, high), archived rows first"""
+        table, time_column = EXPORT_TABLES[kind]
+        db = SessionLocal()
+        try:
+            if include_archived and kind == "interactions":
+                yield from self._read_archived(db, low, high, stop)
+
+            result = db.execute(
+                select(table)
+                .where(table.c.user_id >= low, table.c.user_id < high)
+                .order_by(table.c.user_id, time_column, table.c.id)
+                .execution_options(yield_per=self.batch_size)
+            )
+            for partition in result.partitions():
+                if stop is not None and stop.is_set():
+                    break
+                records = [_plain(row._mapping) for row in partition]
+                if kind == "sessions":
+                    # Deduplicated sessions keep only a hash; export the full config
+                    for record, row in zip(records, partition):
+                        record["config"] = session_config_store.resolve(db, row)
+                yield records
+        finally:
+            db.close()
+
+    def _read_archived(
+        self,
+        db: Session,
+        low: int,
+        high: int,
+        stop: Optional[threading.Event] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        user_ids = db.execute(
+            select(User.id).where(User.id >= low, User.id < high).order_by(User.id)
+        ).scalars().all()
+        for user_id in user_ids:
+            batch = []
+            for record in self.archive.iter_records(user_id):
+                batch.append(record)
+                if len(batch) == self.batch_size:
+                    if stop is not None and stop.is_set():
+                        return
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+    def _read_parallel(self, kind: str, workers: int, include_archived: bool) -> Iterator[List[Dict[str, Any]]]:
+        db = SessionLocal()
+        try:
+            low, high = db.execute(select(func.min(User.id), func.max(User.id))).one()
+        finally:
+            db.close()
+        if low is None:
+            return
+
+        workers = max(workers, 1)
+        # More ranges than workers so one dense range doesn't hold up the rest
+        range_count = workers * 4
+        span = max((high - low + 1 + range_count - 1) // range_count, 1)
+        ranges: "queue.Queue[Tuple[int, int]]" = queue.Queue()
+        for start in range(low, high + 1, span):
+            ranges.put((start, min(start + span, high + 1)))
+
+        batches: "queue.Queue" = queue.Queue(maxsize=workers * 2)
+        stop = threading.Event()
+        done = object()
+
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def work():
+            try:
+                while not stop.is_set():
+                    try:
+                        start, end = ranges.get_nowait()
+                    except queue.Empty:
+                        break
+                    for batch in self._read_range(kind, start, end, include_archived, stop):
+                        if not put(batch):
+                            return
+            except Exception as e:
+                logger.exception(f"Export worker failed: {e}")
+                put(e)
+            finally:
+                put(done)
+
+        threads = [threading.Thread(target=work, name=f"export-{i}", daemon=True) for i in range(workers)]
+        for thread in threads:
+            thread.start()
+
+        try:
+            finished = 0
+            while finished < workers:
+                item = batches.get()
+                if item is done:
+                    finished += 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            # Also reached when the client disconnects mid-stream
+            stop.set()
+            for thread in threads:
+                thread.join(timeout=5)
+
+def _plain(row) -> Dict[str, Any]:
+    return {
+        key: value.value if isinstance(value, enum.Enum) else value
+        for key, value in row.items()
+    }
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+class _NdjsonEncoder:
+    def __init__(self, record_type: Optional[str] = None):
+        self.record_type = record_type
+
+    def header(self) -> bytes:
+        return b""
+
+    def encode(self, batch: List[Dict[str, Any]]) -> bytes:
+        lines = []
+        for record in batch:
+            if self.record_type:
+                record = {"record_type": self.record_type, **record}
+            lines.append(json.dumps(record, separators=(",", ":"), default=_json_default))
+        return ("\n".join(lines) + "\n").encode() if lines else b""
+
+    def footer(self) -> bytes:
+        return b""
+
+class _CsvEncoder:
+    def __init__(self, table):
+        self.columns = [column.name for column in table.columns]
+        self.json_columns = {column.name for column in table.columns if isinstance(column.type, JSON)}
+
+    def header(self) -> bytes:
+        return self._rows([self.columns])
+
+    def encode(self, batch: List[Dict[str, Any]]) -> bytes:
+        rows = []
+        for record in batch:
+            row = []
+            for name in self.columns:
+                value = record.get(name)
+                if name in self.json_columns and value is not None:
+                    value = json.dumps(value, separators=(",", ":"), default=_json_default)
+                elif isinstance(value, datetime):
+                    value = value.isoformat()
+                row.append(value)
+            rows.append(row)
+        return self._rows(rows)
+
+    def footer(self) -> bytes:
+        return b""
+
+    @staticmethod
+    def _rows(rows) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode()
+
+class _ArrowEncoder:
+    """Arrow IPC stream; each batch becomes one record batch"""
+
+    def __init__(self, table):
+        import pyarrow as pa
+
+        fields = []
+        self.json_columns = set()
+        for column in table.columns:
+            if isinstance(column.type, Integer):
+                arrow_type = pa.int64()
+            elif isinstance(column.type, Float):
+                arrow_type = pa.float64()
+            elif isinstance(column.type, Boolean):
+                arrow_type = pa.bool_()
+            elif isinstance(column.type, DateTime):
+                arrow_type = pa.timestamp("us", tz="UTC") if column.type.timezone else pa.timestamp("us")
+            else:
+                # Strings, enums, ids and JSON (serialized)
+                arrow_type = pa.string()
+                if isinstance(column.type, JSON):
+                    self.json_columns.add(column.name)
+            fields.append(pa.field(column.name, arrow_type))
+        self.schema = pa.schema(fields)
+        self.sink = io.BytesIO()
+        self.writer = None
+
+    def header(self) -> bytes:
+        import pyarrow as pa
+
+        self.writer = pa.ipc.new_stream(self.sink, self.schema)
+        return self._drain()
+
+    def encode(self, batch: List[Dict[str, Any]]) -> bytes:
+        import pyarrow as pa
+
+        columns = {}
+        for field in self.schema:
+            values = [record.get(field.name) for record in batch]
+            if field.name in self.json_columns:
+                values = [
+                    json.dumps(v, separators=(",", ":"), default=_json_default) if v is not None else None
+                    for v in values
+                ]
+            elif pa.types.is_timestamp(field.type):
+                # Archived records carry naive UTC datetimes, live rows may be
+                # aware in any zone; both become naive UTC
+                values = [
+                    v.astimezone(timezone.utc).replace(tzinfo=None)
+                    if isinstance(v, datetime) and v.tzinfo is not None else v
+                    for v in values
+                ]
+            elif pa.types.is_string(field.type):
+                values = [str(v) if v is not None else None for v in values]
+            columns[field.name] = values
+        self.writer.write_batch(pa.RecordBatch.from_pydict(columns, schema=self.schema))
+        return self._drain()
+
+    def footer(self) -> bytes:
+        self.writer.close()
+        return self._drain()
+
+    def _drain(self) -> bytes:
+        data = self.sink.getvalue()
+        self.sink.seek(0)
+        self.sink.truncate()
+        return data
+
+history_exporter = HistoryExporter()
@@ -0,0 +1,260 @@
+from typing import Dict, List, Optional, Any, Iterator, Iterable
+from datetime import datetime, timezone
+from pathlib import Path
+import enum
+import gzip
+import importlib.util
+import io
+import json
+import logging
+import os
+import shutil
+import uuid
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.voice_interaction import VoiceInteraction
+
+logger = logging.getLogger(__name__)
+
+SELECT_BATCH_SIZE = 5000
+DELETE_BATCH_SIZE = 500
+# Partitions with more part files than this are merged into one
+MAX_PARTS_PER_PARTITION = 16
+
+COLUMNS = [column.name for column in VoiceInteraction.__table__.columns]
+
+# Parts are zstd-compressed through pyarrow's codecs, imported on first use;
+# without pyarrow they fall back to gzip. Both kinds are always readable.
+ZSTD_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+PART_PATTERNS = ("part-*.ndjson.zst", "part-*.ndjson.gz")
+
+class InteractionArchive:
+    """Cold storage for old voice interactions
+
+    Rows are written as zstd-compressed NDJSON partitioned by month and
+    user::
+
+        <root>/voice_interactions/month=2026-07/user=42/part-<id>.ndjson.zst
+
+    NDJSON rather than Parquet keeps the JSON columns as they are and lets
+    compaction and reads stream a part at a time. Parts written as gzip
+    (before zstd, or without pyarrow) are read alongside the zstd ones.
+
+    Without a configured root the archive is disabled: nothing is archived
+    and reads find no records.
+
+    A part file is fully written and renamed into place before its rows
+    are deleted from the database, so a crash can at worst archive a row
+    twice; readers drop duplicates. Duplicates are matched on id, session
+    and timestamp together, since SQLite hands the ids of deleted rows out
+    again.
+    """
+
+    def __init__(self, root: Optional[str] = settings.INTERACTION_ARCHIVE_DIR):
+        self.root = Path(root) / "voice_interactions" if root else None
+
+    @property
+    def enabled(self) -> bool:
+        return self.root is not None
+
+    def archive_older_than(self, db: Session, cutoff: datetime, batch_size: int = SELECT_BATCH_SIZE) -> int:
+        """Move interactions with ``timestamp < cutoff`` out of the database"""
+        if not self.enabled:
+            raise RuntimeError("The interaction archive needs INTERACTION_ARCHIVE_DIR to be set")
+        archived = 0
+        while True:
+            rows = db.query(VoiceInteraction).filter(
+                VoiceInteraction.timestamp < cutoff
+            ).order_by(VoiceInteraction.id).limit(batch_size).all()
+            if not rows:
+                break
+
+            partitions: Dict[tuple, List[Dict[str, Any]]] = {}
+            for row in rows:
+                record = self.to_record(row)
+                partitions.setdefault((row.timestamp.strftime("%Y-%m"), row.user_id), []).append(record)
+            ids = [row.id for row in rows]
+            # Release the ORM objects before the bulk deletes below
+            db.expunge_all()
+
+            for (month, user_id), records in partitions.items():
+                self._write_part(month, user_id, records)
+
+            # Small delete transactions keep row locks short on a hot table
+            for start in range(0, len(ids), DELETE_BATCH_SIZE):
+                db.query(VoiceInteraction).filter(
+                    VoiceInteraction.id.in_(ids[start:start + DELETE_BATCH_SIZE])
+                ).delete(synchronize_session=False)
+                db.commit()
+
+            for month, user_id in partitions:
+                self._compact_if_needed(month, user_id)
+            archived += len(ids)
+
+        if archived:
+            logger.info(f"Archived {archived} voice interactions older than {cutoff.isoformat()}")
+        return archived
+
+    def read(
+        self,
+        user_id: int,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        session_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Archived interactions of a user, oldest first"""
+        return list(self.iter_records(user_id, since, until, session_id))
+
+    def iter_records(
+        self,
+        user_id: int,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        session_id: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Same records as ``read``, holding one month partition in memory at a time"""
+        for month_records in self._iter_user_months(user_id, since, until):
+            # A record and its duplicates always share a month partition
+            seen = set()
+            records = []
+            for record in month_records:
+                key = record_key(record)
+                if key in seen:
+                    continue
+                if session_id is not None and record["session_id"] != session_id:
+                    continue
+                timestamp = record["timestamp"]
+                if timestamp is None:
+                    continue
+                if (since and timestamp < since) or (until and timestamp >= until):
+                    continue
+                seen.add(key)
+                records.append(record)
+            records.sort(key=lambda r: (r["timestamp"], r["id"]))
+            yield from records
+
+    def purge_months_before(self, month: str) -> int:
+        """Delete whole month partitions older than ``month`` (YYYY-MM)"""
+        removed = 0
+        if not self.enabled or not self.root.exists():
+            return removed
+        for partition in self.root.glob("month=*"):
+            if partition.name.split("=", 1)[1] < month:
+                shutil.rmtree(partition)
+                removed += 1
+        return removed
+
+    def to_record(self, row: VoiceInteraction) -> Dict[str, Any]:
+        """Archive representation of an interaction row"""
+        record = {}
+        for name in COLUMNS:
+            value = getattr(row, name)
+            if isinstance(value, enum.Enum):
+                value = value.value
+            elif isinstance(value, datetime):
+                value = value.isoformat()
+            record[name] = value
+        return record
+
+    def _partition_dir(self, month: str, user_id: int) -> Path:
+        return self.root / f"month={month}" / f"user={user_id}"
+
+    @staticmethod
+    def _parts(directory: Path) -> List[Path]:
+        return sorted(part for pattern in PART_PATTERNS for part in directory.glob(pattern))
+
+    def _write_part(self, month: str, user_id: int, records: Iterable[Dict[str, Any]]) -> Path:
+        directory = self._partition_dir(month, user_id)
+        directory.mkdir(parents=True, exist_ok=True)
+        suffix = "zst" if ZSTD_AVAILABLE else "gz"
+        final = directory / f"part-{uuid.uuid4().hex}.ndjson.{suffix}"
+        temporary = final.with_name(final.name + ".tmp")
+        lines = (
+            json.dumps(record, separators=(",", ":"), default=str) + "\n"
+            for record in records
+        )
+        if ZSTD_AVAILABLE:
+            import pyarrow as pa
+            with pa.CompressedOutputStream(str(temporary), "zstd") as f:
+                for line in lines:
+                    f.write(line.encode("utf-8"))
+        else:
+            with gzip.open(temporary, "wt", encoding="utf-8") as f:
+                f.writelines(lines)
+        with open(temporary, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(temporary, final)
+        return final
+
+    def _compact_if_needed(self, month: str, user_id: int):
+        directory = self._partition_dir(month, user_id)
+        parts = self._parts(directory)
+        if len(parts) <= MAX_PARTS_PER_PARTITION:
+            return
+
+        merged: Dict[tuple, Dict[str, Any]] = {}
+        for part in parts:
+            for record in self._read_part(part):
+                merged[record_key(record)] = record
+        self._write_part(month, user_id, sorted(merged.values(), key=lambda r: (r["timestamp"] or "", r["id"])))
+        for part in parts:
+            part.unlink()
+
+    def _read_part(self, path: Path) -> Iterator[Dict[str, Any]]:
+        if path.suffix == ".gz":
+            f = gzip.open(path, "rt", encoding="utf-8")
+        else:
+            import pyarrow as pa
+            f = io.TextIOWrapper(pa.CompressedInputStream(str(path), "zstd"), encoding="utf-8")
+        with f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def _iter_user_months(
+        self,
+        user_id: int,
+        since: Optional[datetime],
+        until: Optional[datetime]
+    ) -> Iterator[Iterator[Dict[str, Any]]]:
+        """Per month, oldest first, the records of the user's part files"""
+        if not self.enabled or not self.root.exists():
+            return
+        low = since.strftime("%Y-%m") if since else None
+        high = until.strftime("%Y-%m") if until else None
+        for month_dir in sorted(self.root.glob("month=*")):
+            month = month_dir.name.split("=", 1)[1]
+            if (low and month < low) or (high and month > high):
+                continue
+            parts = self._parts(month_dir / f"user={user_id}")
+            if parts:
+                yield self._iter_parts(parts)
+
+    def _iter_parts(self, parts: List[Path]) -> Iterator[Dict[str, Any]]:
+        for part in parts:
+            for record in self._read_part(part):
+                record["timestamp"] = self._parse_timestamp(record.get("timestamp"))
+                yield record
+
+    @staticmethod
+    def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+        if not value:
+            return None
+        # Compared against naive UTC bounds
+        parsed = datetime.fromisoformat(value)
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed
+
+def record_key(record: Dict[str, Any]) -> tuple:
+    """Identity of an interaction record; the id alone can be reused"""
+    timestamp = record.get("timestamp")
+    if isinstance(timestamp, str):
+        timestamp = InteractionArchive._parse_timestamp(timestamp)
+    elif isinstance(timestamp, datetime) and timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return record["id"], record.get("session_id"), timestamp
+
+interaction_archive = InteractionArchive()
@@ -196,16 +196,42 @@ class LearningInsightsService:
         
         return list(daily_stats.values())
     
-    async def get_voice_models(self, language: Optional[str] = None) -> list:
-        """Get available voice models"""
-        params = {"language": language} if language else {}
-        response = await self._client.get(
-            f"{self.base_url}/voices",
-            params=params
-        )
-        response.raise_for_status()
-        return response.json()["voices"]
+    def _calculate_weekly_progress(self, sessions: List) -> Dict:
+        """Summarize the last seven days of sessions"""
+        week_ago = datetime.utcnow() - timedelta(days=7)
+        week_sessions = [
+            s for s in sessions
+            if s.started_at and s.started_at.replace(tzinfo=None) >= week_ago
+        ]
+        scores = [s.comprehension_score for s in week_sessions if s.comprehension_score]
+        
+        return {
+            "sessions": len(week_sessions),
+            "total_time": sum(s.duration_seconds or 0 for s in week_sessions),
+            "active_days": len(set(s.started_at.date() for s in week_sessions)),
+            "average_score": round(sum(scores) / len(scores), 2) if scores else None
+        }
     
-    async def close(self):
-        """Close the HTTP client"""
-        await self._client.aclose()
\ No newline at end of file
+    def _get_recommendations(self, sessions: List, progress) -> List[str]:
+        """Subjects and skills to focus on, weakest first"""
+        subject_scores = {}
+        for session in sessions:
+            if session.subject and session.comprehension_score is not None:
+                subject_scores.setdefault(session.subject, []).append(session.comprehension_score)
+        
+        averages = {
+            subject: sum(scores) / len(scores)
+            for subject, scores in subject_scores.items()
+        }
+        focus_areas = sorted(
+            (subject for subject, average in averages.items() if average < 0.7),
+            key=averages.get
+        )
+        
+        if progress and progress.total_sessions:
+            if progress.pronunciation_average and progress.pronunciation_average < 0.7:
+                focus_areas.append("pronunciation")
+            if progress.fluency_average and progress.fluency_average < 0.7:
+                focus_areas.append("fluency")
+        
+        return focus_areas
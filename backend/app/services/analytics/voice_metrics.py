@@ -1,91 +1,237 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 import logging
 
 from sqlalchemy.orm import Session
-from app.models.voice_interaction import VoiceInteraction
+from sqlalchemy import func, case, and_
+from app.models.voice_interaction import VoiceInteraction, InteractionType
+from app.services.analytics.interaction_archive import InteractionArchive, interaction_archive
 
 logger = logging.getLogger(__name__)
 
+# Emotions that indicate the learner is losing confidence
+NEGATIVE_EMOTIONS = ["frustrated", "confused", "anxious"]
+
 class VoiceMetricsAnalyzer:
-    """Analyzes voice interaction metrics"""
-    
+    """Analyzes voice interaction metrics
+
+    With ``include_archived`` the metrics also cover interactions already
+    moved to the interaction archive.
+    """
+
+    def __init__(self, archive: InteractionArchive = interaction_archive):
+        self.archive = archive
+
     def calculate_speaking_metrics(
         self,
         user_id: int,
         session_id: str,
-        db: Session
+        db: Session,
+        include_archived: bool = False
     ) -> Dict:
         """Calculate speaking performance metrics"""
-        
-        interactions = db.query(VoiceInteraction).filter(
+
+        filters = and_(
             VoiceInteraction.user_id == user_id,
             VoiceInteraction.session_id == session_id
-        ).all()
-        
-        if not interactions:
+        )
+
+        # Single aggregate row for counts, score sums and speaking time
+        totals = db.query(
+            func.count(VoiceInteraction.id).label("total"),
+            func.sum(VoiceInteraction.pronunciation_score).label("pronunciation_sum"),
+            func.count(VoiceInteraction.pronunciation_score).label("pronunciation_count"),
+            func.sum(VoiceInteraction.fluency_score).label("fluency_sum"),
+            func.count(VoiceInteraction.fluency_score).label("fluency_count"),
+            func.sum(
+                case((VoiceInteraction.emotion.in_(NEGATIVE_EMOTIONS), 1), else_=0)
+            ).label("negative_emotions"),
+            func.sum(
+                case(
+                    (
+                        VoiceInteraction.type == InteractionType.USER_SPEECH,
+                        VoiceInteraction.interaction_metadata["duration_seconds"].as_float()
+                    ),
+                    else_=0
+                )
+            ).label("speaking_time")
+        ).filter(filters).one()
+
+        # One row per emotion bucket
+        emotion_rows = db.query(
+            VoiceInteraction.emotion,
+            func.count(VoiceInteraction.id)
+        ).filter(
+            filters,
+            VoiceInteraction.emotion.isnot(None)
+        ).group_by(VoiceInteraction.emotion).all()
+
+        total = totals.total or 0
+        pronunciation = [totals.pronunciation_sum or 0.0, totals.pronunciation_count or 0]
+        fluency = [totals.fluency_sum or 0.0, totals.fluency_count or 0]
+        negative_emotions = totals.negative_emotions or 0
+        speaking_time = totals.speaking_time or 0.0
+        emotion_distribution = {emotion: count for emotion, count in emotion_rows}
+
+        if include_archived:
+            for record in self.archive.read(user_id, session_id=session_id):
+                total += 1
+                self._accumulate(pronunciation, record.get("pronunciation_score"))
+                self._accumulate(fluency, record.get("fluency_score"))
+                emotion = record.get("emotion")
+                if emotion:
+                    emotion_distribution[emotion] = emotion_distribution.get(emotion, 0) + 1
+                    negative_emotions += emotion in NEGATIVE_EMOTIONS
+                if record.get("type") == InteractionType.USER_SPEECH.value:
+                    speaking_time += (record.get("interaction_metadata") or {}).get("duration_seconds") or 0.0
+
+        if not total:
             return {}
-        
-        # Calculate metrics
-        total_speaking_time = len([i for i in interactions if i.type == "user_speech"])
-        avg_pronunciation = sum(i.pronunciation_score or 0 for i in interactions) / len(interactions)
-        avg_fluency = sum(i.fluency_score or 0 for i in interactions) / len(interactions)
-        
-        emotions = [i.emotion for i in interactions if i.emotion]
-        emotion_distribution = {}
-        for emotion in emotions:
-            emotion_distribution[emotion] = emotion_distribution.get(emotion, 0) + 1
-        
+
+        avg_pronunciation = self._average(pronunciation) or 0.0
+        avg_fluency = self._average(fluency) or 0.0
+
         return {
-            "total_interactions": len(interactions),
-            "speaking_time_seconds": total_speaking_time * 3,  # Rough estimate
+            "total_interactions": total,
+            "speaking_time_seconds": round(speaking_time, 2),
             "average_pronunciation_score": round(avg_pronunciation, 2),
             "average_fluency_score": round(avg_fluency, 2),
             "emotion_distribution": emotion_distribution,
-            "improvement_areas": self._identify_improvement_areas(interactions)
+            "improvement_areas": self._identify_improvement_areas(
+                avg_pronunciation,
+                avg_fluency,
+                negative_emotions,
+                total
+            )
         }
-    
+
     def get_voice_trends(
         self,
         user_id: int,
         days: int,
-        db: Session
+        db: Session,
+        include_archived: bool = False
     ) -> List[Dict]:
         """Get voice performance trends over time"""
-        
+
         since_date = datetime.utcnow() - timedelta(days=days)
-        
-        # This would aggregate actual data
-        # For now, return sample trend data
-        trends = []
-        for i in range(days):
-            date = since_date + timedelta(days=i)
-            trends.append({
-                "date": date.isoformat(),
-                "pronunciation_score": 0.7 + (i * 0.01),
-                "fluency_score": 0.65 + (i * 0.015),
-                "confidence_score": 0.6 + (i * 0.02),
-                "sessions": 1 if i % 2 == 0 else 0
+        day = func.date(VoiceInteraction.timestamp)
+
+        rows = db.query(
+            day.label("day"),
+            func.sum(VoiceInteraction.pronunciation_score).label("pronunciation_sum"),
+            func.count(VoiceInteraction.pronunciation_score).label("pronunciation_count"),
+            func.sum(VoiceInteraction.fluency_score).label("fluency_sum"),
+            func.count(VoiceInteraction.fluency_score).label("fluency_count"),
+            func.sum(VoiceInteraction.emotion_confidence).label("confidence_sum"),
+            func.count(VoiceInteraction.emotion_confidence).label("confidence_count"),
+            func.count(func.distinct(VoiceInteraction.session_id)).label("sessions")
+        ).filter(
+            VoiceInteraction.user_id == user_id,
+            VoiceInteraction.timestamp >= since_date
+        ).group_by(day).all()
+
+        buckets = {}
+        for row in rows:
+            # SQLite returns date() as a string, other backends as a date
+            key = row.day if isinstance(row.day, str) else row.day.isoformat()
+            buckets[key] = {
+                "pronunciation_score": [row.pronunciation_sum or 0.0, row.pronunciation_count],
+                "fluency_score": [row.fluency_sum or 0.0, row.fluency_count],
+                "confidence_score": [row.confidence_sum or 0.0, row.confidence_count],
+                "sessions": row.sessions
+            }
+
+        if include_archived:
+            self._merge_archived_trends(buckets, user_id, since_date, db)
+
+        return [
+            {
+                "date": key,
+                "pronunciation_score": self._round_optional(self._average(bucket["pronunciation_score"])),
+                "fluency_score": self._round_optional(self._average(bucket["fluency_score"])),
+                "confidence_score": self._round_optional(self._average(bucket["confidence_score"])),
+                "sessions": bucket["sessions"]
+            }
+            for key, bucket in sorted(buckets.items())
+        ]
+
+    def _merge_archived_trends(self, buckets: Dict, user_id: int, since_date: datetime, db: Session):
+        """Fold archived interactions into per-day trend buckets"""
+        archived_days: Dict[str, Dict] = {}
+        for record in self.archive.read(user_id, since=since_date):
+            key = record["timestamp"].date().isoformat()
+            bucket = archived_days.setdefault(key, {
+                "pronunciation_score": [0.0, 0],
+                "fluency_score": [0.0, 0],
+                "confidence_score": [0.0, 0],
+                "session_ids": set()
             })
-        
-        return trends
-    
-    def _identify_improvement_areas(self, interactions: List) -> List[str]:
+            self._accumulate(bucket["pronunciation_score"], record.get("pronunciation_score"))
+            self._accumulate(bucket["fluency_score"], record.get("fluency_score"))
+            self._accumulate(bucket["confidence_score"], record.get("emotion_confidence"))
+            bucket["session_ids"].add(record["session_id"])
+
+        # The day at the archive cutoff can be split between both stores
+        overlap = set(archived_days) & set(buckets)
+        live_sessions: Dict[str, set] = {key: set() for key in overlap}
+        if overlap:
+            day = func.date(VoiceInteraction.timestamp)
+            for row_day, session_id in db.query(day, VoiceInteraction.session_id).filter(
+                VoiceInteraction.user_id == user_id,
+                VoiceInteraction.timestamp >= since_date
+            ).distinct():
+                key = row_day if isinstance(row_day, str) else row_day.isoformat()
+                if key in live_sessions:
+                    live_sessions[key].add(session_id)
+
+        for key, archived in archived_days.items():
+            bucket = buckets.setdefault(key, {
+                "pronunciation_score": [0.0, 0],
+                "fluency_score": [0.0, 0],
+                "confidence_score": [0.0, 0],
+                "sessions": 0
+            })
+            for metric in ("pronunciation_score", "fluency_score", "confidence_score"):
+                bucket[metric][0] += archived[metric][0]
+                bucket[metric][1] += archived[metric][1]
+            if key in live_sessions:
+                bucket["sessions"] = len(live_sessions[key] | archived["session_ids"])
+            else:
+                bucket["sessions"] += len(archived["session_ids"])
+
+    @staticmethod
+    def _accumulate(total: List, value: Optional[float]):
+        if value is not None:
+            total[0] += value
+            total[1] += 1
+
+    @staticmethod
+    def _average(total: List) -> Optional[float]:
+        return total[0] / total[1] if total[1] else None
+
+    def _identify_improvement_areas(
+        self,
+        avg_pronunciation: float,
+        avg_fluency: float,
+        negative_emotion_count: int,
+        total_interactions: int
+    ) -> List[str]:
         """Identify areas needing improvement"""
         areas = []
-        
-        avg_pronunciation = sum(i.pronunciation_score or 0 for i in interactions) / len(interactions)
+
         if avg_pronunciation < 0.7:
             areas.append("pronunciation")
-        
-        avg_fluency = sum(i.fluency_score or 0 for i in interactions) / len(interactions)
+
         if avg_fluency < 0.7:
             areas.append("fluency")
-        
+
         # Check for frequent negative emotions
-        negative_emotions = ["frustrated", "confused", "anxious"]
-        emotion_count = sum(1 for i in interactions if i.emotion in negative_emotions)
-        if emotion_count > len(interactions) * 0.3:
+        if negative_emotion_count > total_interactions * 0.3:
             areas.append("confidence")
-        
-        return areas
\ No newline at end of file
+
+        return areas
+
+    @staticmethod
+    def _round_optional(value: Optional[float]) -> Optional[float]:
+        return round(value, 2) if value is not None else None
@@ -0,0 +1,50 @@
+from functools import cached_property
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Services:
+    """Shared services that hold Omnidim clients, built on first use
+
+    Routers reach them through the ``services`` singleton rather than
+    module-level instances, so importing the app builds nothing. The app
+    lifespan calls ``warm()`` before serving and ``close()`` on shutdown.
+    """
+
+    NAMES = ("session_manager", "speech_analyzer", "voice_stream_handler")
+
+    @cached_property
+    def session_manager(self):
+        from app.services.omnidim.voice_session import VoiceSessionManager
+        return VoiceSessionManager()
+
+    @cached_property
+    def speech_analyzer(self):
+        from app.services.omnidim.speech_analysis import SpeechAnalyzer
+        return SpeechAnalyzer()
+
+    @cached_property
+    def voice_stream_handler(self):
+        from app.api.websocket.voice_stream_handler import VoiceStreamHandler
+        return VoiceStreamHandler()
+
+    def warm(self):
+        """Build every service now instead of on the first request using it"""
+        for name in self.NAMES:
+            getattr(self, name)
+
+    async def close(self):
+        """Close the services built so far, or else their Omnidim clients"""
+        built = [self.__dict__.pop(name) for name in self.NAMES if name in self.__dict__]
+        for service in built:
+            closer = service if hasattr(service, "close") else (
+                getattr(service, "client", None) or getattr(service, "omnidim_client", None)
+            )
+            if closer is None:
+                continue
+            try:
+                await closer.close()
+            except Exception as e:
+                logger.warning(f"Failed to close {type(service).__name__}: {e}")
+
+services = Services()
@@ -0,0 +1,21 @@
+from app.services.jobs.broker import Broker, InMemoryBroker, RedisBroker, get_broker
+from app.services.jobs.cron import CronSchedule
+from app.services.jobs.leader import SchedulerLock
+from app.services.jobs.registry import JobSpec, job, job_registry
+from app.services.jobs.runner import JobRunner, job_runner
+from app.services.jobs import tasks
+
+__all__ = [
+    "Broker",
+    "InMemoryBroker",
+    "RedisBroker",
+    "get_broker",
+    "CronSchedule",
+    "SchedulerLock",
+    "JobSpec",
+    "job",
+    "job_registry",
+    "JobRunner",
+    "job_runner",
+    "tasks"
+]
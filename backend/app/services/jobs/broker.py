@@ -0,0 +1,120 @@
+from typing import Dict, Optional, Any
+from abc import ABC, abstractmethod
+import asyncio
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class Broker(ABC):
+    """Transport for job messages between schedulers and workers
+
+    Besides the queue itself a broker stores idempotency keys, so that a
+    key claimed by one process is seen by every other process sharing the
+    broker.
+    """
+
+    @abstractmethod
+    async def publish(self, message: Dict[str, Any]):
+        ...
+
+    @abstractmethod
+    async def consume(self, timeout: float = 1.0) -> Optional[Dict[str, Any]]:
+        """Next message, or None if nothing arrived within ``timeout`` seconds"""
+
+    @abstractmethod
+    async def depth(self) -> int:
+        ...
+
+    @abstractmethod
+    async def claim(self, key: str, ttl_seconds: int) -> bool:
+        """Record an idempotency key; False if it is already held"""
+
+    @abstractmethod
+    async def release(self, key: str):
+        ...
+
+    async def close(self):
+        pass
+
+class InMemoryBroker(Broker):
+    """Process-local stand-in broker
+
+    Only workers running inside the same process see its messages, which is
+    what the in-process runner uses in development and tests.
+    """
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._keys: Dict[str, float] = {}
+
+    @property
+    def queue(self) -> asyncio.Queue:
+        # Created lazily so it binds to the running event loop
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        return self._queue
+
+    async def publish(self, message: Dict[str, Any]):
+        await self.queue.put(message)
+
+    async def consume(self, timeout: float = 1.0) -> Optional[Dict[str, Any]]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def depth(self) -> int:
+        return self.queue.qsize()
+
+    async def claim(self, key: str, ttl_seconds: int) -> bool:
+        now = time.monotonic()
+        expires = self._keys.get(key)
+        if expires is not None and expires > now:
+            return False
+        self._keys[key] = now + ttl_seconds
+        if len(self._keys) > 10000:
+            self._keys = {k: v for k, v in self._keys.items() if v > now}
+        return True
+
+    async def release(self, key: str):
+        self._keys.pop(key, None)
+
+class RedisBroker(Broker):
+    """Redis list-backed broker shared by the API and worker processes"""
+
+    def __init__(self, url: str, queue_name: str = "zenith:jobs"):
+        import redis.asyncio as redis
+
+        self.redis = redis.from_url(url)
+        self.queue_name = queue_name
+
+    async def publish(self, message: Dict[str, Any]):
+        await self.redis.lpush(self.queue_name, json.dumps(message, default=str))
+
+    async def consume(self, timeout: float = 1.0) -> Optional[Dict[str, Any]]:
+        item = await self.redis.brpop(self.queue_name, timeout=max(int(timeout), 1))
+        if item is None:
+            return None
+        return json.loads(item[1])
+
+    async def depth(self) -> int:
+        return await self.redis.llen(self.queue_name)
+
+    async def claim(self, key: str, ttl_seconds: int) -> bool:
+        return bool(await self.redis.set(f"{self.queue_name}:key:{key}", 1, nx=True, ex=ttl_seconds))
+
+    async def release(self, key: str):
+        await self.redis.delete(f"{self.queue_name}:key:{key}")
+
+    async def close(self):
+        await self.redis.close()
+
+def get_broker(url: str) -> Broker:
+    """Broker for a ``memory://`` or ``redis://`` URL"""
+    if url.startswith("memory://"):
+        return InMemoryBroker()
+    if url.startswith(("redis://", "rediss://")):
+        return RedisBroker(url)
+    raise ValueError(f"Unsupported job broker URL: {url}")
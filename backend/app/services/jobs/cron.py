@@ -0,0 +1,98 @@
+from typing import List, Set
+from datetime import datetime, timedelta
+
+# (lowest, highest) value for minute, hour, day of month, month, day of week
+FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]
+
+ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@nightly": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+}
+
+class CronSchedule:
+    """Five-field cron expression (minute hour day-of-month month day-of-week)
+
+    Supports ``*``, lists, ranges and steps (``*/15``, ``1-5``, ``0,30``,
+    ``10-40/10``) plus the ``@hourly``/``@daily``/``@weekly``/``@monthly``
+    aliases. Day of week is 0-6 with 0 as Sunday (7 is accepted too). Times
+    are naive UTC.
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        fields = ALIASES.get(expression.strip(), expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+
+        parsed = [self._parse_field(f, low, high) for f, (low, high) in zip(fields, FIELD_RANGES)]
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        self.weekdays = {0 if d == 7 else d for d in weekdays}
+        # Standard cron: when both day fields are restricted, either may match
+        self._days_restricted = fields[2] != "*"
+        self._weekdays_restricted = fields[4] != "*"
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int) -> Set[int]:
+        values: Set[int] = set()
+        for part in field.split(","):
+            step = 1
+            if "/" in part:
+                part, step_text = part.split("/", 1)
+                step = int(step_text)
+                if step < 1:
+                    raise ValueError(f"Invalid cron step: {field!r}")
+            if part == "*":
+                start, end = low, high
+            elif "-" in part:
+                start_text, end_text = part.split("-", 1)
+                start, end = int(start_text), int(end_text)
+            else:
+                start = int(part)
+                end = high if step > 1 else start
+            # Day of week accepts 7 as Sunday
+            upper = 7 if (low, high) == (0, 6) else high
+            if start < low or end > upper or start > end:
+                raise ValueError(f"Cron field out of range: {field!r}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        if self._days_restricted and self._weekdays_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, moment: datetime) -> datetime:
+        """First matching minute strictly after ``moment``"""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # Bounded search: every valid expression matches within a few years
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                year = candidate.year + (candidate.month == 12)
+                month = candidate.month % 12 + 1
+                candidate = candidate.replace(year=year, month=month, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+                continue
+            if candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+                continue
+            return candidate
+        raise ValueError(f"Cron expression never matches: {self.expression!r}")
+
+    def upcoming(self, moment: datetime, count: int) -> List[datetime]:
+        """The next ``count`` run times after ``moment``"""
+        times = []
+        for _ in range(count):
+            moment = self.next_after(moment)
+            times.append(moment)
+        return times
@@ -0,0 +1,53 @@
+from typing import Optional
+import logging
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows: one process is assumed to schedule
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+class SchedulerLock:
+    """Elects the one process on a host that enqueues periodic jobs
+
+    Every uvicorn worker starts a job runner. With the in-memory broker each
+    of them would run every scheduled job itself, so only the holder of an
+    exclusive lock on ``path`` enqueues them; the OS drops the lock when the
+    holder exits and another process takes it on its next scheduler tick.
+    Processes on other hosts share a broker, whose idempotency keys keep
+    each run single. ``path=None`` makes every process a leader.
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def acquire(self) -> bool:
+        """Try to become (or stay) the leader without blocking"""
+        if self.path is None or fcntl is None:
+            return True
+        if self._fd is not None:
+            return True
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        logger.info(f"Process {os.getpid()} now schedules the periodic jobs")
+        return True
+
+    def release(self):
+        if self._fd is None:
+            return
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        os.close(self._fd)
+        self._fd = None
@@ -0,0 +1,45 @@
+from typing import Dict, Optional, Callable
+from dataclasses import dataclass
+
+from app.services.jobs.cron import CronSchedule
+
+@dataclass
+class JobSpec:
+    name: str
+    func: Callable
+    # Cron expression for periodic jobs, None for on-demand jobs
+    schedule: Optional[CronSchedule] = None
+    # Runs of this job allowed at once within a process
+    max_concurrency: int = 1
+    timeout_seconds: Optional[float] = None
+    # How long an idempotency key blocks duplicates
+    idempotency_ttl_seconds: int = 3600
+    # Needs state of the API process (live sessions); never sent to the broker
+    local_only: bool = False
+
+job_registry: Dict[str, JobSpec] = {}
+
+def job(
+    name: Optional[str] = None,
+    schedule: Optional[str] = None,
+    max_concurrency: int = 1,
+    timeout_seconds: Optional[float] = None,
+    idempotency_ttl_seconds: int = 3600,
+    local_only: bool = False
+):
+    """Register a function (sync or async) as a job"""
+    def decorator(func: Callable) -> Callable:
+        job_name = name or func.__name__
+        if job_name in job_registry:
+            raise ValueError(f"Job {job_name} registered twice")
+        job_registry[job_name] = JobSpec(
+            name=job_name,
+            func=func,
+            schedule=CronSchedule(schedule) if schedule else None,
+            max_concurrency=max_concurrency,
+            timeout_seconds=timeout_seconds,
+            idempotency_ttl_seconds=idempotency_ttl_seconds,
+            local_only=local_only
+        )
+        return func
+    return decorator
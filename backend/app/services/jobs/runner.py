@@ -0,0 +1,258 @@
+from typing import Dict, List, Optional, Any
+from dataclasses import dataclass, asdict
+from datetime import datetime
+import asyncio
+import inspect
+import logging
+import time
+import uuid
+
+from app.config import settings
+from app.core.metrics import JOB_QUEUE_DEPTH, JOBS_RUNNING, REGISTRY
+from app.services.jobs.broker import Broker, get_broker
+from app.services.jobs.leader import SchedulerLock
+from app.services.jobs.registry import JobSpec, job_registry
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class JobStats:
+    enqueued: int = 0
+    duplicates: int = 0
+    started: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    timed_out: int = 0
+    running: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    last_started_at: Optional[str] = None
+    last_finished_at: Optional[str] = None
+    last_error: Optional[str] = None
+
+class JobRunner:
+    """Schedules, queues and executes registered jobs
+
+    The scheduler loop enqueues periodic jobs when their cron time comes up,
+    keyed by job name and scheduled minute so several API processes sharing
+    a broker enqueue each run once. With a ``scheduler_lock`` only the
+    process holding it enqueues shared jobs; ``local_only`` jobs work on
+    per-process state and are scheduled in every process. Worker tasks consume the broker and run
+    jobs, holding a per-job semaphore; sync jobs run in a thread so they
+    don't block the event loop. A sync job past its timeout is reported as
+    timed out but keeps its slot until the thread returns, since threads
+    can't be stopped. ``workers=0`` leaves execution to separate
+    worker processes (``python -m app.services.jobs.worker``).
+    """
+
+    def __init__(
+        self,
+        broker: Broker,
+        registry: Dict[str, JobSpec] = job_registry,
+        workers: int = 2,
+        scheduler_enabled: bool = True,
+        scheduler_lock: Optional[SchedulerLock] = None
+    ):
+        self.broker = broker
+        self.registry = registry
+        self.workers = workers
+        self.scheduler_enabled = scheduler_enabled
+        self.scheduler_lock = scheduler_lock
+        self.stats: Dict[str, JobStats] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = asyncio.Event()
+
+    async def start(self):
+        """Start the scheduler loop and worker tasks"""
+        self._stopping.clear()
+        if self.scheduler_enabled:
+            self._tasks.append(asyncio.create_task(self._schedule_loop(), name="jobs-scheduler"))
+        for i in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._worker_loop(), name=f"jobs-worker-{i}"))
+        logger.info(
+            f"Job runner started: {len(self.registry)} jobs, {self.workers} workers, "
+            f"scheduler {'on' if self.scheduler_enabled else 'off'}"
+        )
+
+    async def stop(self):
+        """Stop the loops; running jobs are cancelled"""
+        self._stopping.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self.scheduler_lock:
+            self.scheduler_lock.release()
+        await self.broker.close()
+
+    async def enqueue(
+        self,
+        name: str,
+        kwargs: Optional[Dict[str, Any]] = None,
+        idempotency_key: Optional[str] = None
+    ) -> Optional[str]:
+        """Queue a job run; returns its message id, or None for a duplicate key"""
+        spec = self._spec(name)
+        stats = self._stats(name)
+
+        if idempotency_key and not await self.broker.claim(
+            f"{name}:{idempotency_key}", spec.idempotency_ttl_seconds
+        ):
+            stats.duplicates += 1
+            logger.debug(f"Skipping duplicate job {name} ({idempotency_key})")
+            return None
+
+        message = {
+            "id": uuid.uuid4().hex,
+            "job": name,
+            "kwargs": kwargs or {},
+            "idempotency_key": idempotency_key,
+            "enqueued_at": datetime.utcnow().isoformat()
+        }
+        stats.enqueued += 1
+
+        if spec.local_only:
+            # Must run next to the state it works on
+            self._tasks = [task for task in self._tasks if not task.done()]
+            self._tasks.append(asyncio.create_task(self.execute(message)))
+        else:
+            await self.broker.publish(message)
+        return message["id"]
+
+    async def execute(self, message: Dict[str, Any]) -> bool:
+        """Run one job message under its concurrency limit and timeout"""
+        name = message["job"]
+        spec = self.registry.get(name)
+        if spec is None:
+            logger.error(f"Dropping message for unknown job {name}")
+            return False
+
+        stats = self._stats(name)
+        thread: Optional[asyncio.Future] = None
+        async with self._semaphore(spec):
+            stats.started += 1
+            stats.running += 1
+            stats.last_started_at = datetime.utcnow().isoformat()
+            started = time.perf_counter()
+            try:
+                if inspect.iscoroutinefunction(spec.func):
+                    call = spec.func(**message["kwargs"])
+                else:
+                    # A thread can't be cancelled; shielded so a timeout leaves it to finish
+                    thread = asyncio.ensure_future(asyncio.to_thread(spec.func, **message["kwargs"]))
+                    call = asyncio.shield(thread)
+                await asyncio.wait_for(call, spec.timeout_seconds)
+                stats.succeeded += 1
+                return True
+            except asyncio.TimeoutError:
+                stats.timed_out += 1
+                stats.last_error = f"Timed out after {spec.timeout_seconds}s"
+                logger.error(f"Job {name} timed out")
+                if thread is not None:
+                    await self._wait_for_thread(name, thread)
+                # The run may have done part of its work; its key stays claimed
+                # so a retry can't overlap it
+                return False
+            except Exception as e:
+                stats.failed += 1
+                stats.last_error = str(e)
+                logger.exception(f"Job {name} failed: {e}")
+            finally:
+                elapsed = time.perf_counter() - started
+                stats.running -= 1
+                stats.total_seconds += elapsed
+                stats.max_seconds = max(stats.max_seconds, elapsed)
+                stats.last_finished_at = datetime.utcnow().isoformat()
+
+        # Failed runs give their idempotency key back so they can be retried
+        if message.get("idempotency_key"):
+            await self.broker.release(f"{name}:{message['idempotency_key']}")
+        return False
+
+    async def _wait_for_thread(self, name: str, thread: asyncio.Future):
+        """Hold the job's slot until a timed out sync job's thread really ends"""
+        logger.warning(f"Job {name} is still running in its thread; waiting for it before freeing its slot")
+        try:
+            await thread
+        except Exception as e:
+            logger.error(f"Timed out job {name} failed after all: {e}")
+
+    async def metrics(self) -> Dict[str, Any]:
+        """Runtime counters per job plus the broker queue depth"""
+        jobs = {}
+        for name, spec in self.registry.items():
+            stats = asdict(self._stats(name))
+            finished = stats["succeeded"] + stats["failed"] + stats["timed_out"]
+            stats["average_seconds"] = round(stats["total_seconds"] / finished, 4) if finished else None
+            stats["max_concurrency"] = spec.max_concurrency
+            stats["schedule"] = spec.schedule.expression if spec.schedule else None
+            jobs[name] = stats
+        return {"queue_depth": await self.broker.depth(), "workers": self.workers, "jobs": jobs}
+
+    async def _schedule_loop(self):
+        next_runs = {
+            name: spec.schedule.next_after(datetime.utcnow())
+            for name, spec in self.registry.items() if spec.schedule
+        }
+        while not self._stopping.is_set():
+            await self._enqueue_due(next_runs, datetime.utcnow())
+            wake = min(next_runs.values(), default=None)
+            delay = (wake - datetime.utcnow()).total_seconds() if wake else 60
+            try:
+                await asyncio.wait_for(self._stopping.wait(), max(min(delay, 60), 0.5))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _enqueue_due(self, next_runs: Dict[str, datetime], now: datetime):
+        """Enqueue the jobs whose scheduled time has come and move them on"""
+        leader = self.scheduler_lock is None or self.scheduler_lock.acquire()
+        for name, due in next_runs.items():
+            if due > now:
+                continue
+            spec = self.registry[name]
+            if leader or spec.local_only:
+                try:
+                    await self.enqueue(name, idempotency_key=due.strftime("%Y-%m-%dT%H:%M"))
+                except Exception as e:
+                    logger.error(f"Could not enqueue scheduled job {name}: {e}")
+            next_runs[name] = spec.schedule.next_after(now)
+
+    async def _worker_loop(self):
+        while not self._stopping.is_set():
+            try:
+                message = await self.broker.consume(timeout=1.0)
+            except Exception as e:
+                logger.error(f"Job broker error: {e}")
+                await asyncio.sleep(1)
+                continue
+            if message is not None:
+                await self.execute(message)
+
+    def _spec(self, name: str) -> JobSpec:
+        if name not in self.registry:
+            raise KeyError(f"Unknown job: {name}")
+        return self.registry[name]
+
+    def _stats(self, name: str) -> JobStats:
+        if name not in self.stats:
+            self.stats[name] = JobStats()
+        return self.stats[name]
+
+    def _semaphore(self, spec: JobSpec) -> asyncio.Semaphore:
+        if spec.name not in self._semaphores:
+            self._semaphores[spec.name] = asyncio.Semaphore(spec.max_concurrency)
+        return self._semaphores[spec.name]
+
+job_runner = JobRunner(
+    get_broker(settings.JOB_BROKER_URL),
+    workers=settings.JOB_WORKERS,
+    scheduler_enabled=settings.JOB_SCHEDULER_ENABLED,
+    scheduler_lock=SchedulerLock(settings.JOB_SCHEDULER_LOCK_FILE)
+)
+
+async def _collect_job_metrics():
+    JOB_QUEUE_DEPTH.set(await job_runner.broker.depth())
+
+REGISTRY.add_collector(_collect_job_metrics)
+JOBS_RUNNING.set_function(lambda: {(name,): stats.running for name, stats in job_runner.stats.items()})
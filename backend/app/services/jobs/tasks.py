@@ -0,0 +1,129 @@
+from datetime import datetime, timedelta
+import asyncio
+import logging
+
+from sqlalchemy import bindparam, func
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.progress import Progress
+from app.models.voice_interaction import VoiceInteraction
+from app.services.analytics.interaction_archive import interaction_archive
+from app.services.jobs.registry import job
+from app.services.learning.achievement_engine import AchievementEngine
+from app.services.learning.streak_engine import StreakEngine
+from app.services.omnidim.voice_session import VoiceSessionManager
+
+logger = logging.getLogger(__name__)
+
+PURGE_BATCH_SIZE = 5000
+
+@job(schedule="30 0 * * *", timeout_seconds=3 * 3600)
+def recompute_streaks(chunk_size: int = 10000):
+    """Nightly rebuild of streaks, freezes and StudyStreak rows"""
+    db = SessionLocal()
+    try:
+        return StreakEngine().recompute_all(db, chunk_size=chunk_size)
+    finally:
+        db.close()
+
+@job(schedule="45 0 * * *")
+def prune_achievement_counters(keep_days: int = 2):
+    """Drop daily achievement counters for days that can no longer change"""
+    db = SessionLocal()
+    try:
+        before = datetime.utcnow().date() - timedelta(days=keep_days)
+        pruned = AchievementEngine().prune_daily_counters(db, before)
+        db.commit()
+        logger.info(f"Pruned {pruned} daily achievement counters")
+        return pruned
+    finally:
+        db.close()
+
+@job(schedule="0 1 * * *", timeout_seconds=3600)
+def rollup_voice_averages():
+    """Roll per-user pronunciation and fluency averages up into progress"""
+    db = SessionLocal()
+    try:
+        rows = db.query(
+            VoiceInteraction.user_id,
+            func.avg(VoiceInteraction.pronunciation_score),
+            func.avg(VoiceInteraction.fluency_score)
+        ).group_by(VoiceInteraction.user_id).all()
+
+        updates = [
+            {"uid": user_id, "pronunciation": pronunciation or 0.0, "fluency": fluency or 0.0}
+            for user_id, pronunciation, fluency in rows
+            if pronunciation is not None or fluency is not None
+        ]
+        if updates:
+            table = Progress.__table__
+            db.execute(
+                table.update()
+                .where(table.c.user_id == bindparam("uid"))
+                .values(
+                    pronunciation_average=bindparam("pronunciation"),
+                    fluency_average=bindparam("fluency")
+                ),
+                updates
+            )
+        db.commit()
+        logger.info(f"Rolled up voice averages for {len(updates)} users")
+        return len(updates)
+    finally:
+        db.close()
+
+@job(schedule="*/15 * * * *", local_only=True)
+async def reap_expired_sessions(max_duration_hours: int = settings.SESSION_MAX_DURATION_HOURS):
+    """End sessions that ran too long, in memory and in the database"""
+    for manager in list(VoiceSessionManager.instances):
+        await manager.cleanup_expired_sessions(max_duration_hours)
+    return await asyncio.to_thread(VoiceSessionManager.reap_stale_sessions, max_duration_hours)
+
+@job(schedule="30 2 * * *", timeout_seconds=3 * 3600)
+def archive_old_interactions(archive_after_days: int = settings.INTERACTION_ARCHIVE_AFTER_DAYS):
+    """Move old voice interactions into the compressed interaction archive"""
+    if archive_after_days <= 0 or not interaction_archive.enabled:
+        return 0
+
+    db = SessionLocal()
+    try:
+        cutoff = datetime.utcnow() - timedelta(days=archive_after_days)
+        return interaction_archive.archive_older_than(db, cutoff)
+    finally:
+        db.close()
+
+@job(schedule="0 3 * * *", timeout_seconds=3 * 3600)
+def purge_old_interactions(retention_days: int = settings.VOICE_INTERACTION_RETENTION_DAYS):
+    """Delete voice interactions past the retention window, live and archived"""
+    if retention_days <= 0:
+        return 0
+
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    purged = 0
+    db = SessionLocal()
+    try:
+        while True:
+            # Short transactions keep locks brief on a busy table
+            ids = [
+                row[0] for row in db.query(VoiceInteraction.id)
+                .filter(VoiceInteraction.timestamp < cutoff)
+                .limit(PURGE_BATCH_SIZE)
+            ]
+            if not ids:
+                break
+            db.query(VoiceInteraction).filter(
+                VoiceInteraction.id.in_(ids)
+            ).delete(synchronize_session=False)
+            db.commit()
+            purged += len(ids)
+    finally:
+        db.close()
+
+    # Archive partitions are dropped a whole month at a time
+    months = interaction_archive.purge_months_before(cutoff.strftime("%Y-%m"))
+    logger.info(
+        f"Purged {purged} voice interactions and {months} archived months "
+        f"older than {retention_days} days"
+    )
+    return purged
@@ -0,0 +1,55 @@
+"""Standalone job worker process
+
+Consumes jobs from the shared broker (JOB_BROKER_URL must point at Redis)
+without serving HTTP:
+
+    python -m app.services.jobs.worker --concurrency 4
+"""
+
+import argparse
+import asyncio
+import logging
+import signal
+
+from app.config import settings
+from app.services.jobs import tasks  # noqa: F401 - registers the jobs
+from app.services.jobs.broker import InMemoryBroker, get_broker
+from app.services.jobs.leader import SchedulerLock
+from app.services.jobs.runner import JobRunner
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+async def run(concurrency: int, with_scheduler: bool):
+    broker = get_broker(settings.JOB_BROKER_URL)
+    if isinstance(broker, InMemoryBroker):
+        logger.warning("JOB_BROKER_URL is memory://; this worker only sees jobs it schedules itself")
+
+    runner = JobRunner(
+        broker,
+        workers=concurrency,
+        scheduler_enabled=with_scheduler,
+        scheduler_lock=SchedulerLock(settings.JOB_SCHEDULER_LOCK_FILE)
+    )
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await runner.start()
+    await stop.wait()
+    logger.info("Stopping job worker...")
+    await runner.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Zenith Study Buddy job worker")
+    parser.add_argument("--concurrency", type=int, default=4, help="Jobs run at once")
+    parser.add_argument(
+        "--with-scheduler", action="store_true",
+        help="Also enqueue periodic jobs (when the API runs with JOB_SCHEDULER_ENABLED=false)"
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args.concurrency, args.with_scheduler))
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,8 @@
 from app.services.learning.adaptive_engine import AdaptiveEngine
 from app.services.learning.content_generator import ContentGenerator
 from app.services.learning.spaced_repetition import SpacedRepetitionEngine
+from app.services.learning.progress_tracker import ProgressTracker
+from app.services.learning.streak_engine import StreakEngine
+from app.services.learning.achievement_engine import AchievementEngine
 
-__all__ = ["AdaptiveEngine", "ContentGenerator", "SpacedRepetitionEngine"]
\ No newline at end of file
+__all__ = ["AdaptiveEngine", "ContentGenerator", "SpacedRepetitionEngine", "ProgressTracker", "StreakEngine", "AchievementEngine"]
\ No newline at end of file
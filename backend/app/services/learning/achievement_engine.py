@@ -0,0 +1,404 @@
+from typing import Dict, List, Optional, Any, Callable, Iterable, Tuple
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, date
+from enum import Enum
+import bisect
+import logging
+
+from sqlalchemy import case, func, or_
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.learning_session import LearningSession, SessionStatus
+from app.models.progress import Progress, Achievement, AchievementCounter
+from app.models.user import User
+from app.models.voice_interaction import VoiceInteraction, InteractionType
+
+logger = logging.getLogger(__name__)
+
+AWARD_BATCH_SIZE = 500
+HIGH_PRONUNCIATION_SCORE = 0.9
+
+class EventType(Enum):
+    SESSION_END = "session_end"
+    INTERACTION = "interaction"
+    STREAK = "streak"
+
+@dataclass
+class LearningEvent:
+    type: EventType
+    user_id: int
+    data: Dict[str, Any] = field(default_factory=dict)
+    occurred_at: datetime = field(default_factory=datetime.utcnow)
+
+@dataclass
+class CounterSpec:
+    name: str
+    event: EventType
+    # Amount one event contributes; 0 leaves the counter untouched
+    extract: Callable[[Dict[str, Any]], int]
+    # "sum" adds amounts, "max" keeps the highest value reported
+    mode: str = "sum"
+    # Daily counters are stored per UTC day
+    daily: bool = False
+
+@dataclass
+class AchievementRule:
+    name: str
+    description: str
+    icon: str
+    counter: str
+    threshold: int
+    category: str = "general"
+
+COUNTERS = [
+    CounterSpec("sessions_completed", EventType.SESSION_END, lambda d: 1),
+    CounterSpec("daily_sessions", EventType.SESSION_END, lambda d: 1, daily=True),
+    CounterSpec(
+        "study_minutes", EventType.SESSION_END,
+        lambda d: max(d.get("duration_seconds") or 0, 0) // 60
+    ),
+    CounterSpec(
+        "voice_interactions", EventType.INTERACTION,
+        lambda d: 1 if d.get("type") == InteractionType.USER_SPEECH else 0
+    ),
+    CounterSpec(
+        "high_pronunciation", EventType.INTERACTION,
+        lambda d: 1 if (d.get("pronunciation_score") or 0) >= HIGH_PRONUNCIATION_SCORE else 0
+    ),
+    CounterSpec(
+        "longest_streak", EventType.STREAK,
+        lambda d: d.get("current_streak") or 0, mode="max"
+    ),
+]
+
+ACHIEVEMENT_RULES = [
+    AchievementRule("First Steps", "Complete your first learning session", "🎯", "sessions_completed", 1),
+    AchievementRule("Knowledge Seeker", "Complete 50 sessions", "📚", "sessions_completed", 50),
+    AchievementRule("Speed Learner", "Complete 5 sessions in one day", "⚡", "daily_sessions", 5),
+    AchievementRule("Dedicated Learner", "Study for 10 hours in total", "⏱️", "study_minutes", 600),
+    AchievementRule("Conversationalist", "Speak 100 times with your tutor", "💬", "voice_interactions", 100),
+    AchievementRule("Pronunciation Pro", "Achieve 90% pronunciation score", "🗣️", "high_pronunciation", 1),
+    AchievementRule("Week Warrior", "Study for 7 days in a row", "🔥", "longest_streak", 7, "streak"),
+    AchievementRule("Month Master", "Study for 30 days in a row", "🏆", "longest_streak", 30, "streak"),
+]
+
+class AchievementEngine:
+    """Awards achievements from learning events
+
+    Rules are indexed by the counter they depend on, and counters by the
+    event type that feeds them, so an event touches only the counters and
+    rules it can affect. Counters are maintained with atomic upserts and
+    rules fire when a counter crosses their threshold; the unique
+    (user_id, name) index makes awards idempotent.
+    """
+
+    def __init__(
+        self,
+        rules: Iterable[AchievementRule] = ACHIEVEMENT_RULES,
+        counters: Iterable[CounterSpec] = COUNTERS
+    ):
+        self.rules_by_counter: Dict[str, List[AchievementRule]] = defaultdict(list)
+        for rule in rules:
+            self.rules_by_counter[rule.counter].append(rule)
+        for counter_rules in self.rules_by_counter.values():
+            counter_rules.sort(key=lambda r: r.threshold)
+        self.thresholds = {
+            name: [r.threshold for r in counter_rules]
+            for name, counter_rules in self.rules_by_counter.items()
+        }
+
+        # Counters no rule depends on aren't maintained
+        self.counters = {c.name: c for c in counters if c.name in self.rules_by_counter}
+        self.counters_by_event: Dict[EventType, List[CounterSpec]] = defaultdict(list)
+        for counter in self.counters.values():
+            self.counters_by_event[counter.event].append(counter)
+
+    def on_session_end(self, db: Session, session: LearningSession) -> int:
+        """Feed a finished session and the user's resulting streak"""
+        streak = db.query(Progress.current_streak).filter(
+            Progress.user_id == session.user_id
+        ).scalar()
+        occurred_at = session.ended_at or datetime.utcnow()
+        return self.process(db, [
+            LearningEvent(
+                EventType.SESSION_END,
+                session.user_id,
+                {"duration_seconds": session.duration_seconds},
+                occurred_at
+            ),
+            LearningEvent(
+                EventType.STREAK,
+                session.user_id,
+                {"current_streak": streak},
+                occurred_at
+            )
+        ])
+
+    def on_interaction(self, db: Session, interaction: VoiceInteraction) -> int:
+        """Feed a saved voice interaction"""
+        return self.process(db, [LearningEvent(
+            EventType.INTERACTION,
+            interaction.user_id,
+            {"type": interaction.type, "pronunciation_score": interaction.pronunciation_score}
+        )])
+
+    def on_streak(self, db: Session, user_id: int, current_streak: int) -> int:
+        """Feed the user's current streak"""
+        return self.process(db, [LearningEvent(
+            EventType.STREAK,
+            user_id,
+            {"current_streak": current_streak}
+        )])
+
+    def process(self, db: Session, events: Iterable[LearningEvent]) -> int:
+        """Apply a batch of events and award crossed rules
+
+        Returns the number of new achievements. The caller commits.
+        """
+        # (user_id, stored counter name) -> (spec, aggregated amount)
+        changes: Dict[Tuple[int, str], Tuple[CounterSpec, int]] = {}
+        for event in events:
+            for spec in self.counters_by_event.get(event.type, ()):
+                amount = int(spec.extract(event.data))
+                if amount <= 0:
+                    continue
+                key = (event.user_id, self._stored_name(spec, event.occurred_at.date()))
+                if key in changes:
+                    previous = changes[key][1]
+                    amount = previous + amount if spec.mode == "sum" else max(previous, amount)
+                changes[key] = (spec, amount)
+
+        if not changes:
+            return 0
+
+        for mode in ("sum", "max"):
+            rows = [
+                {"user_id": user_id, "name": name, "value": amount}
+                for (user_id, name), (spec, amount) in changes.items() if spec.mode == mode
+            ]
+            if rows:
+                self._upsert_counters(db, rows, mode)
+
+        values = self._read_counters(db, changes.keys())
+        awards = []
+        for key, (spec, amount) in changes.items():
+            value = values.get(key, 0)
+            # Max counters may have been at any value before; their awards
+            # are deduplicated by the unique index instead
+            previous = value - amount if spec.mode == "sum" else 0
+            awards.extend(
+                (key[0], rule) for rule in self._crossed(spec.name, previous, value)
+            )
+
+        return self._award(db, awards)
+
+    def backfill(self, db: Session, chunk_size: int = 1000, today: Optional[date] = None) -> Dict[str, int]:
+        """Rebuild counters from history and award everything already earned
+
+        Processes users in id-range chunks with one aggregate query per
+        counter, commits per chunk and is safe to re-run.
+        """
+        today = today or datetime.utcnow().date()
+        low, high = db.query(func.min(User.id), func.max(User.id)).one()
+        stats = {"users": 0, "counters": 0, "awards": 0}
+        if low is None:
+            return stats
+
+        for start in range(low, high + 1, chunk_size):
+            end = start + chunk_size
+            values = self._historical_values(db, start, end, today)
+
+            rows = [
+                {"user_id": user_id, "name": name, "value": value}
+                for (user_id, name), value in values["stored"].items()
+            ]
+            if rows:
+                self._upsert_counters(db, rows, "set")
+
+            awards = [
+                (user_id, rule)
+                for (user_id, counter), value in values["peak"].items()
+                for rule in self._crossed(counter, 0, value)
+            ]
+            stats["awards"] += self._award(db, awards)
+            stats["counters"] += len(rows)
+            stats["users"] += len({user_id for user_id, _ in values["peak"]})
+            db.commit()
+
+        logger.info(f"Achievement backfill finished: {stats}")
+        return stats
+
+    def prune_daily_counters(self, db: Session, before: date) -> int:
+        """Delete daily counters for days before ``before``. The caller commits."""
+        stale = [
+            AchievementCounter.name.like(f"{spec.name}:%")
+            for spec in self.counters.values() if spec.daily
+        ]
+        if not stale:
+            return 0
+        return db.query(AchievementCounter).filter(
+            or_(*stale),
+            AchievementCounter.updated_at < datetime.combine(before, datetime.min.time())
+        ).delete(synchronize_session=False)
+
+    def _stored_name(self, spec: CounterSpec, day: date) -> str:
+        return f"{spec.name}:{day.isoformat()}" if spec.daily else spec.name
+
+    def _crossed(self, counter: str, previous: int, value: int) -> List[AchievementRule]:
+        """Rules on ``counter`` whose threshold lies in (previous, value]"""
+        thresholds = self.thresholds.get(counter, [])
+        low = bisect.bisect_right(thresholds, previous)
+        high = bisect.bisect_right(thresholds, value)
+        return self.rules_by_counter[counter][low:high]
+
+    def _upsert_counters(self, db: Session, rows: List[Dict[str, Any]], mode: str):
+        """Add to ("sum"), raise to ("max") or overwrite ("set") counters in one statement"""
+        now = datetime.utcnow()
+        for row in rows:
+            row["updated_at"] = now
+        table = AchievementCounter.__table__
+        dialect = db.get_bind().dialect.name
+
+        def merged(new_value):
+            if mode == "sum":
+                return table.c.value + new_value
+            if mode == "max":
+                return func.max(table.c.value, new_value) if dialect == "sqlite" \
+                    else func.greatest(table.c.value, new_value)
+            return new_value
+
+        if dialect in ("postgresql", "sqlite"):
+            insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            stmt = insert(table).values(rows)
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=[table.c.user_id, table.c.name],
+                set_={"value": merged(stmt.excluded.value), "updated_at": stmt.excluded.updated_at}
+            ))
+        elif dialect in ("mysql", "mariadb"):
+            stmt = mysql.insert(table).values(rows)
+            db.execute(stmt.on_duplicate_key_update(
+                value=merged(stmt.inserted.value),
+                updated_at=stmt.inserted.updated_at
+            ))
+        else:
+            # Generic fallback: update in place, insert when missing
+            for row in rows:
+                updated = db.execute(
+                    table.update()
+                    .where(table.c.user_id == row["user_id"], table.c.name == row["name"])
+                    .values(value=merged(row["value"]), updated_at=now)
+                ).rowcount
+                if not updated:
+                    db.execute(table.insert().values(**row))
+
+    def _read_counters(self, db: Session, keys: Iterable[Tuple[int, str]]) -> Dict[Tuple[int, str], int]:
+        keys = set(keys)
+        rows = db.query(
+            AchievementCounter.user_id, AchievementCounter.name, AchievementCounter.value
+        ).filter(
+            AchievementCounter.user_id.in_({user_id for user_id, _ in keys}),
+            AchievementCounter.name.in_({name for _, name in keys})
+        )
+        return {(r.user_id, r.name): r.value for r in rows if (r.user_id, r.name) in keys}
+
+    def _award(self, db: Session, awards: List[Tuple[int, AchievementRule]]) -> int:
+        """Insert awards in batches, skipping ones the user already has"""
+        if not awards:
+            return 0
+
+        table = Achievement.__table__
+        dialect = db.get_bind().dialect.name
+        now = datetime.utcnow()
+        rows = [
+            {
+                "user_id": user_id,
+                "name": rule.name,
+                "description": rule.description,
+                "icon": rule.icon,
+                "category": rule.category,
+                "earned_at": now,
+                "progress_value": rule.threshold,
+                "progress_max": rule.threshold
+            }
+            for user_id, rule in awards
+        ]
+
+        awarded = 0
+        for start in range(0, len(rows), AWARD_BATCH_SIZE):
+            batch = rows[start:start + AWARD_BATCH_SIZE]
+            if dialect in ("postgresql", "sqlite"):
+                insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+                stmt = insert(table).values(batch).on_conflict_do_nothing(
+                    index_elements=[table.c.user_id, table.c.name]
+                )
+                awarded += db.execute(stmt).rowcount
+            elif dialect in ("mysql", "mariadb"):
+                awarded += db.execute(mysql.insert(table).values(batch).prefix_with("IGNORE")).rowcount
+            else:
+                for row in batch:
+                    try:
+                        with db.begin_nested():
+                            db.execute(table.insert().values(**row))
+                        awarded += 1
+                    except IntegrityError:
+                        pass
+
+        if awarded:
+            logger.info(f"Awarded {awarded} achievement(s)")
+        return awarded
+
+    def _historical_values(self, db: Session, low: int, high: int, today: date) -> Dict[str, Dict]:
+        """Counter values for users in [low, high) computed from stored history
+
+        ``stored`` holds what the live counters should contain; ``peak``
+        the value rules are checked against (for daily counters, the best
+        day on record).
+        """
+        stored: Dict[Tuple[int, str], int] = {}
+        peak: Dict[Tuple[int, str], int] = {}
+
+        def put(user_id: int, counter: str, value: int):
+            if counter in self.counters and value:
+                stored[(user_id, counter)] = int(value)
+                peak[(user_id, counter)] = int(value)
+
+        in_range = (LearningSession.user_id >= low, LearningSession.user_id < high)
+        # Only completed sessions reach on_session_end; abandoned ones don't count
+        finished = (LearningSession.status == SessionStatus.COMPLETED, LearningSession.ended_at.isnot(None))
+        for row in db.query(
+            LearningSession.user_id,
+            func.count(LearningSession.id),
+            func.sum(func.coalesce(LearningSession.duration_seconds, 0) / 60)
+        ).filter(*in_range, *finished).group_by(LearningSession.user_id):
+            put(row[0], "sessions_completed", row[1])
+            put(row[0], "study_minutes", row[2])
+
+        if "daily_sessions" in self.counters:
+            day = func.date(LearningSession.ended_at)
+            for user_id, ended_day, count in db.query(
+                LearningSession.user_id, day, func.count(LearningSession.id)
+            ).filter(*in_range, *finished).group_by(LearningSession.user_id, day):
+                key = (user_id, "daily_sessions")
+                peak[key] = max(peak.get(key, 0), count)
+                if str(ended_day) == today.isoformat():
+                    stored[(user_id, f"daily_sessions:{today.isoformat()}")] = count
+
+        for row in db.query(
+            VoiceInteraction.user_id,
+            func.sum(case((VoiceInteraction.type == InteractionType.USER_SPEECH, 1), else_=0)),
+            func.sum(case((VoiceInteraction.pronunciation_score >= HIGH_PRONUNCIATION_SCORE, 1), else_=0))
+        ).filter(
+            VoiceInteraction.user_id >= low, VoiceInteraction.user_id < high
+        ).group_by(VoiceInteraction.user_id):
+            put(row[0], "voice_interactions", row[1])
+            put(row[0], "high_pronunciation", row[2])
+
+        for user_id, longest in db.query(Progress.user_id, Progress.longest_streak).filter(
+            Progress.user_id >= low, Progress.user_id < high
+        ):
+            put(user_id, "longest_streak", longest)
+
+        return {"stored": stored, "peak": peak}
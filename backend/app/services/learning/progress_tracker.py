@@ -0,0 +1,167 @@
+from typing import Dict, Optional, Any
+from datetime import datetime
+import logging
+
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.learning_session import LearningSession
+from app.models.progress import Progress, SubjectProgress
+
+logger = logging.getLogger(__name__)
+
+XP_PER_MINUTE = 1
+
+# Columns of subject_progress that are summed on conflict
+INCREMENT_COLUMNS = (
+    "total_time",
+    "sessions",
+    "accuracy_sum",
+    "accuracy_count",
+    "experience_points"
+)
+
+class ProgressTracker:
+    """Maintains per-user and per-subject progress with atomic increments"""
+
+    def record_session(self, db: Session, session: LearningSession):
+        """Add a finished session's time, accuracy and XP to the user's progress
+
+        Uses single-statement upserts/increments so concurrent writers for
+        the same user never read-modify-write. The caller commits.
+        """
+        seconds = max(session.duration_seconds or 0, 0)
+        xp = (seconds // 60) * XP_PER_MINUTE
+        subject = session.subject or session.language or (
+            session.type.value if session.type else "general"
+        )
+
+        self.increment_subject(
+            db,
+            user_id=session.user_id,
+            subject=subject,
+            seconds=seconds,
+            sessions=1,
+            accuracy=session.comprehension_score,
+            experience_points=xp
+        )
+        self._increment_totals(db, session.user_id, seconds, xp)
+
+    def increment_subject(
+        self,
+        db: Session,
+        user_id: int,
+        subject: str,
+        seconds: int = 0,
+        sessions: int = 0,
+        accuracy: Optional[float] = None,
+        experience_points: int = 0
+    ):
+        """Atomically add to a (user, subject) row, creating it if needed"""
+        values = {
+            "user_id": user_id,
+            "subject": subject,
+            "total_time": seconds,
+            "sessions": sessions,
+            "accuracy_sum": accuracy or 0.0,
+            "accuracy_count": 1 if accuracy is not None else 0,
+            "experience_points": experience_points,
+            "last_studied_at": datetime.utcnow()
+        }
+        table = SubjectProgress.__table__
+        dialect = db.get_bind().dialect.name
+
+        if dialect in ("postgresql", "sqlite"):
+            insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            stmt = insert(table).values(**values)
+            updates = {name: table.c[name] + stmt.excluded[name] for name in INCREMENT_COLUMNS}
+            updates["last_studied_at"] = stmt.excluded.last_studied_at
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.user_id, table.c.subject],
+                set_=updates
+            )
+            db.execute(stmt)
+        elif dialect in ("mysql", "mariadb"):
+            stmt = mysql.insert(table).values(**values)
+            updates = {name: table.c[name] + stmt.inserted[name] for name in INCREMENT_COLUMNS}
+            updates["last_studied_at"] = stmt.inserted.last_studied_at
+            db.execute(stmt.on_duplicate_key_update(**updates))
+        else:
+            # Generic fallback: increment in place, insert when missing
+            updated = db.execute(
+                table.update()
+                .where(table.c.user_id == user_id, table.c.subject == subject)
+                .values(
+                    last_studied_at=values["last_studied_at"],
+                    **{name: table.c[name] + values[name] for name in INCREMENT_COLUMNS}
+                )
+            ).rowcount
+            if not updated:
+                db.execute(table.insert().values(**values))
+
+    def build_progress_response(self, db: Session, user_id: int) -> Optional[Dict[str, Any]]:
+        """Assemble ProgressResponse data with a single indexed query"""
+        rows = db.query(Progress, SubjectProgress).outerjoin(
+            SubjectProgress, SubjectProgress.user_id == Progress.user_id
+        ).filter(Progress.user_id == user_id).all()
+
+        if not rows:
+            return None
+
+        progress = rows[0][0]
+        subjects = [subject for _, subject in rows if subject is not None]
+
+        accuracy_count = sum(s.accuracy_count for s in subjects)
+        overall_accuracy = (
+            sum(s.accuracy_sum for s in subjects) / accuracy_count
+            if accuracy_count else progress.overall_accuracy or 0.0
+        )
+
+        return {
+            "total_study_time": progress.total_study_time or 0,
+            "total_sessions": progress.total_sessions or 0,
+            "current_streak": progress.current_streak or 0,
+            "longest_streak": progress.longest_streak or 0,
+            "level": progress.level or 1,
+            "experience_points": progress.experience_points or 0,
+            "overall_accuracy": overall_accuracy,
+            "subject_progress": {
+                s.subject: {
+                    "total_time": s.total_time,
+                    "sessions": s.sessions,
+                    "average_accuracy": round(s.average_accuracy, 4),
+                    "experience_points": s.experience_points,
+                    "last_studied_at": s.last_studied_at.isoformat() if s.last_studied_at else None
+                }
+                for s in subjects
+            }
+        }
+
+    def _increment_totals(self, db: Session, user_id: int, seconds: int, xp: int):
+        """Atomically bump the user's overall totals"""
+        increments = {
+            Progress.total_study_time: Progress.total_study_time + seconds,
+            Progress.total_sessions: Progress.total_sessions + 1,
+            Progress.experience_points: Progress.experience_points + xp
+        }
+        updated = db.query(Progress).filter(
+            Progress.user_id == user_id
+        ).update(increments, synchronize_session=False)
+
+        if updated:
+            return
+
+        try:
+            with db.begin_nested():
+                db.add(Progress(
+                    user_id=user_id,
+                    total_study_time=seconds,
+                    total_sessions=1,
+                    experience_points=xp
+                ))
+        except IntegrityError:
+            # Another writer created the row first
+            db.query(Progress).filter(
+                Progress.user_id == user_id
+            ).update(increments, synchronize_session=False)
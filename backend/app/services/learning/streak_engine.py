@@ -0,0 +1,373 @@
+from typing import TYPE_CHECKING, Dict, Optional, Any, Tuple
+from datetime import datetime, date, timedelta
+import logging
+
+from sqlalchemy import case, func, or_, bindparam, select, union
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.learning_session import LearningSession, SessionStatus
+from app.models.progress import Progress, StudyCheckIn, StudyStreak
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class StreakEngine:
+    """Derives study streaks from session activity
+
+    A streak is a run of consecutive UTC study days. Each streak may bridge a
+    single missed day once (a freeze); the frozen day itself doesn't count
+    towards its length.
+
+    Live updates use conditional ``UPDATE`` statements whose ``WHERE``
+    clauses encode the transition (same day, next day, freeze, reset), so two
+    concurrent session ends can never both advance the streak. The nightly
+    recompute rebuilds everything in user-id chunks from the same activity
+    the live path sees: the end dates of completed sessions, plus the days
+    the client checked in without one.
+    """
+
+    def check_in(self, db: Session, user_id: int, when: Optional[datetime] = None):
+        """Record study outside a session for the day of ``when`` (UTC). The caller commits."""
+        now = when or datetime.utcnow()
+        try:
+            with db.begin_nested():
+                db.add(StudyCheckIn(user_id=user_id, day=now.date()))
+        except IntegrityError:
+            # Already checked in today
+            pass
+        self.record_activity(db, user_id, now)
+
+    def record_activity(self, db: Session, user_id: int, when: Optional[datetime] = None):
+        """Advance the user's streak for activity at ``when`` (UTC). The caller commits."""
+        now = when or datetime.utcnow()
+        today = datetime.combine(now.date(), datetime.min.time())
+        yesterday = today - timedelta(days=1)
+        two_days_ago = today - timedelta(days=2)
+
+        progress = db.query(Progress).filter(Progress.user_id == user_id)
+        streak_plus_one = Progress.current_streak + 1
+        advance = {
+            Progress.current_streak: streak_plus_one,
+            Progress.longest_streak: case(
+                (streak_plus_one > Progress.longest_streak, streak_plus_one),
+                else_=Progress.longest_streak
+            ),
+            Progress.last_study_date: now
+        }
+
+        # Already studied today: nothing to advance
+        if progress.filter(Progress.last_study_date >= today).update(
+            {Progress.last_study_date: now}, synchronize_session=False
+        ):
+            return
+
+        # Studied yesterday: extend the streak
+        if progress.filter(
+            Progress.last_study_date >= yesterday,
+            Progress.last_study_date < today
+        ).update(advance, synchronize_session=False):
+            self._extend_active_streak(db, user_id, now)
+            return
+
+        # Missed exactly one day: spend the active streak's freeze if unused
+        frozen = db.query(StudyStreak).filter(
+            StudyStreak.user_id == user_id,
+            StudyStreak.is_active.is_(True),
+            StudyStreak.freeze_used.is_(False),
+            StudyStreak.end_date >= two_days_ago,
+            StudyStreak.end_date < yesterday
+        ).update({
+            StudyStreak.freeze_used: True,
+            StudyStreak.freeze_date: yesterday,
+            StudyStreak.days: StudyStreak.days + 1,
+            StudyStreak.end_date: now
+        }, synchronize_session=False)
+        if frozen and progress.filter(
+            Progress.last_study_date >= two_days_ago,
+            Progress.last_study_date < yesterday
+        ).update(advance, synchronize_session=False):
+            return
+
+        # Streak broken (or first activity ever): start a new one
+        if progress.filter(or_(
+            Progress.last_study_date.is_(None),
+            Progress.last_study_date < yesterday
+        )).update({
+            Progress.current_streak: 1,
+            Progress.longest_streak: case(
+                (Progress.longest_streak < 1, 1),
+                else_=Progress.longest_streak
+            ),
+            Progress.last_study_date: now
+        }, synchronize_session=False):
+            self._start_streak(db, user_id, now)
+            return
+
+        if progress.count() == 0:
+            try:
+                with db.begin_nested():
+                    db.add(Progress(
+                        user_id=user_id,
+                        current_streak=1,
+                        longest_streak=1,
+                        last_study_date=now
+                    ))
+            except IntegrityError:
+                # Created concurrently; that writer recorded today's activity
+                return
+            self._start_streak(db, user_id, now)
+
+    def get_streak(self, db: Session, user_id: int) -> Dict[str, int]:
+        """Current and longest streak for a user"""
+        row = db.query(Progress.current_streak, Progress.longest_streak).filter(
+            Progress.user_id == user_id
+        ).first()
+        return {
+            "current_streak": row.current_streak if row else 0,
+            "longest_streak": row.longest_streak if row else 0
+        }
+
+    def _extend_active_streak(self, db: Session, user_id: int, now: datetime):
+        extended = db.query(StudyStreak).filter(
+            StudyStreak.user_id == user_id,
+            StudyStreak.is_active.is_(True)
+        ).update({
+            StudyStreak.days: StudyStreak.days + 1,
+            StudyStreak.end_date: now
+        }, synchronize_session=False)
+        if not extended:
+            # Streak predates StudyStreak tracking
+            self._start_streak(db, user_id, now)
+
+    def _start_streak(self, db: Session, user_id: int, now: datetime):
+        db.query(StudyStreak).filter(
+            StudyStreak.user_id == user_id,
+            StudyStreak.is_active.is_(True)
+        ).update({StudyStreak.is_active: False}, synchronize_session=False)
+        db.add(StudyStreak(user_id=user_id, start_date=now, end_date=now, days=1, is_active=True))
+
+    def recompute_all(
+        self,
+        db: Session,
+        as_of: Optional[date] = None,
+        chunk_size: int = 10000
+    ) -> Dict[str, Any]:
+        """Rebuild streaks, freezes and StudyStreak rows for every user
+
+        Works through users in id-range chunks: one grouped query fetches the
+        chunk's distinct study days, runs are found with vectorized date
+        diffs, and results are written back with executemany statements.
+        Each chunk is committed separately.
+        """
+        as_of = as_of or datetime.utcnow().date()
+        as_of_day = (as_of - date(1970, 1, 1)).days
+
+        bounds = db.query(func.min(Progress.user_id), func.max(Progress.user_id)).one()
+        session_bounds = db.query(
+            func.min(LearningSession.user_id), func.max(LearningSession.user_id)
+        ).one()
+        check_in_bounds = db.query(
+            func.min(StudyCheckIn.user_id), func.max(StudyCheckIn.user_id)
+        ).one()
+        all_bounds = (bounds, session_bounds, check_in_bounds)
+        lows = [b[0] for b in all_bounds if b[0] is not None]
+        highs = [b[1] for b in all_bounds if b[1] is not None]
+        if not lows:
+            return {"users": 0, "streaks": 0, "chunks": 0}
+
+        stats = {"users": 0, "streaks": 0, "chunks": 0}
+        for low in range(min(lows), max(highs) + 1, chunk_size):
+            users, streaks = self._recompute_chunk(db, low, low + chunk_size, as_of_day)
+            db.commit()
+            stats["users"] += users
+            stats["streaks"] += streaks
+            stats["chunks"] += 1
+
+        logger.info(f"Recomputed streaks: {stats}")
+        return stats
+
+    def _recompute_chunk(self, db: Session, low: int, high: int, as_of_day: int) -> Tuple[int, int]:
+        # Live updates record completed sessions at their end time, and
+        # check-ins on their day; union drops days counted by both
+        session_days = select(
+            LearningSession.user_id.label("user_id"),
+            func.date(LearningSession.ended_at).label("day")
+        ).where(
+            LearningSession.user_id >= low,
+            LearningSession.user_id < high,
+            LearningSession.status == SessionStatus.COMPLETED,
+            LearningSession.ended_at.isnot(None)
+        )
+        check_in_days = select(StudyCheckIn.user_id, StudyCheckIn.day).where(
+            StudyCheckIn.user_id >= low,
+            StudyCheckIn.user_id < high
+        )
+        activity = union(session_days, check_in_days).subquery()
+        rows = db.query(activity.c.user_id, activity.c.day).order_by(
+            activity.c.user_id, activity.c.day
+        ).all()
+
+        # Users with no sessions in range lose their current streak
+        db.query(Progress).filter(
+            Progress.user_id >= low,
+            Progress.user_id < high
+        ).update({Progress.current_streak: 0}, synchronize_session=False)
+        db.query(StudyStreak).filter(
+            StudyStreak.user_id >= low,
+            StudyStreak.user_id < high
+        ).delete(synchronize_session=False)
+
+        if not rows:
+            return 0, 0
+
+        import numpy as np
+        user_ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+        # SQLite returns date() as a string, other backends as a date
+        day_numbers = np.array([r[1] for r in rows], dtype="datetime64[D]").astype(np.int64)
+        result = compute_streak_runs(user_ids, day_numbers, as_of_day)
+
+        def to_datetime(day_number: int) -> datetime:
+            return datetime(1970, 1, 1) + timedelta(days=int(day_number))
+
+        progress_table = Progress.__table__
+        existing = {
+            uid for (uid,) in db.query(Progress.user_id).filter(
+                Progress.user_id >= low, Progress.user_id < high
+            )
+        }
+        user_rows = [
+            {
+                "uid": int(uid),
+                "current_streak": int(current),
+                "longest_streak": int(longest),
+                "last_study_date": to_datetime(last_day)
+            }
+            for uid, current, longest, last_day in zip(
+                result["user_id"], result["current_streak"],
+                result["longest_streak"], result["last_day"]
+            )
+        ]
+        updates = [r for r in user_rows if r["uid"] in existing]
+        if updates:
+            db.execute(
+                progress_table.update()
+                .where(progress_table.c.user_id == bindparam("uid"))
+                .values(
+                    current_streak=bindparam("current_streak"),
+                    longest_streak=bindparam("longest_streak"),
+                    last_study_date=bindparam("last_study_date")
+                ),
+                updates
+            )
+        inserts = [
+            {
+                "user_id": r["uid"],
+                "current_streak": r["current_streak"],
+                "longest_streak": r["longest_streak"],
+                "last_study_date": r["last_study_date"]
+            }
+            for r in user_rows if r["uid"] not in existing
+        ]
+        if inserts:
+            db.execute(progress_table.insert(), inserts)
+
+        runs = result["runs"]
+        streak_rows = [
+            {
+                "user_id": int(uid),
+                "start_date": to_datetime(start),
+                "end_date": to_datetime(end),
+                "days": int(days),
+                "is_active": bool(active),
+                "freeze_used": bool(freeze_day >= 0),
+                "freeze_date": to_datetime(freeze_day) if freeze_day >= 0 else None
+            }
+            for uid, start, end, days, active, freeze_day in zip(
+                runs["user_id"], runs["start_day"], runs["end_day"],
+                runs["days"], runs["is_active"], runs["freeze_day"]
+            )
+        ]
+        if streak_rows:
+            db.execute(StudyStreak.__table__.insert(), streak_rows)
+
+        return len(user_rows), len(streak_rows)
+
+def compute_streak_runs(
+    user_ids: "np.ndarray",
+    day_numbers: "np.ndarray",
+    as_of_day: int
+) -> Dict[str, Any]:
+    """Find streak runs from (user, study day) pairs with vectorized diffs
+
+    ``day_numbers`` are days since the Unix epoch. Pairs already ordered by
+    (user, day) without duplicates, as the recompute query returns them,
+    skip the sort; anything else is sorted and deduplicated first. Returns
+    per-user current/longest streaks and per-run details.
+    """
+    import numpy as np
+
+    users = np.asarray(user_ids, dtype=np.int64)
+    days = np.asarray(day_numbers, dtype=np.int64)
+
+    user_step = np.diff(users)
+    day_step = np.diff(days)
+    if not np.all((user_step > 0) | ((user_step == 0) & (day_step > 0))):
+        order = np.lexsort((days, users))
+        users, days = users[order], days[order]
+        user_step = np.diff(users)
+        day_step = np.diff(days)
+        distinct = np.append(True, (user_step != 0) | (day_step != 0))
+        users, days = users[distinct], days[distinct]
+        user_step = np.diff(users)
+        day_step = np.diff(days)
+    n = len(users)
+
+    new_user = np.append(True, user_step != 0)
+    gap = np.append(0, day_step)
+
+    # Gaps of more than one missed day always break; a single missed day is
+    # bridged by the run's freeze, so within a hard segment the 1st, 3rd, ...
+    # such gap is frozen and the 2nd, 4th, ... starts a new run
+    segment_start = np.flatnonzero(new_user | (gap > 2))
+    freeze_gap = np.flatnonzero(~new_user & (gap == 2))
+    first_in_segment = np.searchsorted(
+        freeze_gap,
+        segment_start[np.searchsorted(segment_start, freeze_gap, side="right") - 1]
+    )
+    nth_in_segment = np.arange(len(freeze_gap)) - first_in_segment
+    used_freeze = freeze_gap[nth_in_segment % 2 == 0]
+
+    run_start = np.union1d(segment_start, freeze_gap[nth_in_segment % 2 == 1])
+    run_end = np.append(run_start[1:] - 1, n - 1)
+    run_user = users[run_start]
+    run_days = run_end - run_start + 1
+    run_freeze_day = np.full(len(run_start), -1, dtype=np.int64)
+    run_freeze_day[np.searchsorted(run_start, used_freeze, side="right") - 1] = days[used_freeze] - 1
+
+    user_changes = run_user[1:] != run_user[:-1]
+    last_runs = np.flatnonzero(np.append(user_changes, True))
+    user_first_run = np.flatnonzero(np.append(True, user_changes))
+
+    since_last = as_of_day - days[run_end[last_runs]]
+    still_active = (since_last <= 1) | ((since_last == 2) & (run_freeze_day[last_runs] < 0))
+
+    run_active = np.zeros(len(run_start), dtype=bool)
+    run_active[last_runs] = still_active
+
+    return {
+        "user_id": run_user[last_runs],
+        "current_streak": np.where(still_active, run_days[last_runs], 0),
+        "longest_streak": np.maximum.reduceat(run_days, user_first_run),
+        "last_day": days[run_end[last_runs]],
+        "runs": {
+            "user_id": run_user,
+            "start_day": days[run_start],
+            "end_day": days[run_end],
+            "days": run_days,
+            "is_active": run_active,
+            "freeze_day": run_freeze_day
+        }
+    }
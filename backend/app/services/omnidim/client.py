@@ -7,6 +7,8 @@ import websockets
 from datetime import datetime
 
 from app.config import settings
+from app.core.metrics import OMNIDIM_ERRORS, observe_omnidim
+from app.core.tracing import CLIENT, inject_trace_headers, trace_headers, traced
 
 logger = logging.getLogger(__name__)
 
@@ -17,15 +19,26 @@ class OmnidimClient:
         self.api_key = settings.OMNIDIM_API_KEY
         self.base_url = settings.OMNIDIM_API_URL
         self.ws_url = settings.OMNIDIM_WS_URL
-        self._client = httpx.AsyncClient(
-            headers={
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            },
-            timeout=30.0
-        )
+        self._http: Optional[httpx.AsyncClient] = None
         self._ws_connections: Dict[str, websockets.WebSocketClientProtocol] = {}
     
+    @property
+    def _client(self) -> httpx.AsyncClient:
+        """HTTP client, created on first use; building its SSL context is slow"""
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                },
+                timeout=30.0,
+                # Upstream logs can be matched to our traces
+                event_hooks={"request": [inject_trace_headers]}
+            )
+        return self._http
+    
+    @observe_omnidim("sessions.create")
+    @traced("omnidim.sessions.create", CLIENT)
     async def create_voice_session(self, config: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new voice session with Omnidim"""
         try:
@@ -44,6 +57,8 @@ class OmnidimClient:
             logger.error(f"Failed to create voice session: {e}")
             raise
     
+    @observe_omnidim("sessions.end")
+    @traced("omnidim.sessions.end", CLIENT)
     async def end_voice_session(self, session_id: str) -> Dict[str, Any]:
         """End a voice session"""
         try:
@@ -56,6 +71,8 @@ class OmnidimClient:
             logger.error(f"Failed to end voice session: {e}")
             raise
     
+    @observe_omnidim("sessions.pause")
+    @traced("omnidim.sessions.pause", CLIENT)
     async def pause_voice_session(self, session_id: str) -> Dict[str, Any]:
         """Pause a voice session"""
         try:
@@ -68,6 +85,8 @@ class OmnidimClient:
             logger.error(f"Failed to pause voice session: {e}")
             raise
     
+    @observe_omnidim("sessions.resume")
+    @traced("omnidim.sessions.resume", CLIENT)
     async def resume_voice_session(self, session_id: str) -> Dict[str, Any]:
         """Resume a voice session"""
         try:
@@ -80,6 +99,8 @@ class OmnidimClient:
             logger.error(f"Failed to resume voice session: {e}")
             raise
     
+    @observe_omnidim("sessions.status")
+    @traced("omnidim.sessions.status", CLIENT)
     async def get_session_status(self, session_id: str) -> Dict[str, Any]:
         """Get session status"""
         try:
@@ -92,6 +113,8 @@ class OmnidimClient:
             logger.error(f"Failed to get session status: {e}")
             raise
     
+    @observe_omnidim("analyze.speech")
+    @traced("omnidim.analyze.speech", CLIENT)
     async def analyze_speech(
         self,
         audio_data: bytes,
@@ -122,7 +145,7 @@ class OmnidimClient:
         try:
             ws_uri = f"{self.ws_url}/voice/{session_id}?api_key={self.api_key}"
             
-            async with websockets.connect(ws_uri) as websocket:
+            async with websockets.connect(ws_uri, extra_headers=trace_headers()) as websocket:
                 self._ws_connections[session_id] = websocket
                 
                 async for message in websocket:
@@ -137,12 +160,15 @@ class OmnidimClient:
                             await on_message_callback(data)
                             
         except Exception as e:
+            OMNIDIM_ERRORS.labels("voice.stream", type(e).__name__).inc()
             logger.error(f"WebSocket connection error: {e}")
             raise
         finally:
             if session_id in self._ws_connections:
                 del self._ws_connections[session_id]
     
+    @observe_omnidim("voices.list")
+    @traced("omnidim.voices.list", CLIENT)
     async def get_voice_models(self, language: Optional[str] = None) -> list:
         """Get available voice models"""
         params = {"language": language} if language else {}
@@ -155,4 +181,6 @@ class OmnidimClient:
     
     async def close(self):
         """Close the HTTP client"""
-        await self._client.aclose()
\ No newline at end of file
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
\ No newline at end of file
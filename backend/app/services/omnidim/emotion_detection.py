@@ -1,7 +1,6 @@
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
 from enum import Enum
-import numpy as np
 from datetime import datetime, timedelta
 import logging
 
@@ -302,6 +301,7 @@ class EmotionDetector:
         valences = [emotion.valence for emotion in emotions]
         
         # Simple linear trend calculation
+        import numpy as np
         x = list(range(len(valences)))
         trend_slope = np.polyfit(x, valences, 1)[0] if len(valences) > 1 else 0
         
@@ -319,6 +319,7 @@ class EmotionDetector:
             return 0.5
         
         # Engagement factors
+        import numpy as np
         arousal_avg = np.mean([emotion.arousal for emotion in emotions])
         positive_emotion_ratio = len([
             e for e in emotions 
@@ -395,6 +396,7 @@ class EmotionDetector:
                 baseline_emotions.append(emotion_result)
             
             # Calculate user's baseline emotional characteristics
+            import numpy as np
             baseline_data = {
                 "average_arousal": np.mean([e.arousal for e in baseline_emotions]),
                 "average_valence": np.mean([e.valence for e in baseline_emotions]),
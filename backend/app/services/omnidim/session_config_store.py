@@ -0,0 +1,119 @@
+from typing import Dict, Any, Optional, Tuple, Iterable
+from collections import OrderedDict
+import copy
+import hashlib
+import json
+import logging
+import threading
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.learning_session import SessionConfig
+
+logger = logging.getLogger(__name__)
+
+# Top-level keys that differ for every session and are kept on the session row
+PER_SESSION_KEYS = ("user_id",)
+
+class SessionConfigStore:
+    """Content-addressed storage for voice session configurations
+
+    Identical configs (same mode, context, features, voice) are written once
+    to ``session_configs``; each session keeps only the config hash plus its
+    per-session overrides. Shared configs known to be stored are kept in an
+    in-memory LRU keyed by hash, so repeated configs skip the lookup when
+    stored and resolved configs are rebuilt without one.
+    """
+
+    def __init__(self, cache_size: int = settings.SESSION_CONFIG_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def hash_config(config: Dict[str, Any]) -> str:
+        """Stable SHA-256 of a config's canonical JSON form"""
+        canonical = json.dumps(config, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def split(
+        self,
+        config: Dict[str, Any],
+        per_session_keys: Iterable[str] = PER_SESSION_KEYS
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Split a config into its shareable part and per-session overrides"""
+        shared = {k: v for k, v in config.items() if k not in per_session_keys}
+        overrides = {k: config[k] for k in per_session_keys if k in config}
+        return shared, overrides
+
+    def store(
+        self,
+        db: Session,
+        config: Dict[str, Any],
+        per_session_keys: Iterable[str] = PER_SESSION_KEYS
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Persist the shared part of a config if new
+
+        Returns the config hash and the overrides to store on the session.
+        The caller commits.
+        """
+        shared, overrides = self.split(config, per_session_keys)
+        config_hash = self.hash_config(shared)
+
+        if self._get_cached(config_hash) is not None:
+            return config_hash, overrides
+
+        row = db.get(SessionConfig, config_hash)
+        if row is not None:
+            # Only rows known to be committed are cached; a fresh insert is
+            # picked up by the next lookup once the caller has committed
+            self._put_cached(config_hash, row.config)
+            return config_hash, overrides
+
+        try:
+            # Savepoint so a concurrent insert of the same hash only rolls
+            # back this row, not the caller's transaction
+            with db.begin_nested():
+                db.add(SessionConfig(hash=config_hash, config=shared))
+        except IntegrityError:
+            logger.debug(f"Session config {config_hash} inserted concurrently")
+
+        return config_hash, overrides
+
+    def resolve(self, db: Session, session) -> Optional[Dict[str, Any]]:
+        """Rebuild the full config of a session (a LearningSession or a row of its columns)"""
+        if not session.config_hash:
+            # Sessions created before deduplication carry the whole blob
+            return session.config
+
+        shared = self._get_cached(session.config_hash)
+        if shared is None:
+            row = db.get(SessionConfig, session.config_hash)
+            if row is None:
+                logger.warning(f"Missing session config {session.config_hash} for session {session.id}")
+                return None
+            shared = row.config
+            self._put_cached(session.config_hash, shared)
+
+        resolved = copy.deepcopy(shared)
+        resolved.update(session.config_overrides or {})
+        return resolved
+
+    def _get_cached(self, config_hash: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            config = self._cache.get(config_hash)
+            if config is not None:
+                self._cache.move_to_end(config_hash)
+            return config
+
+    def _put_cached(self, config_hash: str, config: Dict[str, Any]):
+        with self._lock:
+            self._cache[config_hash] = config
+            self._cache.move_to_end(config_hash)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+# Shared process-wide so every VoiceSessionManager hits the same cache
+session_config_store = SessionConfigStore()
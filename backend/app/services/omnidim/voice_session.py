@@ -1,12 +1,19 @@
 from typing import Dict, Optional, Any, List
+from sqlalchemy.orm import Session
 import asyncio
-import uuid
-from datetime import datetime
+import weakref
+from datetime import datetime, timedelta
 
 from app.services.omnidim.client import OmnidimClient
 from app.models.voice_interaction import VoiceInteraction
 from app.models.learning_session import LearningSession, SessionType, SessionStatus
-from app.database import SessionLocal
+from app.models.types import uuid7
+from app.services.omnidim.session_config_store import session_config_store
+from app.services.learning.progress_tracker import ProgressTracker
+from app.services.learning.streak_engine import StreakEngine
+from app.services.learning.achievement_engine import AchievementEngine
+from app.database import SessionLocal, write_queue
+from app.core.metrics import VOICE_SESSIONS
 import logging
 
 logger = logging.getLogger(__name__)
@@ -14,9 +21,16 @@ logger = logging.getLogger(__name__)
 class VoiceSessionManager:
     """Manages voice learning sessions with Omnidim"""
     
+    # Live managers, so maintenance jobs can reach their in-memory sessions
+    instances: "weakref.WeakSet[VoiceSessionManager]" = weakref.WeakSet()
+    
     def __init__(self):
+        VoiceSessionManager.instances.add(self)
         self.client = OmnidimClient()
         self.active_sessions: Dict[str, Dict] = {}
+        self.progress_tracker = ProgressTracker()
+        self.streak_engine = StreakEngine()
+        self.achievement_engine = AchievementEngine()
     
     async def create_tutor_session(
         self,
@@ -53,14 +67,16 @@ class VoiceSessionManager:
         # Store session in database
         db = SessionLocal()
         try:
+            config_hash, config_overrides = session_config_store.store(db, session_config)
             db_session = LearningSession(
-                id=str(uuid.uuid4()),
+                id=uuid7(),
                 user_id=user_id,
                 omnidim_session_id=omnidim_session["session_id"],
                 type=SessionType.TUTOR,
                 subject=subject,
                 difficulty=difficulty,
-                config=session_config
+                config_hash=config_hash,
+                config_overrides=config_overrides
             )
             db.add(db_session)
             db.commit()
@@ -119,13 +135,15 @@ class VoiceSessionManager:
         # Store in database
         db = SessionLocal()
         try:
+            config_hash, config_overrides = session_config_store.store(db, session_config)
             db_session = LearningSession(
-                id=str(uuid.uuid4()),
+                id=uuid7(),
                 user_id=user_id,
                 omnidim_session_id=omnidim_session["session_id"],
                 type=SessionType.LANGUAGE_PRACTICE,
                 language=target_language,
-                config=session_config
+                config_hash=config_hash,
+                config_overrides=config_overrides
             )
             db.add(db_session)
             db.commit()
@@ -172,12 +190,14 @@ class VoiceSessionManager:
         # Store in database
         db = SessionLocal()
         try:
+            config_hash, config_overrides = session_config_store.store(db, session_config)
             db_session = LearningSession(
-                id=str(uuid.uuid4()),
+                id=uuid7(),
                 user_id=user_id,
                 omnidim_session_id=omnidim_session["session_id"],
                 type=SessionType.EXAM_PREP,
-                config=session_config
+                config_hash=config_hash,
+                config_overrides=config_overrides
             )
             db.add(db_session)
             db.commit()
@@ -247,22 +267,19 @@ class VoiceSessionManager:
             await self.client.end_voice_session(session_id)
             
             # Update database
-            db = SessionLocal()
-            try:
-                db_session = db.query(LearningSession).filter(
+            def finish(db: Session):
+                db_session = self.claim_end(
+                    db,
                     LearningSession.omnidim_session_id == session_id,
                     LearningSession.user_id == user_id
-                ).first()
+                )
                 
                 if db_session:
-                    db_session.status = SessionStatus.COMPLETED
-                    db_session.ended_at = datetime.utcnow()
-                    db_session.duration_seconds = int(
-                        (db_session.ended_at - db_session.started_at).total_seconds()
-                    )
-                    db.commit()
-            finally:
-                db.close()
+                    self.progress_tracker.record_session(db, db_session)
+                    self.streak_engine.record_activity(db, user_id, db_session.ended_at)
+                    self.achievement_engine.on_session_end(db, db_session)
+            
+            await write_queue.run(finish)
             
             # Remove from active sessions
             del self.active_sessions[session_id]
@@ -538,29 +555,40 @@ class VoiceSessionManager:
     
     async def get_user_active_sessions(self, user_id: int) -> List[Dict[str, Any]]:
         """Get all active sessions for a user"""
-        active_user_sessions = []
+        session_ids = [
+            session_id for session_id, session_info in self.active_sessions.items()
+            if session_info["user_id"] == user_id
+        ]
+        if not session_ids:
+            return []
         
-        for session_id, session_info in self.active_sessions.items():
-            if session_info["user_id"] == user_id:
-                # Get additional details from database
-                db = SessionLocal()
-                try:
-                    db_session = db.query(LearningSession).filter(
-                        LearningSession.omnidim_session_id == session_id
-                    ).first()
-                    
-                    if db_session:
-                        duration = (datetime.utcnow() - db_session.started_at).total_seconds()
-                        active_user_sessions.append({
-                            "session_id": session_id,
-                            "type": db_session.type.value,
-                            "subject": db_session.subject,
-                            "language": db_session.language,
-                            "duration_seconds": int(duration),
-                            "started_at": db_session.started_at.isoformat()
-                        })
-                finally:
-                    db.close()
+        # Details for all of them in one query
+        db = SessionLocal()
+        try:
+            db_sessions = {
+                db_session.omnidim_session_id: db_session
+                for db_session in db.query(LearningSession).filter(
+                    LearningSession.omnidim_session_id.in_(session_ids)
+                )
+            }
+        finally:
+            db.close()
+        
+        active_user_sessions = []
+        now = datetime.utcnow()
+        for session_id in session_ids:
+            db_session = db_sessions.get(session_id)
+            if not db_session:
+                continue
+            duration = (now - db_session.started_at).total_seconds()
+            active_user_sessions.append({
+                "session_id": session_id,
+                "type": db_session.type.value,
+                "subject": db_session.subject,
+                "language": db_session.language,
+                "duration_seconds": int(duration),
+                "started_at": db_session.started_at.isoformat()
+            })
         
         return active_user_sessions
     
@@ -582,3 +610,56 @@ class VoiceSessionManager:
                 logger.info(f"Cleaned up expired session: {session_id}")
             except Exception as e:
                 logger.error(f"Error cleaning up session {session_id}: {e}")
+    
+    @staticmethod
+    def claim_end(db: Session, *criteria) -> Optional[LearningSession]:
+        """Mark the matching session completed unless something already ended it
+
+        The check and the write are one conditional UPDATE, so when a client
+        disconnect and an explicit end race only one of them gets the session
+        back and credits progress, streaks and achievements. The caller commits.
+        """
+        ended_at = datetime.utcnow()
+        claimed = db.query(LearningSession).filter(
+            *criteria, LearningSession.ended_at.is_(None)
+        ).update({
+            LearningSession.status: SessionStatus.COMPLETED,
+            LearningSession.ended_at: ended_at
+        }, synchronize_session=False)
+        if claimed != 1:
+            return None
+        
+        session = db.query(LearningSession).filter(*criteria).one()
+        session.duration_seconds = int((ended_at - session.started_at).total_seconds())
+        return session
+    
+    @staticmethod
+    def reap_stale_sessions(max_duration_hours: int = 24) -> int:
+        """Mark sessions still active in the database after ``max_duration_hours`` as abandoned
+
+        Catches sessions whose manager went away (restart, per-request
+        managers) and so were never ended. No progress is credited since
+        their real length is unknown.
+        """
+        cutoff = datetime.utcnow() - timedelta(hours=max_duration_hours)
+        db = SessionLocal()
+        try:
+            reaped = db.query(LearningSession).filter(
+                LearningSession.status == SessionStatus.ACTIVE,
+                LearningSession.ended_at.is_(None),
+                LearningSession.started_at < cutoff
+            ).update({
+                LearningSession.status: SessionStatus.ABANDONED,
+                LearningSession.ended_at: datetime.utcnow()
+            }, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+        
+        if reaped:
+            logger.info(f"Marked {reaped} stale session(s) as abandoned")
+        return reaped
+
+VOICE_SESSIONS.set_function(
+    lambda: sum(len(manager.active_sessions) for manager in list(VoiceSessionManager.instances))
+)
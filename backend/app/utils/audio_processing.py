@@ -1,6 +1,5 @@
 import io
 import wave
-import numpy as np
 from typing import Tuple, Optional
 import logging
 
@@ -52,6 +51,8 @@ class AudioProcessor:
     def normalize_audio(audio_data: bytes) -> bytes:
         """Normalize audio volume"""
         try:
+            import numpy as np
+            
             with io.BytesIO(audio_data) as input_io:
                 with wave.open(input_io, 'rb') as wav_in:
                     params = wav_in.getparams()
@@ -0,0 +1,99 @@
+"""Benchmark fixtures: an isolated SQLite database with one seeded learner
+
+Run the suite and compare against the stored baseline:
+
+    python -m pytest benchmarks --benchmark-json=benchmarks/results.json
+    python scripts/compare_benchmarks.py benchmarks/baselines/baseline.json benchmarks/results.json
+"""
+
+import os
+import tempfile
+
+# Settings are read at import time, so point them at scratch storage first
+_scratch = tempfile.mkdtemp(prefix="zenith-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_scratch}/bench.db")
+os.environ.setdefault("INTERACTION_ARCHIVE_DIR", os.path.join(_scratch, "archive"))
+os.environ.setdefault("PROFILE_DIR", os.path.join(_scratch, "profiles"))
+os.environ["DEBUG"] = "False"
+
+import asyncio
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.security import get_password_hash
+from app.database import Base, SessionLocal, engine
+from app.main import app
+from app.models.learning_session import LearningSession, SessionStatus, SessionType
+from app.models.progress import Progress
+from app.models.user import User
+
+# Scratch schema; the app itself leaves table creation to migrations
+Base.metadata.create_all(bind=engine)
+
+SUBJECTS = ["math", "physics", "chemistry", "spanish", "history", "biology"]
+PASSWORD = "benchmark-password"
+
+@pytest.fixture(scope="session")
+def client():
+    return TestClient(app)
+
+@pytest.fixture(scope="session")
+def learner():
+    """A user with a year of completed sessions, two a day"""
+    rng = random.Random(42)
+    db = SessionLocal()
+    try:
+        user = User(
+            email="learner@example.com",
+            username="learner",
+            hashed_password=get_password_hash(PASSWORD)
+        )
+        db.add(user)
+        db.flush()
+        
+        now = datetime.utcnow()
+        for day in range(365):
+            for slot in range(2):
+                started_at = now - timedelta(days=day, hours=slot * 6 + rng.random())
+                duration = rng.randint(300, 3600)
+                db.add(LearningSession(
+                    user_id=user.id,
+                    omnidim_session_id=f"bench-{day}-{slot}",
+                    type=rng.choice(list(SessionType)),
+                    status=SessionStatus.COMPLETED,
+                    subject=rng.choice(SUBJECTS),
+                    started_at=started_at,
+                    ended_at=started_at + timedelta(seconds=duration),
+                    duration_seconds=duration,
+                    interaction_count=rng.randint(5, 60),
+                    pronunciation_score=rng.uniform(0.4, 1.0),
+                    comprehension_score=rng.uniform(0.4, 1.0)
+                ))
+        db.add(Progress(
+            user_id=user.id,
+            total_sessions=730,
+            pronunciation_average=0.65,
+            fluency_average=0.75
+        ))
+        db.commit()
+        db.refresh(user)
+        db.expunge(user)
+        return user
+    finally:
+        db.close()
+
+@pytest.fixture(scope="session")
+def event_loop_runner():
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+@pytest.fixture
+def bench_async(benchmark, event_loop_runner):
+    """Benchmark a coroutine function, awaiting a fresh call each round"""
+    def run(func, *args, **kwargs):
+        return benchmark(lambda: event_loop_runner(func(*args, **kwargs)))
+    return run
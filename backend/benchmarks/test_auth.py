@@ -0,0 +1,11 @@
+from benchmarks.conftest import PASSWORD
+
+def test_login_round_trip(benchmark, client, learner):
+    def login():
+        return client.post(
+            "/api/auth/login",
+            data={"username": learner.username, "password": PASSWORD}
+        )
+    
+    response = benchmark(login)
+    assert response.status_code == 200
@@ -0,0 +1,35 @@
+import pytest
+
+from app.database import SessionLocal
+from app.services.analytics.learning_insights import LearningInsightsService
+from app.services.learning.spaced_repetition import SpacedRepetitionEngine
+
+@pytest.mark.parametrize("quality, repetitions", [(5, 4), (3, 1), (1, 6)])
+def test_calculate_next_review(benchmark, quality, repetitions):
+    engine = SpacedRepetitionEngine()
+    interval, ease_factor, _ = benchmark(engine.calculate_next_review, quality, repetitions, 2.5, 10)
+    assert interval >= 1 and ease_factor >= 1.3
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+@pytest.fixture(scope="module")
+def insights():
+    return LearningInsightsService()
+
+@pytest.mark.parametrize("timeframe", ["week", "year"])
+def test_generate_dashboard(bench_async, insights, learner, db, timeframe):
+    dashboard = bench_async(insights.generate_dashboard, learner.id, timeframe, db)
+    assert dashboard["daily_stats"]
+
+def test_generate_insights(bench_async, insights, learner, db):
+    bench_async(insights.generate_insights, learner.id, db)
+
+def test_calculate_trends(bench_async, insights, learner, db):
+    assert bench_async(insights.calculate_trends, learner.id, "accuracy", 90, db)
+
+def test_generate_recommendations(bench_async, insights, learner, db):
+    bench_async(insights.generate_recommendations, learner.id, db)
@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+import random
+
+import pytest
+
+from app.services.omnidim.emotion_detection import EmotionDetector, EmotionResult, EmotionType
+from app.services.omnidim.speech_analysis import SpeechAnalyzer
+
+@pytest.fixture(scope="module")
+def detector():
+    """Detector holding a busy session: one emotion sample every few seconds"""
+    rng = random.Random(7)
+    detector = EmotionDetector()
+    now = datetime.utcnow()
+    detector.emotion_history["session"] = [
+        EmotionResult(
+            primary_emotion=rng.choice(list(EmotionType)),
+            confidence=rng.random(),
+            all_emotions={e.value: rng.random() for e in EmotionType},
+            arousal=rng.random(),
+            valence=rng.random(),
+            timestamp=now - timedelta(seconds=4 * i)
+        )
+        for i in range(400)
+    ]
+    return detector
+
+def test_emotion_trend(bench_async, detector):
+    trend = bench_async(detector.analyze_emotion_trend, "session", time_window_minutes=30)
+    assert trend.emotion_sequence
+
+def test_emotion_insights(benchmark, detector):
+    insights = benchmark(detector.get_emotion_insights, "session", time_window_minutes=30)
+    assert insights["total_samples"] > 0
+
+def _analysis_payload(phonemes: int = 40):
+    return {
+        "transcript": "the quick brown fox jumps over the lazy dog " * 3,
+        "overall_score": 0.82,
+        "pronunciation": {"phonemes": [
+            {
+                "phoneme": f"p{i}", "accuracy": (i % 10) / 10, "confidence": 0.9,
+                "detected": f"p{i}", "expected": f"p{i}"
+            }
+            for i in range(phonemes)
+        ]},
+        "metrics": {"wpm": 135.0, "pause_ratio": 0.2, "clarity": 0.8, "confidence": 0.7},
+        "fluency": {"wpm": 135.0, "pause_ratio": 0.2, "clarity": 0.8, "confidence": 0.7, "fluency_score": 0.75},
+        "emotion": {"primary": "confident", "confidence": 0.8},
+    }
+
+@pytest.fixture(scope="module")
+def analyzer():
+    return SpeechAnalyzer()
+
+def test_parse_pronunciation_result(benchmark, analyzer):
+    result = benchmark(analyzer._parse_pronunciation_result, _analysis_payload())
+    assert len(result.pronunciation_scores) == 40
+
+def test_parse_fluency_result(benchmark, analyzer):
+    result = benchmark(analyzer._parse_fluency_result, _analysis_payload())
+    assert result.overall_score == 0.75
+
+def test_parse_comprehensive_result(benchmark, analyzer):
+    result = benchmark(analyzer._parse_comprehensive_result, _analysis_payload(), "the quick brown fox")
+    assert result.suggestions
@@ -0,0 +1,80 @@
+"""Response and WebSocket event encoding: time per payload, size in extra_info
+
+``validated`` is what FastAPI does for a ``response_model`` with the stock
+JSONResponse, ``jsonable`` what it does for untyped results; ``orjson``
+is the path hot endpoints now take.
+"""
+
+from typing import List
+import json
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.core.security import create_access_token
+from app.core.serialization import dumps
+from app.database import SessionLocal
+from app.models.learning_session import LearningSession
+from app.schemas.learning import LearningSessionResponse
+
+SESSION_FIELDS = list(LearningSessionResponse.model_fields)
+SESSION_PAGE = TypeAdapter(List[LearningSessionResponse])
+
+def stdlib_dumps(content) -> bytes:
+    # Starlette's JSONResponse.render
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+ENCODERS = {
+    "validated": lambda rows: stdlib_dumps(
+        SESSION_PAGE.dump_python(SESSION_PAGE.validate_python(rows), mode="json")
+    ),
+    "jsonable": lambda rows: stdlib_dumps(jsonable_encoder(rows)),
+    "orjson": dumps,
+}
+
+@pytest.fixture(scope="module")
+def session_page(learner):
+    """One 100-row page of session listing rows, as the endpoint loads them"""
+    db = SessionLocal()
+    try:
+        rows = db.query(*[getattr(LearningSession, f).label(f) for f in SESSION_FIELDS]).filter(
+            LearningSession.user_id == learner.id
+        ).order_by(LearningSession.started_at.desc()).limit(100).all()
+        return [row._asdict() for row in rows]
+    finally:
+        db.close()
+
+@pytest.mark.parametrize("encoder", list(ENCODERS))
+def test_encode_session_page(benchmark, session_page, encoder):
+    body = benchmark(ENCODERS[encoder], session_page)
+    benchmark.extra_info["bytes"] = len(body)
+    assert json.loads(body) == json.loads(dumps(session_page))
+
+TRANSCRIPT_EVENT = {
+    "type": "transcript",
+    "text": "The mitochondria is the powerhouse of the cell, it produces ATP",
+    "speaker": "ai",
+    "duration": 3.42,
+    "confidence": 0.93,
+}
+
+@pytest.mark.parametrize("encoder", ["stdlib", "orjson"])
+def test_encode_ws_event(benchmark, encoder):
+    encode = dumps if encoder == "orjson" else stdlib_dumps
+    body = benchmark(encode, TRANSCRIPT_EVENT)
+    benchmark.extra_info["bytes"] = len(body)
+
+@pytest.fixture(scope="module")
+def auth_headers(learner):
+    return {"Authorization": f"Bearer {create_access_token({'sub': learner.username})}"}
+
+@pytest.mark.parametrize("path", [
+    "/api/learning/sessions/?limit=100",
+    "/api/learning/analytics/dashboard?timeframe=year",
+    "/api/learning/progress/",
+])
+def test_response(benchmark, client, auth_headers, path):
+    response = benchmark(client.get, path, headers=auth_headers)
+    assert response.status_code == 200
+    benchmark.extra_info["bytes"] = len(response.content)
@@ -0,0 +1,71 @@
+"""Process startup: cold import of the app and latency to the first response
+
+Each round starts a fresh interpreter, so these run few rounds. The child
+reports its own phase timings, kept in the benchmark's extra_info.
+"""
+
+from pathlib import Path
+import json
+import os
+import subprocess
+import sys
+
+from app.core.security import create_access_token
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+COLD_IMPORT = """
+import json, sys, time
+started = time.perf_counter()
+import app.main
+print(json.dumps({
+    "import_s": time.perf_counter() - started,
+    "numpy_loaded": "numpy" in sys.modules,
+}))
+"""
+
+FIRST_REQUEST = """
+import json, os, time
+started = time.perf_counter()
+from fastapi.testclient import TestClient
+from app.main import app
+imported = time.perf_counter()
+with TestClient(app) as client:
+    ready = time.perf_counter()
+    response = client.get(
+        "/api/learning/progress/",
+        headers={"Authorization": "Bearer " + os.environ["BENCH_TOKEN"]}
+    )
+    done = time.perf_counter()
+    assert response.status_code == 200, response.text
+print(json.dumps({
+    "import_s": imported - started,
+    "lifespan_s": ready - imported,
+    "first_request_s": done - ready,
+}))
+"""
+
+def run_child(code: str, env=None) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=BACKEND_DIR,
+        env={**os.environ, **(env or {})},
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def test_cold_import(benchmark):
+    phases = []
+    benchmark.pedantic(lambda: phases.append(run_child(COLD_IMPORT)), rounds=5, iterations=1)
+    benchmark.extra_info["import_s"] = min(p["import_s"] for p in phases)
+    # NumPy is only needed by a few code paths and loads on first use
+    assert not any(p["numpy_loaded"] for p in phases)
+
+def test_first_request(benchmark, learner):
+    env = {"BENCH_TOKEN": create_access_token({"sub": learner.username})}
+    phases = []
+    benchmark.pedantic(lambda: phases.append(run_child(FIRST_REQUEST, env)), rounds=5, iterations=1)
+    for phase in ("import_s", "lifespan_s", "first_request_s"):
+        benchmark.extra_info[phase] = min(p[phase] for p in phases)
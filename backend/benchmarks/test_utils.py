@@ -0,0 +1,39 @@
+import io
+import wave
+
+import numpy as np
+import pytest
+
+from app.utils.audio_processing import AudioProcessor
+from app.utils.voice_helpers import VoiceHelpers
+
+def _wav(seconds: float = 3.0, rate: int = 16000) -> bytes:
+    t = np.arange(int(seconds * rate)) / rate
+    samples = (np.sin(2 * np.pi * 220 * t) * 8000).astype(np.int16)
+    output = io.BytesIO()
+    with wave.open(output, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(samples.tobytes())
+    return output.getvalue()
+
+AUDIO = _wav()
+
+def test_validate_audio_format(benchmark):
+    assert benchmark(AudioProcessor.validate_audio_format, AUDIO)
+
+def test_get_audio_duration(benchmark):
+    assert benchmark(AudioProcessor.get_audio_duration, AUDIO) == pytest.approx(3.0)
+
+def test_normalize_audio(benchmark):
+    assert len(benchmark(AudioProcessor.normalize_audio, AUDIO)) == len(AUDIO)
+
+@pytest.mark.parametrize("transcript, command", [
+    ("Could you repeat that please", "repeat"),
+    ("okay that's enough, goodbye", "stop"),
+    ("photosynthesis converts light energy into chemical energy in plants", None),
+])
+def test_extract_command(benchmark, transcript, command):
+    result = benchmark(VoiceHelpers.extract_command, transcript)
+    assert (result or {}).get("command") == command
@@ -0,0 +1,62 @@
+"""Voice stream wire protocols: CPU per simulated second of Omnidim traffic
+
+Frames and bytes sent for that second are kept in extra_info as
+frames_per_s and bytes_per_s; coalescing protocols flush on every tick.
+"""
+
+import pytest
+
+from app.api.websocket.outbound import OutboundScheduler
+from app.api.websocket.protocol import LEGACY, JSONProtocol, MessagePackProtocol, SUBPROTOCOL_JSON
+
+TICKS_PER_SECOND = 10
+
+def one_second_of_traffic():
+    """Per tick: 20 ms audio chunks, emotion and metrics updates; transcripts now and then"""
+    for tick in range(TICKS_PER_SECOND):
+        events = [{"type": "audio", "data": bytes(640)} for _ in range(5)]
+        events += [
+            {"type": "emotion", "emotion": "engaged", "confidence": 0.81, "valence": 0.4 + tick / 100, "arousal": 0.6}
+            for _ in range(3)
+        ]
+        events.append({"type": "metrics", "words_per_minute": 131.5, "pause_ratio": 0.18, "volume": 0.7})
+        if tick % 5 == 4:
+            events.append({"type": "transcript", "text": "Photosynthesis turns light into chemical energy", "speaker": "ai"})
+        yield events
+
+TRAFFIC = list(one_second_of_traffic())
+
+class CountingSocket:
+    def __init__(self):
+        self.frames = 0
+        self.bytes = 0
+
+    async def send(self, message):
+        payload = message.get("bytes")
+        if payload is None:
+            payload = message["text"].encode("utf-8")
+        self.frames += 1
+        self.bytes += len(payload)
+
+PROTOCOLS = {
+    "json-legacy": LEGACY,
+    "json": JSONProtocol(SUBPROTOCOL_JSON, coalesce=True),
+    "msgpack": MessagePackProtocol(),
+}
+
+@pytest.mark.parametrize("name", list(PROTOCOLS))
+def test_stream_one_second(benchmark, event_loop_runner, name):
+    sockets = []
+
+    async def stream_second():
+        socket = CountingSocket()
+        stream = OutboundScheduler(socket, PROTOCOLS[name], interval=1 / TICKS_PER_SECOND)
+        for events in TRAFFIC:
+            for event in events:
+                await stream.send(event)
+            await stream.drain()
+        sockets.append(socket)
+
+    benchmark(lambda: event_loop_runner(stream_second()))
+    benchmark.extra_info["frames_per_s"] = sockets[-1].frames
+    benchmark.extra_info["bytes_per_s"] = sockets[-1].bytes
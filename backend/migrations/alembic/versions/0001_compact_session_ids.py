@@ -0,0 +1,115 @@
+"""Store learning session ids as 16-byte UUIDs
+
+Revision ID: 0001_compact_session_ids
+Revises:
+Create Date: 2026-10-19 00:00:00.000000
+
+Converts ``learning_sessions.id`` and ``voice_interactions.session_id`` from
+36-character strings to native ``uuid`` on PostgreSQL, ``BINARY(16)`` on
+MySQL/MariaDB and ``BLOB`` on SQLite. Existing ids keep their value so links held by clients stay valid;
+only new sessions get time-ordered (v7) ids.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import uuid
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_compact_session_ids'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+
+
+def _tables_exist(bind) -> bool:
+    # Fresh databases get the new column types from the models directly
+    return sa.inspect(bind).has_table("learning_sessions")
+
+
+def _binary_type(bind):
+    if bind.dialect.name in ("mysql", "mariadb"):
+        return sa.BINARY(16)
+    return sa.LargeBinary(16)
+
+
+def _convert_rows(bind, to_binary: bool) -> None:
+    """Rewrite id values in place, in batches, on non-PostgreSQL backends"""
+    def convert(value):
+        if isinstance(value, memoryview):
+            value = bytes(value)
+        if to_binary:
+            if isinstance(value, bytes):
+                if len(value) == 16:
+                    return value
+                value = value.decode()
+            return uuid.UUID(value).bytes
+        return str(uuid.UUID(bytes=value)) if isinstance(value, bytes) else value
+
+    sessions = sa.table("learning_sessions", sa.column("id"))
+    interactions = sa.table("voice_interactions", sa.column("session_id"))
+
+    ids = [row[0] for row in bind.execute(sa.select(sessions.c.id))]
+    for start in range(0, len(ids), BATCH_SIZE):
+        batch = [
+            {"old_id": old, "new_id": convert(old)}
+            for old in ids[start:start + BATCH_SIZE]
+        ]
+        bind.execute(
+            sessions.update().where(sessions.c.id == sa.bindparam("old_id"))
+            .values(id=sa.bindparam("new_id")),
+            batch
+        )
+        bind.execute(
+            interactions.update().where(interactions.c.session_id == sa.bindparam("old_id"))
+            .values(session_id=sa.bindparam("new_id")),
+            batch
+        )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if not _tables_exist(bind):
+        return
+
+    if bind.dialect.name == "postgresql":
+        op.drop_constraint("voice_interactions_session_id_fkey", "voice_interactions", type_="foreignkey")
+        op.execute("ALTER TABLE learning_sessions ALTER COLUMN id TYPE uuid USING id::uuid")
+        op.execute("ALTER TABLE voice_interactions ALTER COLUMN session_id TYPE uuid USING session_id::uuid")
+        op.create_foreign_key(
+            "voice_interactions_session_id_fkey", "voice_interactions",
+            "learning_sessions", ["session_id"], ["id"]
+        )
+        return
+
+    # Other backends: rebuild the columns with a binary type (the copy keeps
+    # the text bytes), then rewrite the values as 16-byte UUIDs
+    with op.batch_alter_table("voice_interactions") as batch_op:
+        batch_op.alter_column("session_id", type_=_binary_type(bind), existing_nullable=False)
+    with op.batch_alter_table("learning_sessions") as batch_op:
+        batch_op.alter_column("id", type_=_binary_type(bind))
+    _convert_rows(bind, to_binary=True)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if not _tables_exist(bind):
+        return
+
+    if bind.dialect.name == "postgresql":
+        op.drop_constraint("voice_interactions_session_id_fkey", "voice_interactions", type_="foreignkey")
+        op.alter_column("voice_interactions", "session_id", type_=sa.String(), postgresql_using="session_id::text")
+        op.alter_column("learning_sessions", "id", type_=sa.String(), postgresql_using="id::text")
+        op.create_foreign_key(
+            "voice_interactions_session_id_fkey", "voice_interactions",
+            "learning_sessions", ["session_id"], ["id"]
+        )
+        return
+
+    _convert_rows(bind, to_binary=False)
+    with op.batch_alter_table("voice_interactions") as batch_op:
+        batch_op.alter_column("session_id", type_=sa.String(), existing_nullable=False)
+    with op.batch_alter_table("learning_sessions") as batch_op:
+        batch_op.alter_column("id", type_=sa.String())
@@ -0,0 +1,157 @@
+"""Deduplicate learning session configs into session_configs
+
+Revision ID: 0002_session_configs
+Revises: 0001_compact_session_ids
+Create Date: 2026-10-19 00:00:00.000000
+
+Adds the content-addressed ``session_configs`` table and moves existing
+``learning_sessions.config`` blobs into it: each session keeps the config
+hash plus its per-session ``user_id`` override, and ``config`` is cleared.
+Sessions are read in batches of BATCH_SIZE and each batch is written back
+with one executemany ``UPDATE``.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import hashlib
+import json
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_session_configs'
+down_revision = '0001_compact_session_ids'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+PER_SESSION_KEYS = ("user_id",)
+
+
+def _hash_config(config: dict) -> str:
+    # Must match SessionConfigStore.hash_config
+    canonical = json.dumps(config, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("learning_sessions") or inspector.has_table("session_configs"):
+        return
+
+    op.create_table(
+        "session_configs",
+        sa.Column("hash", sa.String(64), primary_key=True),
+        sa.Column("config", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    with op.batch_alter_table("learning_sessions") as batch_op:
+        batch_op.add_column(sa.Column("config_hash", sa.String(64), nullable=True))
+        batch_op.add_column(sa.Column("config_overrides", sa.JSON(), nullable=True))
+        batch_op.create_foreign_key(
+            "fk_learning_sessions_config_hash", "session_configs", ["config_hash"], ["hash"]
+        )
+
+    sessions = sa.table(
+        "learning_sessions",
+        sa.column("id"),
+        sa.column("config", sa.JSON()),
+        sa.column("config_hash", sa.String()),
+        sa.column("config_overrides", sa.JSON()),
+    )
+    configs = sa.table(
+        "session_configs",
+        sa.column("hash", sa.String()),
+        sa.column("config", sa.JSON()),
+    )
+
+    known_hashes = set()
+    last_id = None
+    while True:
+        query = (
+            sa.select(sessions.c.id, sessions.c.config)
+            .where(sessions.c.config.isnot(None))
+            .order_by(sessions.c.id)
+            .limit(BATCH_SIZE)
+        )
+        if last_id is not None:
+            query = query.where(sessions.c.id > last_id)
+        rows = bind.execute(query).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        new_configs, updates = [], []
+        for session_id, config in rows:
+            if isinstance(config, str):
+                config = json.loads(config)
+            if not isinstance(config, dict):
+                # Leave JSON null and unexpected shapes untouched
+                continue
+            shared = {k: v for k, v in config.items() if k not in PER_SESSION_KEYS}
+            overrides = {k: config[k] for k in PER_SESSION_KEYS if k in config}
+            config_hash = _hash_config(shared)
+            if config_hash not in known_hashes:
+                known_hashes.add(config_hash)
+                new_configs.append({"hash": config_hash, "config": shared})
+            updates.append({"b_id": session_id, "b_hash": config_hash, "b_overrides": overrides})
+
+        if new_configs:
+            bind.execute(configs.insert(), new_configs)
+        if updates:
+            bind.execute(
+                sessions.update().where(sessions.c.id == sa.bindparam("b_id")).values(
+                    config_hash=sa.bindparam("b_hash"),
+                    config_overrides=sa.bindparam("b_overrides", type_=sa.JSON()),
+                    config=sa.null()
+                ),
+                updates
+            )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("session_configs"):
+        return
+
+    sessions = sa.table(
+        "learning_sessions",
+        sa.column("id"),
+        sa.column("config", sa.JSON()),
+        sa.column("config_hash", sa.String()),
+        sa.column("config_overrides", sa.JSON()),
+    )
+    configs = sa.table(
+        "session_configs",
+        sa.column("hash", sa.String()),
+        sa.column("config", sa.JSON()),
+    )
+
+    shared_by_hash = {
+        config_hash: (json.loads(config) if isinstance(config, str) else config)
+        for config_hash, config in bind.execute(sa.select(configs.c.hash, configs.c.config))
+    }
+    rows = bind.execute(
+        sa.select(sessions.c.id, sessions.c.config_hash, sessions.c.config_overrides)
+        .where(sessions.c.config_hash.isnot(None))
+    ).fetchall()
+    restored = []
+    for session_id, config_hash, overrides in rows:
+        if isinstance(overrides, str):
+            overrides = json.loads(overrides)
+        config = dict(shared_by_hash.get(config_hash) or {})
+        config.update(overrides or {})
+        restored.append({"b_id": session_id, "b_config": config})
+    if restored:
+        bind.execute(
+            sessions.update().where(sessions.c.id == sa.bindparam("b_id"))
+            .values(config=sa.bindparam("b_config", type_=sa.JSON())),
+            restored
+        )
+
+    with op.batch_alter_table("learning_sessions") as batch_op:
+        batch_op.drop_constraint("fk_learning_sessions_config_hash", type_="foreignkey")
+        batch_op.drop_column("config_overrides")
+        batch_op.drop_column("config_hash")
+    op.drop_table("session_configs")
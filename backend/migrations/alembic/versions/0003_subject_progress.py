@@ -0,0 +1,94 @@
+"""Normalize per-subject progress into subject_progress
+
+Revision ID: 0003_subject_progress
+Revises: 0002_session_configs
+Create Date: 2026-10-19 00:00:00.000000
+
+Creates ``subject_progress`` keyed by (user_id, subject) and copies whatever
+the legacy ``progress.subject_progress`` JSON blobs hold into it. The JSON
+column is left in place but no longer written.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import json
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_subject_progress'
+down_revision = '0002_session_configs'
+branch_labels = None
+depends_on = None
+
+
+def _number(data: dict, *keys, default=0):
+    for key in keys:
+        value = data.get(key)
+        if isinstance(value, (int, float)):
+            return value
+    return default
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("progress") or inspector.has_table("subject_progress"):
+        return
+
+    op.create_table(
+        "subject_progress",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("subject", sa.String(), primary_key=True),
+        sa.Column("total_time", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("sessions", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("accuracy_sum", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("accuracy_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("experience_points", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_studied_at", sa.DateTime(timezone=True)),
+    )
+
+    progress = sa.table(
+        "progress",
+        sa.column("user_id", sa.Integer()),
+        sa.column("subject_progress", sa.JSON()),
+    )
+    subject_progress = sa.table(
+        "subject_progress",
+        sa.column("user_id", sa.Integer()),
+        sa.column("subject", sa.String()),
+        sa.column("total_time", sa.Integer()),
+        sa.column("sessions", sa.Integer()),
+        sa.column("accuracy_sum", sa.Float()),
+        sa.column("accuracy_count", sa.Integer()),
+        sa.column("experience_points", sa.Integer()),
+    )
+
+    rows = []
+    for user_id, blob in bind.execute(sa.select(progress.c.user_id, progress.c.subject_progress)):
+        if isinstance(blob, str):
+            blob = json.loads(blob)
+        if not isinstance(blob, dict):
+            continue
+        for subject, data in blob.items():
+            if not isinstance(data, dict):
+                continue
+            sessions = int(_number(data, "sessions", "total_sessions"))
+            accuracy = _number(data, "accuracy", "average_accuracy", default=None)
+            rows.append({
+                "user_id": user_id,
+                "subject": subject,
+                "total_time": int(_number(data, "total_time", "time")),
+                "sessions": sessions,
+                "accuracy_sum": accuracy * max(sessions, 1) if accuracy is not None else 0.0,
+                "accuracy_count": max(sessions, 1) if accuracy is not None else 0,
+                "experience_points": int(_number(data, "experience_points", "xp")),
+            })
+
+    if rows:
+        bind.execute(subject_progress.insert(), rows)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if sa.inspect(bind).has_table("subject_progress"):
+        op.drop_table("subject_progress")
@@ -0,0 +1,39 @@
+"""Index study_streaks for active-streak lookups
+
+Revision ID: 0004_study_streak_index
+Revises: 0003_subject_progress
+Create Date: 2026-10-19 00:00:00.000000
+
+The streak engine updates the caller's active ``study_streaks`` row on every
+session end and the nightly recompute deletes by user-id range; both filter
+on ``user_id``, which was unindexed.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_study_streak_index'
+down_revision = '0003_subject_progress'
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = "ix_study_streaks_user_active"
+
+
+def _has_index(inspector) -> bool:
+    return any(ix["name"] == INDEX_NAME for ix in inspector.get_indexes("study_streaks"))
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("study_streaks") or _has_index(inspector):
+        return
+    op.create_index(INDEX_NAME, "study_streaks", ["user_id", "is_active"])
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if inspector.has_table("study_streaks") and _has_index(inspector):
+        op.drop_index(INDEX_NAME, table_name="study_streaks")
@@ -0,0 +1,68 @@
+"""Add achievement counters and make awards unique per user
+
+Revision ID: 0005_achievement_counters
+Revises: 0004_study_streak_index
+Create Date: 2026-10-19 00:00:00.000000
+
+Creates ``achievement_counters`` for the achievement engine and a unique
+(user_id, name) index on ``achievements`` so awards are idempotent. Any
+duplicate awards already present are collapsed onto the earliest row.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_achievement_counters'
+down_revision = '0004_study_streak_index'
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = "uq_achievements_user_name"
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("achievements"):
+        return
+
+    if not inspector.has_table("achievement_counters"):
+        op.create_table(
+            "achievement_counters",
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+            sa.Column("name", sa.String(), primary_key=True),
+            sa.Column("value", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("updated_at", sa.DateTime(timezone=True)),
+        )
+
+    if any(ix["name"] == INDEX_NAME for ix in inspector.get_indexes("achievements")):
+        return
+
+    achievements = sa.table(
+        "achievements",
+        sa.column("id", sa.Integer()),
+        sa.column("user_id", sa.Integer()),
+        sa.column("name", sa.String()),
+    )
+    # Wrapped in a derived table so MySQL accepts the self-referencing delete
+    keep = (
+        sa.select(sa.func.min(achievements.c.id).label("id"))
+        .group_by(achievements.c.user_id, achievements.c.name)
+        .subquery("keep")
+    )
+    bind.execute(achievements.delete().where(achievements.c.id.notin_(sa.select(keep.c.id))))
+
+    op.create_index(INDEX_NAME, "achievements", ["user_id", "name"], unique=True)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if inspector.has_table("achievements") and any(
+        ix["name"] == INDEX_NAME for ix in inspector.get_indexes("achievements")
+    ):
+        op.drop_index(INDEX_NAME, table_name="achievements")
+    if inspector.has_table("achievement_counters"):
+        op.drop_table("achievement_counters")
@@ -0,0 +1,38 @@
+"""Index voice_interactions by timestamp for archival
+
+Revision ID: 0006_interaction_timestamp_index
+Revises: 0005_achievement_counters
+Create Date: 2026-10-19 00:00:00.000000
+
+The archival and retention jobs select interactions older than a cutoff
+across all users; without this index each batch scans the whole table.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006_interaction_timestamp_index'
+down_revision = '0005_achievement_counters'
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = "ix_voice_interactions_timestamp"
+
+
+def _has_index(inspector) -> bool:
+    return any(ix["name"] == INDEX_NAME for ix in inspector.get_indexes("voice_interactions"))
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("voice_interactions") or _has_index(inspector):
+        return
+    op.create_index(INDEX_NAME, "voice_interactions", ["timestamp"])
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if inspector.has_table("voice_interactions") and _has_index(inspector):
+        op.drop_index(INDEX_NAME, table_name="voice_interactions")
@@ -0,0 +1,32 @@
+"""Create the schema on fresh databases
+
+Revision ID: 0007_create_schema
+Revises: 0006_interaction_timestamp_index
+Create Date: 2026-10-19 00:00:00.000000
+
+The application used to run ``create_all`` on import; tables now come from
+migrations only. Earlier revisions skip databases without tables, so this
+one creates whatever the models define and is missing. Existing tables are
+left alone.
+
+"""
+from alembic import op
+
+from app.database import Base
+import app.models  # noqa: F401  registers every table on Base.metadata
+
+
+# revision identifiers, used by Alembic.
+revision = '0007_create_schema'
+down_revision = '0006_interaction_timestamp_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    Base.metadata.create_all(bind=op.get_bind(), checkfirst=True)
+
+
+def downgrade() -> None:
+    # Dropping every table would lose data; schema created here stays
+    pass
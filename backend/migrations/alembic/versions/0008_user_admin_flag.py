@@ -0,0 +1,39 @@
+"""Add users.is_admin
+
+Revision ID: 0008_user_admin_flag
+Revises: 0007_create_schema
+Create Date: 2026-10-19 00:00:00.000000
+
+Admin rights used to follow from the username alone, and anyone could
+register one of the listed names. They now come from this flag, which
+starts false for everyone and is set with scripts/grant_admin.py.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008_user_admin_flag'
+down_revision = '0007_create_schema'
+branch_labels = None
+depends_on = None
+
+
+def _has_column(inspector) -> bool:
+    return any(column["name"] == "is_admin" for column in inspector.get_columns("users"))
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("users") or _has_column(inspector):
+        return
+    with op.batch_alter_table("users") as batch:
+        batch.add_column(sa.Column("is_admin", sa.Boolean(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if inspector.has_table("users") and _has_column(inspector):
+        with op.batch_alter_table("users") as batch:
+            batch.drop_column("is_admin")
@@ -0,0 +1,56 @@
+"""Index voice metrics and session listing queries
+
+Revision ID: 0009_query_indexes
+Revises: 0008_user_admin_flag
+Create Date: 2026-10-19 00:00:00.000000
+
+The voice metrics aggregates filter interactions by session and user, and
+the trend and history queries by user and time. The models declared these
+indexes but databases upgraded through migrations never got them.
+
+Session listing pages on (started_at, id) per user. On SQLite, rows that
+took the CURRENT_TIMESTAMP server default were stored without microseconds
+and never compare equal to a bound cursor value, so they are rewritten in
+the format SQLAlchemy writes.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009_query_indexes'
+down_revision = '0008_user_admin_flag'
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns)
+INDEXES = [
+    ("ix_voice_interactions_session_user", "voice_interactions", ["session_id", "user_id"]),
+    ("ix_voice_interactions_user_timestamp", "voice_interactions", ["user_id", "timestamp"]),
+    ("ix_learning_sessions_user_started", "learning_sessions", ["user_id", "started_at", "id"]),
+]
+
+
+def _has_index(inspector, name: str, table: str) -> bool:
+    return any(ix["name"] == name for ix in inspector.get_indexes(table))
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if bind.dialect.name == "sqlite" and inspector.has_table("learning_sessions"):
+        op.execute(
+            "UPDATE learning_sessions SET started_at = started_at || '.000000' "
+            "WHERE length(started_at) = 19"
+        )
+    for name, table, columns in INDEXES:
+        if inspector.has_table(table) and not _has_index(inspector, name, table):
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for name, table, _ in reversed(INDEXES):
+        if inspector.has_table(table) and _has_index(inspector, name, table):
+            op.drop_index(name, table_name=table)
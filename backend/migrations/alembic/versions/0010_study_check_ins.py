@@ -0,0 +1,39 @@
+"""Add study_check_ins
+
+Revision ID: 0010_study_check_ins
+Revises: 0009_query_indexes
+Create Date: 2026-10-19 00:00:00.000000
+
+``POST /api/learning/progress/update-streak`` credits a study day without a
+session. The nightly streak recompute only saw completed sessions and reset
+those streaks, so the check-ins are now stored, one row per user and day.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0010_study_check_ins'
+down_revision = '0009_query_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("users") or inspector.has_table("study_check_ins"):
+        return
+
+    op.create_table(
+        "study_check_ins",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if sa.inspect(bind).has_table("study_check_ins"):
+        op.drop_table("study_check_ins")
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""Backfill achievement counters and awards for existing users
+
+Rebuilds every achievement counter from stored sessions, interactions and
+streaks, then awards whatever users have already earned. Safe to re-run.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import logging
+
+from app.database import SessionLocal
+from app.services.learning.achievement_engine import AchievementEngine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Users per transaction")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        stats = AchievementEngine().backfill(db, chunk_size=args.chunk_size)
+    finally:
+        db.close()
+
+    logger.info(
+        f"✅ Backfilled {stats['counters']} counters for {stats['users']} users, "
+        f"{stats['awards']} new achievements"
+    )
+
+if __name__ == "__main__":
+    main()
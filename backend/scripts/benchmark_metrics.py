@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Measure the hot-path cost of recording metrics
+
+Times counter increments, histogram observations (with cached and looked-up
+label children), the Omnidim call decorator and the per-request middleware
+against a bare ASGI app, single-threaded and with concurrent threads.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import threading
+import time
+
+from app.core.metrics import Counter, Histogram, MetricsMiddleware, Registry, observe_omnidim
+
+def per_call_ns(func, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started) / iterations * 1e9
+
+def threaded_ns(func, iterations: int, threads: int) -> float:
+    def worker():
+        for _ in range(iterations):
+            func()
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return (time.perf_counter() - started) / (iterations * threads) * 1e9
+
+def bench_middleware(iterations: int):
+    scope = {"type": "http", "method": "GET", "path": "/bench"}
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        pass
+
+    wrapped = MetricsMiddleware(app)
+
+    async def run(target):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            await target(dict(scope), receive, send)
+        return (time.perf_counter() - started) / iterations * 1e9
+
+    bare = asyncio.run(run(app))
+    instrumented = asyncio.run(run(wrapped))
+    return bare, instrumented
+
+def bench_decorator(iterations: int):
+    async def call():
+        return None
+
+    timed = observe_omnidim("bench")(call)
+
+    async def run(target):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            await target()
+        return (time.perf_counter() - started) / iterations * 1e9
+
+    return asyncio.run(run(call)), asyncio.run(run(timed))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=500_000)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+    n = args.iterations
+
+    registry = Registry()
+    counter = Counter("bench_total", "bench", registry=registry)
+    labelled = Counter("bench_labelled_total", "bench", ["route", "status"], registry=registry)
+    histogram = Histogram("bench_seconds", "bench", ["route"], registry=registry)
+    cached_counter = labelled.labels("/api/bench", 200)
+    cached_histogram = histogram.labels("/api/bench")
+
+    rows = [
+        ("empty call (baseline)", per_call_ns(lambda: None, n)),
+        ("counter.inc()", per_call_ns(counter.inc, n)),
+        ("counter.labels(...).inc()", per_call_ns(lambda: labelled.labels("/api/bench", 200).inc(), n)),
+        ("cached child .inc()", per_call_ns(cached_counter.inc, n)),
+        ("histogram.labels(...).observe()", per_call_ns(lambda: histogram.labels("/api/bench").observe(0.012), n)),
+        ("cached child .observe()", per_call_ns(lambda: cached_histogram.observe(0.012), n)),
+        (f"cached .observe(), {args.threads} threads", threaded_ns(lambda: cached_histogram.observe(0.012), n // args.threads, args.threads)),
+    ]
+    for name, ns in rows:
+        print(f"{name:<40} {ns:>8.0f} ns")
+
+    bare, instrumented = bench_decorator(n // 5)
+    print(f"{'omnidim decorator overhead':<40} {instrumented - bare:>8.0f} ns  ({bare:.0f} -> {instrumented:.0f})")
+    bare, instrumented = bench_middleware(n // 5)
+    print(f"{'middleware overhead per request':<40} {instrumented - bare:>8.0f} ns  ({bare:.0f} -> {instrumented:.0f})")
+
+    started = time.perf_counter()
+    asyncio.run(registry.render())
+    print(f"{'render':<40} {(time.perf_counter() - started) * 1e6:>8.0f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Compare insert rate and index size of random string vs compact time-ordered session ids
+
+Builds the learning_sessions / voice_interactions key layout twice in scratch
+SQLite databases: once with 36-char uuid4 strings (the old layout) and once
+with 16-byte uuid7 values (CompactUUID), then inserts the same volume of rows
+into each and reports throughput and per-index size.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import (
+    create_engine, MetaData, Table, Column, Integer, String, DateTime, ForeignKey, Index, text
+)
+
+from app.models.types import CompactUUID, uuid7
+
+LAYOUTS = {
+    "uuid4_string": (String, lambda: str(uuid.uuid4())),
+    "uuid7_compact": (CompactUUID, uuid7),
+}
+
+def build_tables(id_type):
+    """Minimal copy of the session/interaction key layout"""
+    metadata = MetaData()
+    sessions = Table(
+        "learning_sessions", metadata,
+        Column("id", id_type, primary_key=True),
+        Column("user_id", Integer, nullable=False),
+        Column("started_at", DateTime),
+    )
+    interactions = Table(
+        "voice_interactions", metadata,
+        Column("id", Integer, primary_key=True),
+        Column("session_id", id_type, ForeignKey("learning_sessions.id"), nullable=False),
+        Column("user_id", Integer, nullable=False),
+        Column("timestamp", DateTime),
+        Index("ix_voice_interactions_session_user", "session_id", "user_id"),
+    )
+    return metadata, sessions, interactions
+
+def index_sizes(conn):
+    """Bytes used per table/index, via the dbstat virtual table when available"""
+    try:
+        rows = conn.execute(text(
+            "SELECT name, SUM(pgsize) FROM dbstat GROUP BY name ORDER BY name"
+        )).fetchall()
+        return {name: size for name, size in rows if name != "sqlite_schema"}
+    except Exception:
+        page_size = conn.execute(text("PRAGMA page_size")).scalar()
+        page_count = conn.execute(text("PRAGMA page_count")).scalar()
+        return {"database": page_size * page_count}
+
+def run_layout(name, sessions_count, interactions_per_session, batch_size):
+    id_type, new_id = LAYOUTS[name]
+    metadata, sessions, interactions = build_tables(id_type)
+
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}")
+    metadata.create_all(engine)
+
+    now = datetime.utcnow()
+    total_rows = 0
+    started = time.perf_counter()
+
+    with engine.begin() as conn:
+        for offset in range(0, sessions_count, batch_size):
+            session_rows = [
+                {"id": new_id(), "user_id": (offset + i) % 1000, "started_at": now}
+                for i in range(min(batch_size, sessions_count - offset))
+            ]
+            conn.execute(sessions.insert(), session_rows)
+            conn.execute(interactions.insert(), [
+                {"session_id": row["id"], "user_id": row["user_id"], "timestamp": now}
+                for row in session_rows
+                for _ in range(interactions_per_session)
+            ])
+            total_rows += len(session_rows) * (1 + interactions_per_session)
+
+    elapsed = time.perf_counter() - started
+
+    with engine.connect() as conn:
+        sizes = index_sizes(conn)
+    engine.dispose()
+    os.remove(path)
+
+    return {
+        "layout": name,
+        "rows": total_rows,
+        "seconds": elapsed,
+        "rows_per_second": total_rows / elapsed if elapsed else 0,
+        "sizes": sizes,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=20000)
+    parser.add_argument("--interactions-per-session", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    for name in LAYOUTS:
+        result = run_layout(
+            name, args.sessions, args.interactions_per_session, args.batch_size
+        )
+        print(f"\n{result['layout']}: {result['rows']} rows in {result['seconds']:.2f}s "
+              f"({result['rows_per_second']:.0f} rows/s)")
+        for table, size in sorted(result["sizes"].items()):
+            print(f"  {table:45s} {size / 1024:10.1f} KiB")
+
+if __name__ == "__main__":
+    main()
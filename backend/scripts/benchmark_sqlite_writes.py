@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Compare SQLite write throughput of the default and performance profiles
+
+For each profile, builds a scratch database with the app's schema and writes
+voice interactions the way the API does (insert plus session counter update,
+one transaction each):
+
+- threads: concurrent threads writing through their own sessions, like sync
+  request handlers
+- queue: concurrent coroutines writing through a single-writer WriteQueue,
+  like the WebSocket handlers
+
+and reports committed transactions per second and failed writes.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import tempfile
+import threading
+import time
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, WriteQueue, build_engine
+from app.models import *  # noqa: F401,F403 - registers the tables
+from app.models.learning_session import LearningSession, SessionType
+from app.models.user import User
+from app.models.voice_interaction import VoiceInteraction, InteractionType
+
+PROFILES = ["default", "performance"]
+
+def setup(profile: str, directory: str):
+    engine = build_engine(f"sqlite:///{directory}/{profile}.db", sqlite_profile=profile)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = factory()
+    user = User(email=f"{profile}@bench.local", username=f"bench-{profile}", hashed_password="x")
+    db.add(user)
+    db.flush()
+    session = LearningSession(
+        user_id=user.id, omnidim_session_id=f"bench-{profile}", type=list(SessionType)[0]
+    )
+    db.add(session)
+    db.commit()
+    ids = (user.id, session.id)
+    db.close()
+    return engine, factory, ids
+
+def write_interaction(db, user_id, session_id):
+    db.add(VoiceInteraction(
+        session_id=session_id,
+        user_id=user_id,
+        type=InteractionType.USER_SPEECH,
+        transcript="benchmark utterance",
+        interaction_metadata={"duration_seconds": 1.5}
+    ))
+    db.query(LearningSession).filter(LearningSession.id == session_id).update(
+        {LearningSession.interaction_count: LearningSession.interaction_count + 1},
+        synchronize_session=False
+    )
+
+def bench_threads(factory, ids, writers: int, writes: int):
+    failed = [0]
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(writes):
+            db = factory()
+            try:
+                write_interaction(db, *ids)
+                db.commit()
+            except OperationalError:
+                db.rollback()
+                with lock:
+                    failed[0] += 1
+            finally:
+                db.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(writers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return writers * writes - failed[0], failed[0], elapsed
+
+def bench_queue(factory, ids, writers: int, writes: int):
+    queue = WriteQueue(factory, workers=1)
+    failed = 0
+
+    async def worker():
+        nonlocal failed
+        for _ in range(writes):
+            try:
+                await queue.run(lambda db: write_interaction(db, *ids))
+            except OperationalError:
+                failed += 1
+
+    async def run():
+        await asyncio.gather(*[worker() for _ in range(writers)])
+
+    started = time.perf_counter()
+    asyncio.run(run())
+    elapsed = time.perf_counter() - started
+    queue.shutdown()
+    return writers * writes - failed, failed, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=8, help="Concurrent threads or coroutines")
+    parser.add_argument("--writes", type=int, default=250, help="Transactions per writer")
+    args = parser.parse_args()
+
+    print(f"{'profile':<12} {'mode':<8} {'commits':>8} {'failed':>7} {'seconds':>8} {'tx/s':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for profile in PROFILES:
+            engine, factory, ids = setup(profile, directory)
+            for mode, bench in (("threads", bench_threads), ("queue", bench_queue)):
+                committed, failed, elapsed = bench(factory, ids, args.writers, args.writes)
+                print(
+                    f"{profile:<12} {mode:<8} {committed:>8} {failed:>7} "
+                    f"{elapsed:>8.2f} {committed / elapsed:>9.0f}"
+                )
+            engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Measure nightly streak recompute throughput
+
+Two stages:
+
+* ``compute``: the vectorized run detection (compute_streak_runs) over a
+  synthetic study history for --users users (1M by default), next to a
+  per-user Python loop on a sample for comparison.
+* ``recompute``: StreakEngine.recompute_all end to end against a scratch
+  SQLite database holding --db-users users, including the chunked reads
+  and executemany writes.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta, date
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.learning_session import LearningSession, SessionType, SessionStatus
+from app.models.types import uuid7
+from app.services.learning.streak_engine import StreakEngine, compute_streak_runs
+
+EPOCH = date(1970, 1, 1)
+
+def synthetic_history(users: int, days: int, study_rate: float, seed: int):
+    """(user_id, day) pairs where each user studies on a random subset of days"""
+    rng = np.random.default_rng(seed)
+    # Per-user study probability so some users are daily learners, others rare
+    rates = np.clip(rng.beta(2, 2, size=users) * study_rate * 2, 0.02, 0.98)
+    studied = rng.random((users, days), dtype=np.float32) < rates[:, None].astype(np.float32)
+    user_ids, day_offsets = np.nonzero(studied)
+    start_day = (date.today() - EPOCH).days - days
+    return user_ids.astype(np.int64) + 1, day_offsets.astype(np.int64) + start_day
+
+def naive_streaks(days):
+    """Reference per-user loop, same rules as compute_streak_runs"""
+    longest, current, freeze_used, last = 0, 0, False, None
+    for day in sorted(set(days)):
+        if last is not None and day - last == 1:
+            current += 1
+        elif last is not None and day - last == 2 and not freeze_used:
+            current += 1
+            freeze_used = True
+        else:
+            current, freeze_used = 1, False
+        longest = max(longest, current)
+        last = day
+    return longest
+
+def bench_compute(users: int, days: int, study_rate: float, sample: int, seed: int):
+    user_ids, day_numbers = synthetic_history(users, days, study_rate, seed)
+    as_of_day = (date.today() - EPOCH).days
+    print(f"compute: {users} users, {len(user_ids)} study days")
+
+    start = time.perf_counter()
+    result = compute_streak_runs(user_ids, day_numbers, as_of_day)
+    elapsed = time.perf_counter() - start
+    print(f"  vectorized   {elapsed:8.2f}s  {users / elapsed:12.0f} users/s  "
+          f"{len(result['runs']['user_id'])} runs")
+
+    sample_mask = user_ids <= sample
+    by_user = {}
+    for uid, day in zip(user_ids[sample_mask].tolist(), day_numbers[sample_mask].tolist()):
+        by_user.setdefault(uid, []).append(day)
+    start = time.perf_counter()
+    longest = {uid: naive_streaks(d) for uid, d in by_user.items()}
+    elapsed = time.perf_counter() - start
+    print(f"  python loop  {elapsed:8.2f}s  {len(by_user) / elapsed:12.0f} users/s  "
+          f"(sample of {len(by_user)})")
+
+    mismatches = sum(
+        1 for uid, value in zip(result["user_id"].tolist(), result["longest_streak"].tolist())
+        if uid in longest and longest[uid] != value
+    )
+    print(f"  sample mismatches: {mismatches}")
+
+def bench_recompute(users: int, days: int, study_rate: float, chunk_size: int, seed: int):
+    user_ids, day_numbers = synthetic_history(users, days, study_rate, seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'streaks.db')}")
+        Base.metadata.create_all(engine)
+        table = LearningSession.__table__
+
+        with engine.begin() as conn:
+            rows = []
+            for uid, day in zip(user_ids.tolist(), day_numbers.tolist()):
+                rows.append({
+                    "id": uuid7(),
+                    "user_id": uid,
+                    "omnidim_session_id": f"bench-{len(rows)}-{uid}",
+                    "type": SessionType.TUTOR,
+                    "status": SessionStatus.COMPLETED,
+                    "started_at": datetime(1970, 1, 1) + timedelta(days=day, hours=12),
+                    "ended_at": datetime(1970, 1, 1) + timedelta(days=day, hours=12, minutes=30),
+                })
+                if len(rows) == 10000:
+                    conn.execute(table.insert(), rows)
+                    rows = []
+            if rows:
+                conn.execute(table.insert(), rows)
+
+        db = sessionmaker(bind=engine)()
+        try:
+            start = time.perf_counter()
+            stats = StreakEngine().recompute_all(db, chunk_size=chunk_size)
+            elapsed = time.perf_counter() - start
+        finally:
+            db.close()
+
+    print(f"recompute: {users} users, {len(user_ids)} sessions, chunk size {chunk_size}")
+    print(f"  {elapsed:8.2f}s  {stats['users'] / elapsed:10.0f} users/s  "
+          f"{stats['streaks']} streak rows in {stats['chunks']} chunks")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--stage", choices=["compute", "recompute", "all"], default="all")
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--db-users", type=int, default=20000)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--study-rate", type=float, default=0.4)
+    parser.add_argument("--sample", type=int, default=20000)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.stage in ("compute", "all"):
+        bench_compute(args.users, args.days, args.study_rate, args.sample, args.seed)
+    if args.stage in ("recompute", "all"):
+        bench_recompute(args.db_users, args.days, args.study_rate, args.chunk_size, args.seed)
+
+if __name__ == "__main__":
+    main()
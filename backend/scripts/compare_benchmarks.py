@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Compare a benchmark run against a stored baseline
+
+Reads two pytest-benchmark JSON files (``--benchmark-json``), prints each
+benchmark's change and exits non-zero when any is slower than the
+threshold allows:
+
+    python -m pytest benchmarks --benchmark-json=benchmarks/results.json
+    python scripts/compare_benchmarks.py benchmarks/baselines/baseline.json benchmarks/results.json
+
+Timings depend on the machine, so compare runs from the machine the
+baseline was recorded on. Pass --update to replace the baseline with the
+current run after an intended change; per-round samples are dropped to keep
+the file small.
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict
+
+def load(path: str, metric: str) -> Dict[str, float]:
+    with open(path, encoding="utf-8") as f:
+        report = json.load(f)
+    return {bench["fullname"]: bench["stats"][metric] for bench in report["benchmarks"]}
+
+def write_baseline(current: str, baseline: str):
+    with open(current, encoding="utf-8") as f:
+        report = json.load(f)
+    for bench in report["benchmarks"]:
+        bench["stats"].pop("data", None)
+    with open(baseline, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+
+def format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--metric", choices=["min", "median", "mean"], default="min")
+    parser.add_argument("--threshold", type=float, default=20.0, help="Allowed slowdown in percent")
+    parser.add_argument("--update", action="store_true", help="Copy the current run over the baseline")
+    args = parser.parse_args()
+
+    baseline = load(args.baseline, args.metric)
+    current = load(args.current, args.metric)
+
+    regressions = []
+    width = max(len(name) for name in baseline.keys() | current.keys())
+    print(f"{'benchmark':<{width}}  {'baseline':>10}  {'current':>10}  {'change':>8}")
+    for name in sorted(baseline.keys() | current.keys()):
+        if name not in current:
+            print(f"{name:<{width}}  {format_time(baseline[name]):>10}  {'-':>10}  {'removed':>8}")
+            continue
+        if name not in baseline:
+            print(f"{name:<{width}}  {'-':>10}  {format_time(current[name]):>10}  {'new':>8}")
+            continue
+        change = (current[name] / baseline[name] - 1) * 100
+        flag = ""
+        if change > args.threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(
+            f"{name:<{width}}  {format_time(baseline[name]):>10}  {format_time(current[name]):>10}  "
+            f"{change:>+7.1f}%{flag}"
+        )
+
+    if args.update:
+        write_baseline(args.current, args.baseline)
+        print(f"Baseline updated from {args.current}")
+        return 0
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) slower than the baseline by more than {args.threshold:g}% ({args.metric})")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
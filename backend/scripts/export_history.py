@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Export learning sessions and voice interactions
+
+Streams one user's history (--user-id) or every user's, reading user-id
+ranges in parallel, to a file or stdout in bounded memory:
+
+    python scripts/export_history.py --kind interactions --format csv -o interactions.csv
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import logging
+import time
+
+from app.services.analytics.history_export import EXPORT_BATCH_SIZE, HistoryExporter
+
+logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--kind", choices=["all", "sessions", "interactions"], default="all")
+    parser.add_argument("--format", choices=["ndjson", "csv", "arrow"], default="ndjson")
+    parser.add_argument("--user-id", type=int, help="Export a single user (default: all users)")
+    parser.add_argument("--workers", type=int, default=4, help="Parallel user-range readers")
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE, help="Rows per fetch")
+    parser.add_argument("--include-archived", action="store_true", help="Include archived interactions")
+    parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    args = parser.parse_args()
+
+    exporter = HistoryExporter(batch_size=args.batch_size)
+    try:
+        exporter.validate(args.kind, args.format)
+    except ValueError as e:
+        parser.error(str(e))
+
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    started = time.perf_counter()
+    written = 0
+    try:
+        for chunk in exporter.stream(
+            args.kind,
+            args.format,
+            user_id=args.user_id,
+            workers=args.workers,
+            include_archived=args.include_archived
+        ):
+            out.write(chunk)
+            written += len(chunk)
+    finally:
+        if args.output:
+            out.close()
+
+    logger.info(f"✅ Exported {written / 1e6:.1f} MB in {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,501 @@
+#!/usr/bin/env python3
+"""Generate large volumes of realistic synthetic learning data
+
+Creates users with learning sessions, voice interactions, progress,
+per-subject progress, achievement counters and the achievements they earn,
+for load and query benchmarking. Users are generated in chunks by worker
+processes, each writing its chunk through PostgreSQL ``COPY`` (with
+psycopg2) or batched ``executemany`` inserts elsewhere. Output is
+deterministic for a given --seed, --chunk-size and --now.
+
+    python scripts/generate_synthetic_data.py --users 1000
+    python scripts/generate_synthetic_data.py --users 100000 --sessions-per-user 25 \\
+        --interactions-per-session 20 --workers 8    # ~2.5M sessions, ~50M interactions
+
+Distributions:
+  * sessions per user: gamma-Poisson (negative binomial), so most users
+    have a few sessions and a long tail has hundreds
+  * session length: log-normal around 15 minutes, mostly in the evening
+  * scores: a per-user starting skill that drifts upward with practice,
+    plus per-session noise
+  * emotions: a sticky Markov chain per session, starting confused or
+    frustrated more often when the session went badly
+
+Run migrations (or init_sqlite.py) first; users get ids after the current
+maximum and share the password "Synthetic123!".
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import csv
+import io
+import json
+import logging
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from multiprocessing import get_context
+from typing import Dict, List
+
+import numpy as np
+from sqlalchemy import func, select, text
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PASSWORD = "Synthetic123!"
+SUBJECTS = ["mathematics", "physics", "chemistry", "biology", "history", "programming", "spanish", "french"]
+LANGUAGES = ["en-US", "es-ES", "fr-FR", "de-DE"]
+DIFFICULTIES = ["beginner", "intermediate", "advanced"]
+SESSION_TYPES = ["TUTOR", "LANGUAGE_PRACTICE", "EXAM_PREP", "PRONUNCIATION"]
+LEARNING_STYLES = ["VISUAL", "AUDITORY", "KINESTHETIC", "READING_WRITING"]
+
+# Emotion chain; rows are transition probabilities from each state
+EMOTIONS = ["neutral", "happy", "confident", "excited", "confused", "frustrated", "anxious"]
+TRANSITIONS = np.array([
+    [0.60, 0.10, 0.10, 0.05, 0.08, 0.04, 0.03],
+    [0.15, 0.60, 0.12, 0.08, 0.03, 0.01, 0.01],
+    [0.12, 0.12, 0.65, 0.06, 0.03, 0.01, 0.01],
+    [0.12, 0.15, 0.10, 0.58, 0.03, 0.01, 0.01],
+    [0.20, 0.03, 0.04, 0.01, 0.55, 0.12, 0.05],
+    [0.18, 0.02, 0.03, 0.01, 0.16, 0.52, 0.08],
+    [0.20, 0.02, 0.04, 0.01, 0.10, 0.08, 0.55],
+])
+CUMULATIVE_TRANSITIONS = np.cumsum(TRANSITIONS, axis=1)
+# How positive each emotion is, for the session's average emotion score
+EMOTION_VALENCE = np.array([0.5, 0.9, 0.8, 0.85, 0.35, 0.15, 0.25])
+NEGATIVE_STARTS = [EMOTIONS.index("confused"), EMOTIONS.index("frustrated")]
+
+# Interaction types alternate between the learner and the tutor, with
+# analysis results mixed in
+USER_SPEECH, AI_RESPONSE, PRONUNCIATION_FEEDBACK, EMOTION_DETECTION, LEARNING_INSIGHT = (
+    "USER_SPEECH", "AI_RESPONSE", "PRONUNCIATION_FEEDBACK", "EMOTION_DETECTION", "LEARNING_INSIGHT"
+)
+USER_PHRASES = [
+    "can you explain that again", "what does this term mean", "i think the answer is twelve",
+    "could you give me an example", "let me try to say it", "why does that happen",
+    "i'm not sure i follow", "that makes sense now", "quiz me on this part",
+]
+TUTOR_PHRASES = [
+    "great question, let's break it down", "try saying it a little slower",
+    "here is an example you might recognise", "exactly right, well done",
+    "not quite, think about the first step again", "let's review what we covered",
+]
+
+# Rows per executemany/COPY batch and users per worker task
+BATCH_SIZE = 10_000
+CHUNK_SIZE = 500
+
+@dataclass
+class Volumes:
+    sessions_per_user: float
+    interactions_per_session: float
+    days: int
+
+def _session_uuid(started_at: datetime, rng: np.random.Generator) -> str:
+    """UUIDv7 from the session start time and seeded random bits"""
+    timestamp_ms = int(started_at.timestamp() * 1000)
+    rand = int.from_bytes(rng.bytes(10), "big")
+    value = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= 0x7 << 76
+    value |= ((rand >> 62) & 0xFFF) << 64
+    value |= 0b10 << 62
+    value |= rand & 0x3FFF_FFFF_FFFF_FFFF
+    return str(uuid.UUID(int=value))
+
+def _emotion_chains(rng: np.random.Generator, lengths: np.ndarray, scores: np.ndarray) -> np.ndarray:
+    """One Markov chain per session, concatenated in session order
+
+    Chains are advanced one position at a time across all sessions at once,
+    so the Python loop runs for the longest session rather than every row.
+    """
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    states = np.empty(int(lengths.sum()), dtype=np.int64)
+
+    current = rng.integers(0, len(EMOTIONS), len(lengths))
+    struggling = (scores < 0.6) & (rng.random(len(lengths)) < 0.5)
+    current[struggling] = rng.choice(NEGATIVE_STARTS, int(struggling.sum()))
+
+    for position in range(int(lengths.max(initial=0))):
+        active = lengths > position
+        if position:
+            u = rng.random(int(active.sum()))
+            rows = CUMULATIVE_TRANSITIONS[current[active]]
+            current[active] = np.minimum((rows < u[:, None]).sum(axis=1), len(EMOTIONS) - 1)
+        states[starts[active] + position] = current[active]
+    return states
+
+def _streaks(days: List) -> tuple:
+    """(current, longest) consecutive-day streaks from sorted study dates"""
+    longest = current = 0
+    previous = None
+    for day in days:
+        current = current + 1 if previous is not None and (day - previous).days == 1 else 1
+        longest = max(longest, current)
+        previous = day
+    return current, longest
+
+def generate_chunk(
+    first_user_id: int,
+    count: int,
+    volumes: Volumes,
+    seed: int,
+    chunk_index: int,
+    now: datetime,
+    password_hash: str
+) -> Dict[str, List[dict]]:
+    """Rows for ``count`` users starting at ``first_user_id``, table by table"""
+    from app.services.learning.achievement_engine import ACHIEVEMENT_RULES, HIGH_PRONUNCIATION_SCORE
+    from app.services.learning.progress_tracker import XP_PER_MINUTE
+
+    rng = np.random.default_rng(np.random.SeedSequence([seed, chunk_index]))
+    tables: Dict[str, List[dict]] = defaultdict(list)
+
+    # Heavy-tailed activity: gamma-distributed rate, Poisson count
+    shape = 0.8
+    sessions_per_user = np.maximum(1, rng.poisson(rng.gamma(shape, volumes.sessions_per_user / shape, count)))
+
+    session_users, session_starts, session_meta = [], [], []
+    for offset in range(count):
+        user_id = first_user_id + offset
+        joined = now - timedelta(days=float(rng.uniform(1, volumes.days)))
+        tables["users"].append({
+            "id": user_id,
+            "email": f"synthetic{user_id}@example.com",
+            "username": f"synthetic{user_id}",
+            "full_name": f"Synthetic Learner {user_id}",
+            "hashed_password": password_hash,
+            "learning_style": LEARNING_STYLES[rng.integers(len(LEARNING_STYLES))],
+            "preferred_language": LANGUAGES[rng.integers(len(LANGUAGES))],
+            "preferred_voice_id": "tutor_friendly_sarah",
+            "is_active": True,
+            "is_premium": bool(rng.random() < 0.15),
+            "is_verified": bool(rng.random() < 0.7),
+            "created_at": joined,
+        })
+
+        n = int(sessions_per_user[offset])
+        span_days = (now - joined).total_seconds() / 86400
+        day_offsets = np.sort(np.floor(rng.uniform(0, span_days, n)))
+        # Evening-heavy start hours
+        hours = np.clip(rng.normal(18.5, 3.5, n), 6, 23.9)
+        starts = [
+            joined.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=float(d), hours=float(h))
+            for d, h in zip(day_offsets, hours)
+        ]
+        starts = sorted(min(s, now - timedelta(minutes=1)) for s in starts)
+
+        # Skill starts per learner and improves with practice
+        base_comprehension = rng.beta(4, 2.5)
+        base_pronunciation = rng.beta(5, 2.5)
+        learning_rate = rng.gamma(2.0, 0.01)
+        subjects = rng.choice(SUBJECTS, size=min(len(SUBJECTS), 1 + rng.poisson(1.5)), replace=False)
+        for index, started_at in enumerate(starts):
+            drift = 1 - np.exp(-learning_rate * index)
+            session_users.append(user_id)
+            session_starts.append(started_at)
+            session_meta.append((
+                str(subjects[rng.integers(len(subjects))]),
+                base_comprehension + (1 - base_comprehension) * drift * 0.8,
+                base_pronunciation + (1 - base_pronunciation) * drift * 0.8,
+            ))
+
+    total_sessions = len(session_users)
+    durations = np.clip(rng.lognormal(np.log(900), 0.6, total_sessions), 60, 3 * 3600).astype(np.int64)
+    comprehension = np.clip(np.array([m[1] for m in session_meta]) + rng.normal(0, 0.07, total_sessions), 0, 1)
+    pronunciation = np.clip(np.array([m[2] for m in session_meta]) + rng.normal(0, 0.06, total_sessions), 0, 1)
+    # Interactions scale with session length around the requested mean
+    mean_minutes = float(np.exp(np.log(900) + 0.6 ** 2 / 2)) / 60
+    expected = volumes.interactions_per_session * (durations / 60) / mean_minutes
+    lengths = np.maximum(1, rng.poisson(expected))
+    session_types = rng.choice(SESSION_TYPES, total_sessions, p=[0.4, 0.25, 0.2, 0.15])
+    difficulties = rng.choice(DIFFICULTIES, total_sessions, p=[0.4, 0.4, 0.2])
+
+    emotions = _emotion_chains(rng, lengths, comprehension)
+    emotion_scores = np.add.reduceat(EMOTION_VALENCE[emotions], np.concatenate([[0], np.cumsum(lengths)[:-1]])) / lengths
+
+    session_ids = [_session_uuid(started_at, rng) for started_at in session_starts]
+    for i in range(total_sessions):
+        started_at = session_starts[i]
+        ended_at = min(started_at + timedelta(seconds=int(durations[i])), now)
+        tables["learning_sessions"].append({
+            "id": session_ids[i],
+            "user_id": session_users[i],
+            "omnidim_session_id": f"synthetic-{session_ids[i]}",
+            "type": str(session_types[i]),
+            "status": "COMPLETED",
+            "subject": session_meta[i][0],
+            "language": "en-US",
+            "difficulty": str(difficulties[i]),
+            "started_at": started_at,
+            "ended_at": ended_at,
+            "duration_seconds": int((ended_at - started_at).total_seconds()),
+            "interaction_count": int(lengths[i]),
+            "average_emotion_score": round(float(emotion_scores[i]), 3),
+            "pronunciation_score": round(float(pronunciation[i]), 3),
+            "comprehension_score": round(float(comprehension[i]), 3),
+        })
+
+    # Interactions: learner and tutor turns with analysis results mixed in
+    total_interactions = int(lengths.sum())
+    session_of = np.repeat(np.arange(total_sessions), lengths)
+    position = np.arange(total_interactions) - np.repeat(np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths)
+    kinds = np.where(position % 2 == 0, USER_SPEECH, AI_RESPONSE).astype(object)
+    roll = rng.random(total_interactions)
+    pronunciation_rate = np.where(session_types[session_of] == "PRONUNCIATION", 0.15, 0.03)
+    kinds[roll < pronunciation_rate] = PRONUNCIATION_FEEDBACK
+    kinds[(roll >= pronunciation_rate) & (roll < pronunciation_rate + 0.05)] = EMOTION_DETECTION
+    kinds[(roll >= pronunciation_rate + 0.05) & (roll < pronunciation_rate + 0.07)] = LEARNING_INSIGHT
+    offsets = (position + rng.random(total_interactions)) / lengths[session_of] * durations[session_of]
+    interaction_pronunciation = np.clip(pronunciation[session_of] + rng.normal(0, 0.08, total_interactions), 0, 1)
+    fluency = np.clip(comprehension[session_of] + rng.normal(0, 0.1, total_interactions), 0, 1)
+    confidence = rng.beta(5, 2, total_interactions)
+    user_phrase = rng.integers(len(USER_PHRASES), size=total_interactions)
+    tutor_phrase = rng.integers(len(TUTOR_PHRASES), size=total_interactions)
+
+    spoken = defaultdict(int)
+    high_pronunciation = defaultdict(int)
+    for j in range(total_interactions):
+        s = session_of[j]
+        kind = kinds[j]
+        scored = kind in (USER_SPEECH, PRONUNCIATION_FEEDBACK)
+        if kind == USER_SPEECH:
+            transcript = USER_PHRASES[user_phrase[j]]
+            spoken[session_users[s]] += 1
+        elif kind == AI_RESPONSE:
+            transcript = TUTOR_PHRASES[tutor_phrase[j]]
+        else:
+            transcript = None
+        if scored and interaction_pronunciation[j] >= HIGH_PRONUNCIATION_SCORE:
+            high_pronunciation[session_users[s]] += 1
+        tables["voice_interactions"].append({
+            "session_id": session_ids[s],
+            "user_id": session_users[s],
+            "type": kind,
+            "timestamp": session_starts[s] + timedelta(seconds=float(offsets[j])),
+            "transcript": transcript,
+            "emotion": EMOTIONS[emotions[j]],
+            "emotion_confidence": round(float(confidence[j]), 3),
+            "pronunciation_score": round(float(interaction_pronunciation[j]), 3) if scored else None,
+            "fluency_score": round(float(fluency[j]), 3) if kind == USER_SPEECH else None,
+        })
+
+    # Aggregates consistent with the generated history
+    by_user = defaultdict(list)
+    for session in tables["learning_sessions"]:
+        by_user[session["user_id"]].append(session)
+    for user_id, sessions in by_user.items():
+        total_time = sum(s["duration_seconds"] for s in sessions)
+        xp = sum(s["duration_seconds"] // 60 * XP_PER_MINUTE for s in sessions)
+        study_days = sorted({s["started_at"].date() for s in sessions})
+        current_streak, longest_streak = _streaks(study_days)
+        if study_days[-1] < now.date() - timedelta(days=1):
+            current_streak = 0
+        tables["progress"].append({
+            "user_id": user_id,
+            "total_study_time": total_time,
+            "total_sessions": len(sessions),
+            "current_streak": current_streak,
+            "longest_streak": longest_streak,
+            "last_study_date": sessions[-1]["ended_at"],
+            "overall_accuracy": round(float(np.mean([s["comprehension_score"] for s in sessions])), 3),
+            "pronunciation_average": round(float(np.mean([s["pronunciation_score"] for s in sessions])), 3),
+            "fluency_average": 0.0,
+            "subject_progress": {},
+            "level": 1,
+            "experience_points": xp,
+        })
+
+        per_subject = defaultdict(list)
+        for s in sessions:
+            per_subject[s["subject"]].append(s)
+        for subject, subject_sessions in per_subject.items():
+            tables["subject_progress"].append({
+                "user_id": user_id,
+                "subject": subject,
+                "total_time": sum(s["duration_seconds"] for s in subject_sessions),
+                "sessions": len(subject_sessions),
+                "accuracy_sum": float(sum(s["comprehension_score"] for s in subject_sessions)),
+                "accuracy_count": len(subject_sessions),
+                "experience_points": sum(s["duration_seconds"] // 60 * XP_PER_MINUTE for s in subject_sessions),
+                "last_studied_at": subject_sessions[-1]["ended_at"],
+            })
+
+        per_day = defaultdict(int)
+        for s in sessions:
+            per_day[s["started_at"].date()] += 1
+        counters = {
+            "sessions_completed": len(sessions),
+            "daily_sessions": max(per_day.values()),
+            "study_minutes": sum(s["duration_seconds"] // 60 for s in sessions),
+            "voice_interactions": spoken[user_id],
+            "high_pronunciation": high_pronunciation[user_id],
+            "longest_streak": longest_streak,
+        }
+        for name, value in counters.items():
+            if name == "daily_sessions":
+                continue
+            tables["achievement_counters"].append({
+                "user_id": user_id, "name": name, "value": value, "updated_at": now
+            })
+        for rule in ACHIEVEMENT_RULES:
+            if counters[rule.counter] >= rule.threshold:
+                tables["achievements"].append({
+                    "user_id": user_id,
+                    "name": rule.name,
+                    "description": rule.description,
+                    "icon": rule.icon,
+                    "category": rule.category,
+                    "earned_at": sessions[-1]["ended_at"],
+                    "progress_value": rule.threshold,
+                    "progress_max": rule.threshold,
+                })
+    return tables
+
+# Parents before children
+TABLE_ORDER = [
+    "users", "learning_sessions", "voice_interactions", "progress",
+    "subject_progress", "achievement_counters", "achievements",
+]
+
+class ChunkWriter:
+    """Writes generated rows with the fastest bulk path the database offers"""
+
+    def __init__(self, engine, batch_size: int):
+        from app.database import Base
+        import app.models  # noqa: F401  registers the tables
+
+        self.engine = engine
+        self.batch_size = batch_size
+        self.tables = Base.metadata.tables
+        self.use_copy = engine.dialect.name == "postgresql" and engine.dialect.driver == "psycopg2"
+
+    def write(self, tables: Dict[str, List[dict]]) -> Dict[str, int]:
+        counts = {}
+        for name in TABLE_ORDER:
+            rows = tables.get(name, [])
+            for start in range(0, len(rows), self.batch_size):
+                batch = rows[start:start + self.batch_size]
+                with self.engine.begin() as conn:
+                    if self.use_copy:
+                        self._copy(conn, name, batch)
+                    else:
+                        conn.execute(self.tables[name].insert(), batch)
+            counts[name] = len(rows)
+        return counts
+
+    def _copy(self, conn, name: str, rows: List[dict]):
+        columns = list(rows[0].keys())
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([_copy_value(row[c]) for c in columns])
+        buffer.seek(0)
+        cursor = conn.connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+                buffer
+            )
+        finally:
+            cursor.close()
+
+def _copy_value(value):
+    if value is None:
+        return "\\N"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return json.dumps(value)
+    return value
+
+def _run_chunk(url: str, first_user_id: int, count: int, volumes: Volumes, seed: int,
+               chunk_index: int, now: datetime, password_hash: str, batch_size: int) -> Dict[str, int]:
+    from app.database import build_engine
+
+    tables = generate_chunk(first_user_id, count, volumes, seed, chunk_index, now, password_hash)
+    engine = build_engine(url, name="synthetic")
+    try:
+        return ChunkWriter(engine, batch_size).write(tables)
+    finally:
+        engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--sessions-per-user", type=float, default=25.0, help="Mean sessions per user")
+    parser.add_argument("--interactions-per-session", type=float, default=20.0, help="Mean interactions per session")
+    parser.add_argument("--days", type=int, default=365, help="How far back users joined")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--now", type=datetime.fromisoformat, default=None,
+                        help="Reference time (ISO format) to reproduce an earlier run exactly")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Users per worker task")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Rows per insert batch")
+    parser.add_argument("--database-url", default=None, help="Defaults to DATABASE_URL")
+    args = parser.parse_args()
+
+    from app.config import settings
+    from app.core.security import get_password_hash
+    from app.database import build_engine
+    from app.models.user import User
+
+    url = args.database_url or settings.DATABASE_URL
+    now = args.now or datetime.utcnow().replace(microsecond=0)
+    volumes = Volumes(args.sessions_per_user, args.interactions_per_session, args.days)
+
+    engine = build_engine(url, name="synthetic")
+    with engine.connect() as conn:
+        first_user_id = (conn.execute(select(func.max(User.id))).scalar() or 0) + 1
+    engine.dispose()
+
+    workers = args.workers
+    if url.startswith("sqlite") and workers > 1:
+        logger.info("SQLite has a single writer; workers overlap generation with each other's writes")
+
+    chunks = [
+        (index, first_user_id + start, min(args.chunk_size, args.users - start))
+        for index, start in enumerate(range(0, args.users, args.chunk_size))
+    ]
+    password_hash = get_password_hash(PASSWORD)
+    logger.info(
+        f"Generating {args.users} users in {len(chunks)} chunks with {workers} workers "
+        f"(user ids from {first_user_id}, seed {args.seed}, now {now.isoformat()})"
+    )
+
+    totals = defaultdict(int)
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+        futures = [
+            pool.submit(_run_chunk, url, first_id, count, volumes, args.seed, index, now, password_hash, args.batch_size)
+            for index, first_id, count in chunks
+        ]
+        for done, future in enumerate(as_completed(futures), 1):
+            for name, count in future.result().items():
+                totals[name] += count
+            elapsed = time.perf_counter() - started
+            logger.info(
+                f"{done}/{len(chunks)} chunks, {totals['voice_interactions']} interactions, "
+                f"{sum(totals.values()) / elapsed:,.0f} rows/s"
+            )
+
+    if url.startswith("postgresql"):
+        # Explicit ids bypass the sequence
+        engine = build_engine(url, name="synthetic")
+        with engine.begin() as conn:
+            conn.execute(text("SELECT setval(pg_get_serial_sequence('users', 'id'), (SELECT max(id) FROM users))"))
+        engine.dispose()
+
+    elapsed = time.perf_counter() - started
+    for name in TABLE_ORDER:
+        logger.info(f"{name}: {totals[name]:,} rows")
+    logger.info(f"Done in {elapsed:.1f} s ({sum(totals.values()) / elapsed:,.0f} rows/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""Grant or revoke admin rights for an existing user
+
+Admin endpoints (jobs, exports, profiles) check ``users.is_admin``; it is
+only ever set here, never through the API.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import logging
+
+from app.database import SessionLocal
+from app.models.user import User
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("username")
+    parser.add_argument("--revoke", action="store_true", help="Remove admin rights instead")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.username == args.username).first()
+        if user is None:
+            logger.error(f"❌ No user named {args.username}")
+            sys.exit(1)
+        user.is_admin = not args.revoke
+        db.commit()
+    finally:
+        db.close()
+
+    logger.info(f"✅ {args.username} is {'no longer' if args.revoke else 'now'} an admin")
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,9 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from sqlalchemy import create_engine
-from app.database import Base
+from alembic import command
+from alembic.config import Config
 from app.config import settings
-from app.models import user, learning_session, voice_interaction, progress
 from app.core.security import get_password_hash
 from app.database import SessionLocal
 import logging
@@ -16,14 +15,19 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+
 def init_database():
     """Initialize SQLite database"""
     logger.info("🚀 Initializing SQLite database...")
     
-    # Create database file and tables
+    # Create database file and tables by migrating to the latest revision
     try:
-        engine = create_engine(settings.DATABASE_URL)
-        Base.metadata.create_all(bind=engine)
+        # No ini file, so alembic leaves this script's logging configuration alone
+        config = Config()
+        config.set_main_option("script_location", os.path.join(MIGRATIONS_DIR, "alembic"))
+        config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
+        command.upgrade(config, "head")
         logger.info("✅ Database tables created!")
     except Exception as e:
         logger.error(f"❌ Error creating tables: {e}")
@@ -44,7 +48,8 @@ def init_database():
                 hashed_password=get_password_hash("Admin123!"),
                 is_active=True,
                 is_premium=True,
-                is_verified=True
+                is_verified=True,
+                is_admin=True
             )
             db.add(admin)
             logger.info("✅ Admin user created!")
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Minimal OTLP/HTTP JSON trace collector for local development
+
+Accepts spans posted by TRACE_EXPORTER=otlp on /v1/traces, appends them to a
+file as JSON lines and prints one line per finished root span with its
+slowest children:
+
+    python scripts/trace_collector.py --port 4318 --output traces/collected.ndjson
+"""
+
+import argparse
+import json
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+def summarize(spans):
+    by_trace = defaultdict(list)
+    for span in spans:
+        by_trace[span["traceId"]].append(span)
+    for trace_id, trace_spans in by_trace.items():
+        for root in (s for s in trace_spans if not s.get("parentSpanId") or s["kind"] == 2):
+            duration = (int(root["endTimeUnixNano"]) - int(root["startTimeUnixNano"])) / 1e6
+            children = sorted(
+                (s for s in trace_spans if s is not root),
+                key=lambda s: int(s["startTimeUnixNano"]) - int(s["endTimeUnixNano"])
+            )[:3]
+            parts = ", ".join(
+                f"{s['name']} {(int(s['endTimeUnixNano']) - int(s['startTimeUnixNano'])) / 1e6:.1f}ms"
+                for s in children
+            )
+            print(f"{trace_id[:8]} {root['name']} {duration:.1f}ms  [{parts}]")
+
+def make_handler(output: Path):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != "/v1/traces":
+                self.send_error(404)
+                return
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            spans = [
+                span
+                for resource in payload.get("resourceSpans", [])
+                for scope in resource.get("scopeSpans", [])
+                for span in scope.get("spans", [])
+            ]
+            with open(output, "a", encoding="utf-8") as f:
+                for span in spans:
+                    f.write(json.dumps(span, separators=(",", ":")) + "\n")
+            summarize(spans)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=4318)
+    parser.add_argument("--output", default="traces/collected.ndjson")
+    args = parser.parse_args()
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(output))
+    print(f"Collecting traces on http://127.0.0.1:{args.port}/v1/traces into {output}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Shared fixtures: an isolated SQLite database, users and SQL statement budgets"""
+
+import os
+import tempfile
+
+# Settings are read at import time, so point them at scratch storage first
+_scratch = tempfile.mkdtemp(prefix="zenith-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_scratch}/test.db")
+os.environ.setdefault("INTERACTION_ARCHIVE_DIR", os.path.join(_scratch, "archive"))
+os.environ.setdefault("PROFILE_DIR", os.path.join(_scratch, "profiles"))
+# Debug mode adds the X-DB-Query-Count header the budgets read
+os.environ["DEBUG"] = "True"
+
+import itertools
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.security import create_access_token, get_password_hash
+from app.database import Base, SessionLocal, engine
+from app.main import app
+from app.models.user import User
+
+# Tables come from migrations in deployments; tests build them directly
+Base.metadata.create_all(bind=engine)
+
+_usernames = itertools.count()
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+@pytest.fixture
+def make_user():
+    """Create a user; returns (user, auth headers)"""
+    def create(username=None, admin=False):
+        username = username or f"user{next(_usernames)}"
+        db = SessionLocal()
+        try:
+            user = User(
+                email=f"{username}@example.com",
+                username=username,
+                hashed_password=get_password_hash("password"),
+                is_admin=admin
+            )
+            db.add(user)
+            db.commit()
+            db.refresh(user)
+            db.expunge(user)
+        finally:
+            db.close()
+        token = create_access_token({"sub": username})
+        return user, {"Authorization": f"Bearer {token}"}
+    return create
+
+@pytest.fixture
+def max_queries():
+    """Assert that a request stays within a SQL statement budget
+
+        response = max_queries(2, client.get, "/api/learning/sessions/", headers=headers)
+    """
+    def check(limit, call, *args, **kwargs):
+        response = call(*args, **kwargs)
+        count = int(response.headers["x-db-query-count"])
+        assert count <= limit, (
+            f"{response.request.method} {response.request.url.path} ran {count} queries, "
+            f"budget is {limit}"
+        )
+        return response
+    return check
@@ -0,0 +1,62 @@
+from datetime import date, datetime, timedelta
+
+from app.database import SessionLocal
+from app.models.learning_session import LearningSession, SessionStatus, SessionType
+from app.models.progress import Achievement
+from app.services.learning.achievement_engine import AchievementEngine, EventType, LearningEvent
+
+def _earned(db, user_id):
+    return sorted(name for (name,) in db.query(Achievement.name).filter(Achievement.user_id == user_id))
+
+def _session_end(user_id, when):
+    return LearningEvent(EventType.SESSION_END, user_id, {"duration_seconds": 600}, when)
+
+def test_rules_fire_once_when_their_threshold_is_crossed(make_user):
+    user, _ = make_user()
+    engine = AchievementEngine()
+    day = datetime(2024, 6, 3, 9, 0)
+    db = SessionLocal()
+    try:
+        # Four sessions one day and one the next: no five in a single day
+        awarded = [engine.process(db, [_session_end(user.id, day + timedelta(hours=i))]) for i in range(4)]
+        awarded.append(engine.process(db, [_session_end(user.id, day + timedelta(days=1))]))
+        db.commit()
+        assert awarded == [1, 0, 0, 0, 0]
+        assert _earned(db, user.id) == ["First Steps"]
+
+        # The fifth session on one day crosses the daily rule, in a batch too
+        batch = [_session_end(user.id, day + timedelta(days=1, hours=i)) for i in range(1, 5)]
+        assert engine.process(db, batch) == 1
+        assert engine.process(db, [_session_end(user.id, day + timedelta(days=1, hours=6))]) == 0
+        db.commit()
+        assert _earned(db, user.id) == ["First Steps", "Speed Learner"]
+    finally:
+        db.close()
+
+def test_backfill_awards_earned_achievements_from_completed_sessions_only(make_user):
+    user, _ = make_user()
+    day = datetime(2024, 6, 10, 8, 0)
+    db = SessionLocal()
+    try:
+        statuses = [SessionStatus.COMPLETED] * 4 + [SessionStatus.ABANDONED]
+        for i, status in enumerate(statuses):
+            started_at = day + timedelta(hours=i)
+            db.add(LearningSession(
+                user_id=user.id,
+                omnidim_session_id=f"backfill-{user.id}-{i}",
+                type=SessionType.TUTOR,
+                status=status,
+                started_at=started_at,
+                ended_at=started_at + timedelta(minutes=30),
+                duration_seconds=1800
+            ))
+        db.commit()
+
+        engine = AchievementEngine()
+        engine.backfill(db, today=date(2024, 6, 10))
+        # The abandoned session doesn't make five for the day
+        assert _earned(db, user.id) == ["First Steps"]
+        assert engine.backfill(db, today=date(2024, 6, 10))["awards"] == 0
+        assert _earned(db, user.id) == ["First Steps"]
+    finally:
+        db.close()
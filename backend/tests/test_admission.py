@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from app.api.websocket.admission import AdmissionController, StreamRejected
+from app.core.metrics import VOICE_STREAMS_REJECTED
+
+def test_full_workers_queue_new_streams_in_order():
+    controller = AdmissionController(max_streams=1, max_per_user=5, queue_size=2, max_wait=5)
+    positions = {2: [], 3: []}
+    rejected = VOICE_STREAMS_REJECTED.labels("capacity")
+    before = rejected.get()
+
+    async def queued(user_id):
+        async def report(position):
+            positions[user_id].append(position)
+        await controller.acquire(user_id, on_queued=report)
+
+    async def run():
+        await controller.acquire(1)
+        second = asyncio.create_task(queued(2))
+        third = asyncio.create_task(queued(3))
+        await asyncio.sleep(0.01)
+        # The queue is full
+        with pytest.raises(StreamRejected) as full:
+            await controller.acquire(4)
+        assert full.value.retry_after == 10
+
+        controller.release(1)
+        await asyncio.wait_for(second, 1)
+        assert not third.done()
+        controller.release(2)
+        await asyncio.wait_for(third, 1)
+
+    asyncio.run(run())
+
+    assert positions == {2: [1], 3: [2, 1]}
+    assert controller.admitted == 1
+    assert rejected.get() == before + 1
+
+def test_overloaded_workers_turn_streams_away():
+    lag, memory = [0.0], [100]
+    controller = AdmissionController(
+        max_streams=10, max_per_user=1, queue_size=1, max_wait=0.1,
+        max_loop_lag=0.2, max_memory=1000, lag=lambda: lag[0], memory=lambda: memory[0]
+    )
+
+    async def reason(user_id):
+        try:
+            await controller.acquire(user_id)
+        except StreamRejected as e:
+            return e.reason
+
+    async def run():
+        await controller.acquire(1)
+        assert await reason(1) == "user_limit"
+        lag[0] = 0.5
+        # Waits out max_wait for the loop to recover
+        assert await reason(2) == "loop_lag"
+        lag[0], memory[0] = 0.0, 2000
+        assert await reason(3) == "memory"
+        memory[0] = 100
+        assert await reason(4) is None
+
+    asyncio.run(run())
+
+    assert controller.admitted == 2
@@ -0,0 +1,92 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
+
+import pyarrow as pa
+
+from app.core.security import create_access_token
+from app.database import SessionLocal
+from app.models.learning_session import LearningSession, SessionType
+from app.models.voice_interaction import InteractionType, VoiceInteraction
+from app.services.analytics.history_export import HistoryExporter, _ArrowEncoder
+from app.services.analytics.interaction_archive import InteractionArchive
+
+def learner_with_history(make_user, archive):
+    """A user with three interactions, the oldest one archived"""
+    user, _ = make_user()
+    db = SessionLocal()
+    try:
+        session = LearningSession(user_id=user.id, omnidim_session_id=f"export-{user.id}", type=SessionType.TUTOR)
+        db.add(session)
+        db.flush()
+        for day, text in ((1, "archived"), (2, "live"), (3, "latest")):
+            db.add(VoiceInteraction(
+                session_id=session.id, user_id=user.id, type=InteractionType.USER_SPEECH,
+                transcript=text, pronunciation_score=0.5 + day / 10,
+                interaction_metadata={"day": day}, timestamp=datetime(2021, 3, day)
+            ))
+        db.commit()
+        archive.archive_older_than(db, datetime(2021, 3, 2))
+    finally:
+        db.close()
+    return user
+
+def test_arrow_export_round_trips(make_user, tmp_path):
+    archive = InteractionArchive(str(tmp_path))
+    user = learner_with_history(make_user, archive)
+    exporter = HistoryExporter(batch_size=2, archive=archive)
+
+    body = b"".join(exporter.stream("interactions", "arrow", user_id=user.id, include_archived=True))
+    table = pa.ipc.open_stream(body).read_all()
+
+    assert table.column("transcript").to_pylist() == ["archived", "live", "latest"]
+    assert table.column("pronunciation_score").to_pylist() == [0.6, 0.7, 0.8]
+    assert [json.loads(m) for m in table.column("interaction_metadata").to_pylist()] == [
+        {"day": 1}, {"day": 2}, {"day": 3}
+    ]
+    assert table.column("timestamp").to_pylist()[0].replace(tzinfo=None) == datetime(2021, 3, 1)
+
+def test_arrow_timestamps_are_converted_to_utc():
+    encoder = _ArrowEncoder(VoiceInteraction.__table__)
+    body = encoder.header() + encoder.encode([
+        {"id": 1, "timestamp": datetime(2021, 3, 1, 14, 30, tzinfo=timezone(timedelta(hours=2)))},
+        {"id": 2, "timestamp": datetime(2021, 3, 1, 12, 45)},
+    ]) + encoder.footer()
+
+    timestamps = pa.ipc.open_stream(body).read_all().column("timestamp").to_pylist()
+    assert [t.replace(tzinfo=None) for t in timestamps] == [datetime(2021, 3, 1, 12, 30), datetime(2021, 3, 1, 12, 45)]
+
+def test_csv_and_ndjson_exports_hold_the_same_rows(make_user, tmp_path):
+    archive = InteractionArchive(str(tmp_path))
+    user = learner_with_history(make_user, archive)
+    exporter = HistoryExporter(batch_size=2, archive=archive)
+
+    ndjson = b"".join(exporter.stream("interactions", "ndjson", user_id=user.id, include_archived=True))
+    text = b"".join(exporter.stream("interactions", "csv", user_id=user.id, include_archived=True)).decode()
+
+    records = [json.loads(line) for line in ndjson.splitlines()]
+    rows = list(csv.DictReader(io.StringIO(text)))
+    assert [r["transcript"] for r in records] == [r["transcript"] for r in rows] == ["archived", "live", "latest"]
+    assert json.loads(rows[0]["interaction_metadata"]) == {"day": 1}
+
+def test_export_endpoint_negotiates_formats(client, make_user, tmp_path):
+    user = learner_with_history(make_user, InteractionArchive(str(tmp_path)))
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': user.username})}"}
+    url = "/api/learning/export/"
+
+    response = client.get(url, params={"kind": "sessions", "format": "csv"}, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert f'history-{user.id}-sessions.csv' in response.headers["content-disposition"]
+    assert len(list(csv.DictReader(io.StringIO(response.text)))) == 1
+
+    response = client.get(url, params={"kind": "interactions", "format": "arrow"}, headers=headers)
+    assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    # Without include_archived only the rows still in the database
+    assert pa.ipc.open_stream(response.content).read_all().num_rows == 2
+
+    # A mixed export only fits NDJSON
+    response = client.get(url, params={"kind": "all", "format": "csv"}, headers=headers)
+    assert response.status_code == 400
+    assert client.get(url, params={"format": "parquet"}, headers=headers).status_code == 422
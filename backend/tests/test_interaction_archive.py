@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta
+import shutil
+
+from app.database import SessionLocal
+from app.models.learning_session import LearningSession, SessionType
+from app.models.voice_interaction import InteractionType, VoiceInteraction
+from app.services.analytics import interaction_archive as archive_module
+from app.api.learning import sessions as sessions_api
+from app.services.analytics.interaction_archive import InteractionArchive
+from app.services.jobs import tasks
+
+CUTOFF = datetime(2020, 2, 1)
+
+def test_reused_ids_survive_rearchiving_and_compaction(make_user, tmp_path, monkeypatch):
+    # Every new part triggers a merge of the partition
+    monkeypatch.setattr(archive_module, "MAX_PARTS_PER_PARTITION", 1)
+    archive = InteractionArchive(str(tmp_path))
+    user, _ = make_user()
+    db = SessionLocal()
+    try:
+        sessions = []
+        for i in range(2):
+            session = LearningSession(user_id=user.id, omnidim_session_id=f"archive-{user.id}-{i}", type=SessionType.TUTOR)
+            db.add(session)
+            db.flush()
+            sessions.append(session.id)
+        first = VoiceInteraction(
+            session_id=sessions[0], user_id=user.id, type=InteractionType.USER_SPEECH,
+            transcript="first", timestamp=datetime(2020, 1, 10)
+        )
+        db.add(first)
+        db.commit()
+        reused_id = first.id
+
+        assert archive.archive_older_than(db, CUTOFF) == 1
+        # SQLite hands out the purged rowid again
+        db.add(VoiceInteraction(
+            id=reused_id, session_id=sessions[1], user_id=user.id, type=InteractionType.USER_SPEECH,
+            transcript="second", timestamp=datetime(2020, 1, 20)
+        ))
+        db.commit()
+        assert archive.archive_older_than(db, CUTOFF) == 1
+    finally:
+        db.close()
+
+    records = archive.read(user.id)
+    assert [(r["id"], r["transcript"]) for r in records] == [(reused_id, "first"), (reused_id, "second")]
+    [part] = tmp_path.rglob("part-*.ndjson.zst")
+
+    # Rows archived twice by an interrupted run still read back once
+    shutil.copy(part, part.with_name("part-copy.ndjson.zst"))
+    assert len(archive.read(user.id)) == 2
+
+def test_gzip_parts_read_back_and_compact_with_zstd_parts(tmp_path, monkeypatch):
+    archive = InteractionArchive(str(tmp_path))
+    record = {"id": 1, "session_id": "s", "user_id": 7, "transcript": "old", "timestamp": "2020-01-05T10:00:00"}
+    monkeypatch.setattr(archive_module, "ZSTD_AVAILABLE", False)
+    legacy = archive._write_part("2020-01", 7, [record])
+    monkeypatch.setattr(archive_module, "ZSTD_AVAILABLE", True)
+    archive._write_part("2020-01", 7, [dict(record, id=2, transcript="new")])
+
+    assert legacy.name.endswith(".ndjson.gz")
+    assert [r["transcript"] for r in archive.read(7)] == ["old", "new"]
+
+    monkeypatch.setattr(archive_module, "MAX_PARTS_PER_PARTITION", 1)
+    archive._compact_if_needed("2020-01", 7)
+    [part] = (tmp_path / "voice_interactions" / "month=2020-01" / "user=7").iterdir()
+    assert part.name.endswith(".ndjson.zst")
+    assert [r["transcript"] for r in archive.read(7)] == ["old", "new"]
+
+def test_archiving_is_off_until_a_directory_is_configured(make_user, monkeypatch):
+    archive = InteractionArchive(None)
+    monkeypatch.setattr(tasks, "interaction_archive", archive)
+    user, _ = make_user()
+    db = SessionLocal()
+    try:
+        session = LearningSession(user_id=user.id, omnidim_session_id=f"unarchived-{user.id}", type=SessionType.TUTOR)
+        db.add(session)
+        db.flush()
+        db.add(VoiceInteraction(
+            session_id=session.id, user_id=user.id, type=InteractionType.USER_SPEECH,
+            transcript="kept", timestamp=datetime(2019, 6, 1)
+        ))
+        db.commit()
+
+        assert tasks.archive_old_interactions(archive_after_days=30) == 0
+        assert db.query(VoiceInteraction).filter(VoiceInteraction.user_id == user.id).count() == 1
+    finally:
+        db.close()
+
+    assert not archive.enabled
+    assert archive.read(user.id) == []
+    assert archive.purge_months_before("2030-01") == 0
+
+def test_archived_rows_leave_the_database_and_read_back_merged(client, make_user, tmp_path, monkeypatch):
+    monkeypatch.setattr(archive_module, "MAX_PARTS_PER_PARTITION", 2)
+    archive = InteractionArchive(str(tmp_path))
+    monkeypatch.setattr(sessions_api, "interaction_archive", archive)
+    user, headers = make_user()
+    db = SessionLocal()
+    try:
+        session = LearningSession(user_id=user.id, omnidim_session_id=f"archive-{user.id}", type=SessionType.TUTOR)
+        db.add(session)
+        db.flush()
+        session_id = session.id
+        old = [datetime(2019, 1, 30) + timedelta(days=i) for i in range(5)]
+        for i, timestamp in enumerate(old + [datetime.utcnow()]):
+            db.add(VoiceInteraction(
+                session_id=session_id, user_id=user.id, type=InteractionType.USER_SPEECH,
+                transcript=f"t{i}", timestamp=timestamp
+            ))
+        db.commit()
+
+        # One part per batch; January's and February's partitions compact
+        assert archive.archive_older_than(db, datetime(2019, 3, 1), batch_size=1) == 5
+        remaining = db.query(VoiceInteraction.transcript).filter(VoiceInteraction.session_id == session_id).all()
+    finally:
+        db.close()
+
+    assert remaining == [("t5",)]
+    for month in ("2019-01", "2019-02"):
+        parts = list((tmp_path / "voice_interactions" / f"month={month}" / f"user={user.id}").glob("part-*"))
+        assert 1 <= len(parts) <= 2
+    assert [r["transcript"] for r in archive.read(user.id)] == ["t0", "t1", "t2", "t3", "t4"]
+    assert [r["transcript"] for r in archive.read(user.id, since=datetime(2019, 2, 1))] == ["t2", "t3", "t4"]
+
+    response = client.get(
+        f"/api/learning/sessions/{session_id}/interactions",
+        params={"include_archived": True}, headers=headers
+    )
+    assert [i["transcript"] for i in response.json()["interactions"]] == [f"t{i}" for i in range(6)]
+
+    assert archive.purge_months_before("2019-02") == 1
+    assert [r["transcript"] for r in archive.read(user.id)] == ["t2", "t3", "t4"]
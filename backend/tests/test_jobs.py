@@ -0,0 +1,123 @@
+import asyncio
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from app.config import Settings
+from app.services.jobs import tasks
+from app.services.jobs.broker import InMemoryBroker
+from app.services.jobs.cron import CronSchedule
+from app.services.jobs.leader import SchedulerLock
+from app.services.jobs.registry import JobSpec
+from app.services.jobs.runner import JobRunner
+
+def test_timed_out_sync_jobs_keep_their_slot_and_key():
+    running, overlaps = [0], [0]
+    lock = threading.Lock()
+
+    def slow_purge():
+        with lock:
+            running[0] += 1
+            overlaps[0] = max(overlaps[0], running[0])
+        time.sleep(0.2)
+        with lock:
+            running[0] -= 1
+
+    spec = JobSpec(name="slow_purge", func=slow_purge, timeout_seconds=0.05)
+    broker = InMemoryBroker()
+    runner = JobRunner(broker, registry={"slow_purge": spec}, workers=0, scheduler_enabled=False)
+
+    async def run():
+        assert await broker.claim("slow_purge:tick", 60)
+        message = {"id": "1", "job": "slow_purge", "kwargs": {}, "idempotency_key": "tick"}
+        results = await asyncio.gather(runner.execute(message), runner.execute({**message, "id": "2"}))
+        return results, await broker.claim("slow_purge:tick", 60)
+
+    (first, second), reclaimed = asyncio.run(run())
+
+    assert (first, second) == (False, False)
+    assert runner.stats["slow_purge"].timed_out == 2
+    # The second run waited for the first thread, not just its timeout
+    assert overlaps[0] == 1
+    assert not reclaimed
+
+def test_cron_schedules_pick_the_next_matching_minutes():
+    friday = datetime(2024, 3, 15, 10, 50)
+    assert CronSchedule("*/15 9-10 * * 1-5").upcoming(friday, 3) == [
+        datetime(2024, 3, 18, 9, 0), datetime(2024, 3, 18, 9, 15), datetime(2024, 3, 18, 9, 30)
+    ]
+    # Both day fields restricted: the 13th or any Friday
+    assert CronSchedule("0 0 13 * 5").upcoming(datetime(2024, 9, 1), 3) == [
+        datetime(2024, 9, 6), datetime(2024, 9, 13), datetime(2024, 9, 20)
+    ]
+    assert CronSchedule("0 0 * * 7").next_after(datetime(2024, 3, 15)) == datetime(2024, 3, 17)
+    assert CronSchedule("@monthly").next_after(datetime(2024, 12, 31, 23, 59)) == datetime(2025, 1, 1)
+    # Strictly after: a run at the scheduled minute isn't repeated
+    assert CronSchedule("@daily").next_after(datetime(2024, 3, 15)) == datetime(2024, 3, 16)
+    for expression in ("* * * *", "60 * * * *", "*/0 * * * *", "0 0 31 2 *"):
+        with pytest.raises(ValueError):
+            CronSchedule(expression).next_after(datetime(2024, 1, 1))
+
+def test_idempotency_keys_enqueue_once_and_free_up_only_on_failure():
+    outcomes = ["fail", "ok"]
+
+    def flaky():
+        if outcomes.pop(0) == "fail":
+            raise RuntimeError("transient")
+
+    registry = {"flaky": JobSpec(name="flaky", func=flaky)}
+    broker = InMemoryBroker()
+    # Two API processes sharing the broker schedule the same run
+    first = JobRunner(broker, registry=registry, workers=0, scheduler_enabled=False)
+    second = JobRunner(broker, registry=registry, workers=0, scheduler_enabled=False)
+
+    async def run():
+        ids = [await runner.enqueue("flaky", idempotency_key="2024-03-15T00:00") for runner in (first, second)]
+        assert ids[0] is not None and ids[1] is None
+        assert await broker.depth() == 1
+        assert not await first.execute(await broker.consume())
+
+        # The failed run released its key, so the run can be queued again
+        assert await second.enqueue("flaky", idempotency_key="2024-03-15T00:00")
+        assert await second.execute(await broker.consume())
+        return await first.enqueue("flaky", idempotency_key="2024-03-15T00:00")
+
+    assert asyncio.run(run()) is None
+    assert first.stats["flaky"].duplicates == 1
+    assert second.stats["flaky"].duplicates == 1
+
+def test_only_the_lock_holder_schedules_shared_jobs(tmp_path):
+    ran = []
+    registry = {
+        "rollup": JobSpec(name="rollup", func=lambda: ran.append("rollup"), schedule=CronSchedule("@daily")),
+        "reap": JobSpec(name="reap", func=lambda: ran.append("reap"), schedule=CronSchedule("@daily"), local_only=True)
+    }
+    lock_file = str(tmp_path / "scheduler.lock")
+    # Two uvicorn workers, each with its own in-memory broker
+    runners = [
+        JobRunner(InMemoryBroker(), registry=registry, workers=0, scheduler_lock=SchedulerLock(lock_file))
+        for _ in range(2)
+    ]
+    due, now = datetime(2024, 3, 15), datetime(2024, 3, 15, 0, 1)
+
+    async def tick():
+        for runner in runners:
+            await runner._enqueue_due({"rollup": due, "reap": due}, now)
+        await asyncio.sleep(0.1)
+        return [await runner.broker.depth() for runner in runners]
+
+    assert asyncio.run(tick()) == [1, 0]
+    # Local jobs work on each process's own state, so both run them
+    assert ran == ["reap", "reap"]
+
+    # Leadership moves on when the holder stops
+    runners[0].scheduler_lock.release()
+    assert runners[1].scheduler_lock.acquire()
+    assert not runners[0].scheduler_lock.acquire()
+    runners[1].scheduler_lock.release()
+
+def test_interactions_are_only_purged_when_retention_is_configured():
+    assert Settings.model_fields["VOICE_INTERACTION_RETENTION_DAYS"].default == 0
+    assert tasks.purge_old_interactions() == 0
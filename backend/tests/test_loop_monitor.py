@@ -0,0 +1,26 @@
+import asyncio
+import logging
+import time
+
+from app.core.loop_monitor import LoopMonitor
+from app.core.metrics import EVENT_LOOP_STALLS
+
+def blocking_handler():
+    time.sleep(0.3)
+
+def test_watchdog_logs_the_stack_of_a_blocked_loop(caplog):
+    monitor = LoopMonitor(interval=0.01, threshold=0.1)
+    stalls = EVENT_LOOP_STALLS._default.get()
+
+    async def run():
+        await monitor.start()
+        await asyncio.sleep(0.05)
+        blocking_handler()
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+    with caplog.at_level(logging.WARNING, logger="app.core.loop_monitor"):
+        asyncio.run(run())
+
+    assert EVENT_LOOP_STALLS._default.get() == stalls + 1
+    assert "in blocking_handler" in caplog.text
@@ -0,0 +1,15 @@
+def test_metrics_exposes_route_latency(client, make_user):
+    _, headers = make_user()
+    client.get("/api/learning/sessions/", headers=headers)
+    client.get("/does-not-exist")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert '# TYPE http_request_duration_seconds histogram' in body
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/learning/sessions/"}' in body
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"}' in body
+    assert 'db_pool_checkouts_total{engine="primary"}' in body
+    assert "write_queue_pending" in body
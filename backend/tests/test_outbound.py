@@ -0,0 +1,81 @@
+import asyncio
+
+from app.api.websocket.outbound import OutboundScheduler
+from app.api.websocket.protocol import LEGACY, JSONProtocol, SUBPROTOCOL_JSON
+from app.core.metrics import WEBSOCKET_EVENTS_DROPPED
+
+class SlowSocket:
+    """Records frames; each send takes a few milliseconds, like a congested link"""
+
+    def __init__(self, delay=0.002):
+        self.delay = delay
+        self.sent = []
+
+    async def send(self, message):
+        await asyncio.sleep(self.delay)
+        self.sent.append(message.get("bytes") or message.get("text"))
+
+def test_audio_overtakes_a_telemetry_burst():
+    socket = SlowSocket()
+
+    async def run():
+        scheduler = OutboundScheduler(socket, LEGACY, interval=0.1, telemetry_queue_size=100)
+        scheduler.start()
+        for i in range(50):
+            await scheduler.send({"type": "metrics", "n": i})
+        await asyncio.sleep(0.01)
+        await scheduler.send({"type": "audio", "data": b"tts"})
+        await asyncio.sleep(0.02)
+        await scheduler.close()
+
+    asyncio.run(run())
+
+    # Only the frames already on the wire when audio arrived went first
+    assert socket.sent.index(b"tts") < 10
+
+def test_telemetry_drops_oldest_on_overflow_and_skips_stale_updates():
+    socket = SlowSocket(delay=0)
+    overflow = WEBSOCKET_EVENTS_DROPPED.labels("telemetry", "overflow")
+    stale = WEBSOCKET_EVENTS_DROPPED.labels("telemetry", "stale")
+    overflowed, staled = overflow.get(), stale.get()
+
+    async def run():
+        scheduler = OutboundScheduler(
+            socket, LEGACY, interval=0.1, telemetry_queue_size=3, max_telemetry_age=0.05
+        )
+        for i in range(5):
+            await scheduler.send({"type": "emotion", "n": i})
+        await scheduler.drain()
+        await scheduler.send({"type": "emotion", "n": "old"})
+        await asyncio.sleep(0.06)
+        await scheduler.send({"type": "transcript", "text": "hi"})
+        await scheduler.drain()
+
+    asyncio.run(run())
+
+    assert socket.sent == [
+        '{"type":"emotion","n":2}',
+        '{"type":"emotion","n":3}',
+        '{"type":"emotion","n":4}',
+        '{"type":"transcript","text":"hi"}',
+    ]
+    assert overflow.get() == overflowed + 2
+    assert stale.get() == staled + 1
+
+def test_coalesced_telemetry_is_sent_once_per_interval():
+    socket = SlowSocket(delay=0)
+
+    async def run():
+        scheduler = OutboundScheduler(socket, JSONProtocol(SUBPROTOCOL_JSON, coalesce=True), interval=0.05)
+        scheduler.start()
+        for i in range(20):
+            await scheduler.send({"type": "emotion", "n": i})
+            await asyncio.sleep(0.005)
+        await asyncio.sleep(0.06)
+        await scheduler.close()
+
+    asyncio.run(run())
+
+    # First update at once, then one batch per 50 ms instead of one frame per update
+    assert 2 <= len(socket.sent) < 10
+    assert socket.sent[-1] == '{"type":"batch","events":[{"type":"emotion","n":19}]}'
@@ -0,0 +1,25 @@
+def test_admin_can_profile_a_request_and_download_its_stacks(client, make_user):
+    _, headers = make_user(admin=True)
+
+    response = client.get("/api/learning/sessions/", headers={**headers, "X-Profile": "1"})
+    profile_id = response.headers["x-profile-id"]
+
+    listed = client.get("/api/admin/profiles/", headers=headers).json()
+    assert [p["id"] for p in listed] == [profile_id]
+    assert listed[0]["route"] == "/api/learning/sessions/"
+    assert listed[0]["trigger"] == "header"
+
+    stacks = client.get(f"/api/admin/profiles/{profile_id}/collapsed", headers=headers)
+    assert stacks.status_code == 200
+    for line in stacks.text.splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert ";" in stack and int(count) > 0
+
+def test_profile_header_is_ignored_for_other_users(client, make_user):
+    # The username confers nothing; only the is_admin flag does
+    _, headers = make_user("admin")
+
+    response = client.get("/api/learning/sessions/", headers={**headers, "X-Profile": "1"})
+
+    assert "x-profile-id" not in response.headers
+    assert client.get("/api/admin/profiles/", headers=headers).status_code == 403
@@ -0,0 +1,77 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.query_stats import track_queries
+from app.database import SessionLocal
+from app.models.learning_session import LearningSession, SessionType
+from app.models.voice_interaction import VoiceInteraction, InteractionType
+from app.services.omnidim.voice_session import VoiceSessionManager
+
+SESSIONS = 5
+INTERACTIONS_PER_SESSION = 4
+
+@pytest.fixture
+def learner(make_user):
+    """A user with several sessions and interactions, so N+1 patterns show"""
+    user, headers = make_user()
+    db = SessionLocal()
+    try:
+        session_ids = []
+        for i in range(SESSIONS):
+            session = LearningSession(
+                user_id=user.id,
+                omnidim_session_id=f"budget-{user.id}-{i}",
+                type=list(SessionType)[i % len(SessionType)],
+                subject="math",
+                started_at=datetime.utcnow() - timedelta(days=i)
+            )
+            db.add(session)
+            db.flush()
+            session_ids.append(session.id)
+            for _ in range(INTERACTIONS_PER_SESSION):
+                db.add(VoiceInteraction(
+                    session_id=session.id,
+                    user_id=user.id,
+                    type=InteractionType.USER_SPEECH,
+                    transcript="hello",
+                    pronunciation_score=0.9
+                ))
+        db.commit()
+    finally:
+        db.close()
+    return user, headers, session_ids
+
+# Statement budgets include the authenticated-user lookup
+@pytest.mark.parametrize("path, budget", [
+    ("/api/learning/sessions/", 2),
+    ("/api/learning/sessions/recent/summary", 2),
+    ("/api/learning/sessions/{session_id}", 2),
+    ("/api/learning/sessions/{session_id}/interactions", 3),
+    ("/api/learning/sessions/{session_id}/voice-metrics", 4),
+    ("/api/learning/progress/", 5),
+    ("/api/learning/progress/achievements", 2),
+    ("/api/learning/analytics/dashboard", 4),
+    ("/api/learning/analytics/insights", 2),
+    ("/api/learning/analytics/voice-trends", 2),
+    ("/api/learning/analytics/performance-trends", 2),
+    ("/api/learning/analytics/recommendations", 2),
+])
+def test_endpoint_query_budget(client, learner, max_queries, path, budget):
+    _, headers, session_ids = learner
+    response = max_queries(budget, client.get, path.format(session_id=session_ids[0]), headers=headers)
+    assert response.status_code == 200
+
+def test_active_sessions_load_in_one_query(learner):
+    user, _, _ = learner
+    manager = VoiceSessionManager()
+    for i in range(SESSIONS):
+        manager.active_sessions[f"budget-{user.id}-{i}"] = {"user_id": user.id}
+    manager.active_sessions["someone-else"] = {"user_id": user.id + 1000}
+
+    with track_queries() as stats:
+        sessions = asyncio.run(manager.get_user_active_sessions(user.id))
+
+    assert [s["session_id"] for s in sessions] == [f"budget-{user.id}-{i}" for i in range(SESSIONS)]
+    assert stats.count == 1
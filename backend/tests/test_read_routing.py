@@ -0,0 +1,57 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app import database
+from app.config import settings
+
+class FakeMonitor(database.ReplicaMonitor):
+    lag = 0.0
+
+    def _measure(self):
+        return self.lag
+
+@pytest.fixture
+def replica(monkeypatch):
+    """A read-only pool on the test database standing in for a replica"""
+    read_engine = database.build_engine(settings.DATABASE_URL, read_only=True, name="test-read")
+    monitor = FakeMonitor(read_engine, check_interval=0)
+    monkeypatch.setattr(database, "read_engine", read_engine)
+    monkeypatch.setattr(database, "ReadSessionLocal", sessionmaker(bind=read_engine))
+    monkeypatch.setattr(database, "replica_monitor", monitor)
+    yield monitor
+    read_engine.dispose()
+
+def engine_for(route):
+    sessions = database.get_read_db(route)()
+    db = next(sessions)
+    try:
+        return db.get_bind()
+    finally:
+        sessions.close()
+
+def test_reads_go_to_the_replica_only_within_each_route_staleness(replica):
+    assert engine_for("sessions") is replica.read_engine
+    assert engine_for("analytics") is replica.read_engine
+
+    # Past the session listing's 2s tolerance, within analytics' 60s
+    replica.lag = 3.0
+    assert engine_for("sessions") is database.engine
+    assert engine_for("analytics") is replica.read_engine
+
+    # An unreachable replica sends every read to the primary
+    replica.lag = None
+    assert engine_for("analytics") is database.engine
+    replica.lag = 0.0
+    # Route groups without a tolerance never use the replica
+    assert engine_for("admin") is database.engine
+
+def test_replica_sessions_refuse_writes(replica):
+    db = database.ReadSessionLocal()
+    try:
+        assert db.execute(text("SELECT count(*) FROM users")).scalar() >= 0
+        with pytest.raises(OperationalError):
+            db.execute(text("DELETE FROM users WHERE id < 0"))
+    finally:
+        db.close()
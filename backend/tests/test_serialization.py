@@ -0,0 +1,98 @@
+import enum
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import List
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from app.core.serialization import FastJSONResponse
+from app.main import app as main_app
+
+class Level(str, enum.Enum):
+    BEGINNER = "beginner"
+
+class Rank(enum.IntEnum):
+    GOLD = 1
+
+class Row(BaseModel):
+    id: uuid.UUID
+    level: Level
+    rank: Rank
+    started_at: datetime
+    day: date
+    score: float
+
+def payload():
+    return {
+        "naive": datetime(2024, 5, 1, 12, 30),
+        "micros": datetime(2024, 5, 1, 12, 30, 0, 250),
+        "utc": datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc),
+        "offset": datetime(2024, 5, 1, 14, 30, tzinfo=timezone(timedelta(hours=2))),
+        "day": date(2024, 5, 1),
+        "id": uuid.UUID("0190c3a0-0000-7000-8000-000000000001"),
+        "level": Level.BEGINNER,
+        "rank": Rank.GOLD,
+        "price": Decimal("1.25"),
+        "count": Decimal("5"),
+        "tags": {"grammar"},
+        "nested": [{"at": datetime(2024, 5, 2), "text": "café"}],
+    }
+
+def rows():
+    return [
+        Row(
+            id=uuid.UUID(int=i), level=Level.BEGINNER, rank=Rank.GOLD,
+            started_at=datetime(2024, 5, 1, i, tzinfo=timezone.utc), day=date(2024, 5, i + 1), score=0.5
+        )
+        for i in range(1, 3)
+    ]
+
+def build_app(response_class):
+    app = FastAPI(default_response_class=response_class)
+
+    @app.get("/raw")
+    def raw():
+        return payload()
+
+    @app.get("/rows", response_model=List[Row])
+    def listed():
+        return rows()
+
+    @app.get("/direct", response_model=List[Row])
+    def direct():
+        # Hot endpoints hand already-shaped rows straight to the response
+        return FastJSONResponse([row.model_dump() for row in rows()])
+
+    return app
+
+def test_the_app_renders_with_orjson_by_default():
+    assert main_app.router.default_response_class is FastJSONResponse
+
+def test_default_response_class_matches_the_stdlib_renderer():
+    fast = TestClient(build_app(FastJSONResponse))
+    old = TestClient(build_app(JSONResponse))
+
+    for path in ("/raw", "/rows"):
+        new_response, old_response = fast.get(path), old.get(path)
+        assert new_response.headers["content-type"] == old_response.headers["content-type"]
+        assert new_response.content == old_response.content
+
+    body = fast.get("/raw").json()
+    assert body["utc"] == "2024-05-01T12:30:00+00:00"
+    assert body["micros"] == "2024-05-01T12:30:00.000250"
+    assert body["id"] == "0190c3a0-0000-7000-8000-000000000001"
+    assert (body["level"], body["rank"]) == ("beginner", 1)
+    assert (body["price"], body["count"]) == (1.25, 5)
+
+def test_direct_responses_match_validated_response_models():
+    client = TestClient(build_app(FastJSONResponse))
+    assert client.get("/direct").content == client.get("/rows").content
+    assert client.get("/direct").json()[0]["started_at"] == "2024-05-01T01:00:00Z"
+
+def test_direct_decimals_render_like_jsonable_encoder():
+    body = FastJSONResponse({"price": Decimal("1.25"), "count": Decimal("5"), "big": Decimal("1E+2")}).body
+    assert body == b'{"price":1.25,"count":5,"big":100}'
@@ -0,0 +1,110 @@
+import json
+import uuid
+
+from sqlalchemy import event
+
+from app.database import SessionLocal, engine
+from app.models.learning_session import LearningSession, SessionConfig, SessionType
+from app.services.analytics.history_export import HistoryExporter
+from app.services.omnidim.session_config_store import SessionConfigStore
+
+def _config(user_id, nonce, **context):
+    return {
+        "mode": "tutor",
+        "user_id": str(user_id),
+        "context": {"subject": "math", "nonce": nonce, **context},
+        "features": ["real_time_transcription"],
+        "voice_id": "tutor_friendly",
+    }
+
+def test_identical_configs_are_stored_once():
+    nonce = uuid.uuid4().hex
+    store = SessionConfigStore(cache_size=8)
+    db = SessionLocal()
+    try:
+        first_hash, first_overrides = store.store(db, _config(1, nonce))
+        db.commit()
+        # Key order doesn't change the hash; only user_id stays per session
+        reordered = dict(reversed(list(_config(2, nonce).items())))
+        second_hash, second_overrides = store.store(db, reordered)
+        # A process with a cold cache finds the committed row
+        third_hash, _ = SessionConfigStore(cache_size=8).store(db, _config(3, nonce))
+        other_hash, _ = store.store(db, _config(1, nonce, subject="physics"))
+        db.commit()
+
+        rows = db.query(SessionConfig).filter(
+            SessionConfig.hash.in_([first_hash, other_hash])
+        ).all()
+    finally:
+        db.close()
+
+    assert first_hash == second_hash == third_hash != other_hash
+    assert (first_overrides, second_overrides) == ({"user_id": "1"}, {"user_id": "2"})
+    assert len(rows) == 2
+    assert "user_id" not in rows[0].config
+
+def test_sessions_resolve_to_their_full_config(make_user):
+    user, _ = make_user()
+    nonce = uuid.uuid4().hex
+    store = SessionConfigStore(cache_size=8)
+    legacy_config = _config(user.id, nonce, subject="history")
+    db = SessionLocal()
+    try:
+        config_hash, overrides = store.store(db, _config(user.id, nonce))
+        deduplicated = LearningSession(
+            user_id=user.id, omnidim_session_id=f"dedup-{nonce}", type=SessionType.TUTOR,
+            config_hash=config_hash, config_overrides=overrides
+        )
+        # Written before migration 0002: the whole blob, no hash
+        legacy = LearningSession(
+            user_id=user.id, omnidim_session_id=f"legacy-{nonce}", type=SessionType.TUTOR,
+            config=legacy_config
+        )
+        db.add_all([deduplicated, legacy])
+        db.commit()
+
+        resolved = store.resolve(db, deduplicated)
+        # Callers get their own copy of the cached shared config
+        resolved["context"]["subject"] = "changed"
+        assert store.resolve(db, deduplicated) == _config(user.id, nonce)
+        assert store.resolve(db, legacy) == legacy_config
+
+        exported = [
+            json.loads(line)
+            for line in b"".join(HistoryExporter().stream("sessions", "ndjson", user_id=user.id)).splitlines()
+        ]
+    finally:
+        db.close()
+
+    assert {record["omnidim_session_id"]: record["config"] for record in exported} == {
+        f"dedup-{nonce}": _config(user.id, nonce),
+        f"legacy-{nonce}": legacy_config,
+    }
+
+def test_resolved_configs_come_from_the_cache():
+    nonce = uuid.uuid4().hex
+    store = SessionConfigStore(cache_size=8)
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    db = SessionLocal()
+    try:
+        config_hash, _ = store.store(db, _config(1, nonce))
+        db.commit()
+        # Finding the committed row caches its config
+        store.store(db, _config(2, nonce))
+        session = LearningSession(id="cached", config_hash=config_hash, config_overrides={"user_id": "2"})
+
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            assert store.resolve(db, session) == _config(2, nonce)
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+
+        assert store.resolve(db, LearningSession(id="missing", config_hash="0" * 64)) is None
+    finally:
+        db.close()
+
+    assert statements == []
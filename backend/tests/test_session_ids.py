@@ -0,0 +1,38 @@
+import time
+
+from sqlalchemy import text
+
+from app.database import SessionLocal
+from app.models.learning_session import LearningSession, SessionType
+from app.models.types import uuid7
+
+def test_session_ids_are_time_ordered():
+    earlier = uuid7()
+    time.sleep(0.002)
+    assert uuid7() > earlier
+
+def test_session_ids_bind_as_16_bytes_and_malformed_ids_match_nothing(client, make_user):
+    user, headers = make_user()
+    db = SessionLocal()
+    try:
+        session = LearningSession(user_id=user.id, omnidim_session_id=f"ids-{user.id}", type=SessionType.TUTOR)
+        db.add(session)
+        db.commit()
+        session_id = session.id
+        stored = db.execute(
+            text("SELECT length(id) FROM learning_sessions WHERE omnidim_session_id = :o"),
+            {"o": f"ids-{user.id}"}
+        ).scalar()
+    finally:
+        db.close()
+
+    assert stored == 16
+    # Any spelling of the UUID finds the session; the API returns it canonical
+    response = client.get(f"/api/learning/sessions/{session_id.upper()}", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["id"] == session_id
+
+    for malformed in ("not-a-uuid", session_id[:-1], "1234"):
+        for suffix in ("", "/interactions", "/voice-metrics"):
+            response = client.get(f"/api/learning/sessions/{malformed}{suffix}", headers=headers)
+            assert response.status_code == 404, (malformed, suffix)
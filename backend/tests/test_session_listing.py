@@ -0,0 +1,80 @@
+import base64
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.database import SessionLocal
+from app.models.learning_session import LearningSession, SessionType
+
+def _cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+def _page_through(client, headers, limit=2, max_pages=10):
+    seen, cursor = [], None
+    for _ in range(max_pages):
+        params = {"limit": limit, "fields": "id"}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/learning/sessions/", params=params, headers=headers)
+        assert response.status_code == 200
+        seen.extend(row["id"] for row in response.json())
+        cursor = response.headers.get("x-next-cursor")
+        if cursor is None:
+            return seen
+    pytest.fail(f"pagination did not finish after {max_pages} pages: {seen}")
+
+def test_cursor_pages_cover_sessions_sharing_a_start_time(client, make_user):
+    user, headers = make_user()
+    started_at = datetime(2024, 5, 1, 12, 0)
+    db = SessionLocal()
+    try:
+        # Three sessions start in the same second, so pages must break ties on id
+        for i, offset in enumerate([0, 0, 0, 1, 2]):
+            db.add(LearningSession(
+                user_id=user.id,
+                omnidim_session_id=f"page-{user.id}-{i}",
+                type=SessionType.TUTOR,
+                started_at=started_at - timedelta(hours=offset)
+            ))
+        db.commit()
+        expected = [s.id for s in db.query(LearningSession).filter(
+            LearningSession.user_id == user.id
+        ).order_by(LearningSession.started_at.desc(), LearningSession.id.desc())]
+    finally:
+        db.close()
+
+    assert _page_through(client, headers) == expected
+
+def test_cursor_pages_cover_sessions_with_default_start_times(client, make_user):
+    user, headers = make_user()
+    db = SessionLocal()
+    try:
+        # started_at is left to the column default, as the live session path does
+        for i in range(5):
+            db.add(LearningSession(
+                user_id=user.id,
+                omnidim_session_id=f"default-page-{user.id}-{i}",
+                type=SessionType.TUTOR
+            ))
+        db.commit()
+        expected = [s.id for s in db.query(LearningSession).filter(
+            LearningSession.user_id == user.id
+        ).order_by(LearningSession.started_at.desc(), LearningSession.id.desc())]
+    finally:
+        db.close()
+
+    assert _page_through(client, headers) == expected
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    _cursor({"started_at": "2024-05-01T12:00:00"}),
+    _cursor(["yesterday", "0190c3a0-0000-7000-8000-000000000000"]),
+    _cursor(["2024-05-01T12:00:00", "not-a-session-id"]),
+    _cursor(["2024-05-01T12:00:00"]),
+])
+def test_malformed_cursors_are_rejected(client, make_user, cursor):
+    _, headers = make_user()
+    response = client.get("/api/learning/sessions/", params={"cursor": cursor}, headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid pagination cursor"
@@ -0,0 +1,67 @@
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.database import WriteQueue, build_engine
+
+def test_performance_profile_sets_its_pragmas_on_every_connection(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path}/perf.db", sqlite_profile="performance", name="test-perf")
+    try:
+        with engine.connect() as conn:
+            pragma = lambda name: conn.execute(text(f"PRAGMA {name}")).scalar()
+            assert pragma("journal_mode") == "wal"
+            # NORMAL
+            assert pragma("synchronous") == 1
+            assert pragma("busy_timeout") == settings.SQLITE_BUSY_TIMEOUT_MS
+            assert pragma("foreign_keys") == 1
+            assert pragma("temp_store") == 2
+    finally:
+        engine.dispose()
+
+def test_write_queue_serializes_writes_and_rolls_back_failures(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path}/queue.db", sqlite_profile="performance", name="test-queue")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE counters (name TEXT PRIMARY KEY, value INTEGER)"))
+        conn.execute(text("INSERT INTO counters VALUES ('hits', 0)"))
+    queue = WriteQueue(sessionmaker(bind=engine), workers=1)
+    active, overlaps = [0], [0]
+    lock = threading.Lock()
+
+    def increment(db):
+        with lock:
+            active[0] += 1
+            overlaps[0] = max(overlaps[0], active[0])
+        # Read-modify-write is only safe because writes don't overlap
+        value = db.execute(text("SELECT value FROM counters WHERE name = 'hits'")).scalar()
+        db.execute(text("UPDATE counters SET value = :v WHERE name = 'hits'"), {"v": value + 1})
+        with lock:
+            active[0] -= 1
+        return value + 1
+
+    def duplicate(db):
+        db.execute(text("UPDATE counters SET value = -1"))
+        db.execute(text("INSERT INTO counters VALUES ('hits', 0)"))
+
+    async def run():
+        results = await asyncio.gather(*(queue.run(increment) for _ in range(20)))
+        with pytest.raises(IntegrityError):
+            await queue.run(duplicate)
+        return results
+
+    try:
+        results = asyncio.run(run())
+        with engine.connect() as conn:
+            final = conn.execute(text("SELECT value FROM counters")).scalar()
+    finally:
+        queue.shutdown()
+        engine.dispose()
+
+    assert sorted(results) == list(range(1, 21))
+    assert overlaps[0] == 1
+    # The failed write's update was rolled back with it
+    assert final == 20
@@ -0,0 +1,83 @@
+import asyncio
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+from app.api.websocket import voice_stream_handler
+from app.services.container import Services
+from app.services.omnidim import speech_analysis, voice_session
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+CREATE_APP = """
+import json, sys
+from app.main import create_app
+from app.services.container import services
+from app.services.omnidim.voice_session import VoiceSessionManager
+create_app()
+print(json.dumps({
+    "built": [name for name in services.NAMES if name in services.__dict__],
+    "session_managers": len(VoiceSessionManager.instances),
+    "numpy_loaded": "numpy" in sys.modules,
+}))
+"""
+
+def test_creating_the_app_builds_no_services_or_tables(tmp_path):
+    database = tmp_path / "fresh.db"
+    result = subprocess.run(
+        [sys.executable, "-c", CREATE_APP],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "DATABASE_URL": f"sqlite:///{database}"},
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    startup = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert startup == {"built": [], "session_managers": 0, "numpy_loaded": False}
+    # Tables come from migrations, not from importing the app
+    if database.exists():
+        with sqlite3.connect(database) as conn:
+            assert conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall() == []
+
+class CountingService:
+    built = 0
+
+    def __init__(self):
+        type(self).built += 1
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+def counting(name):
+    return type(name, (CountingService,), {"built": 0})
+
+def test_services_are_built_once_on_first_use(monkeypatch):
+    fakes = {
+        "session_manager": (voice_session, "VoiceSessionManager", counting("VoiceSessionManager")),
+        "speech_analyzer": (speech_analysis, "SpeechAnalyzer", counting("SpeechAnalyzer")),
+        "voice_stream_handler": (voice_stream_handler, "VoiceStreamHandler", counting("VoiceStreamHandler")),
+    }
+    for module, name, fake in fakes.values():
+        monkeypatch.setattr(module, name, fake)
+    container = Services()
+
+    first = container.session_manager
+    assert container.session_manager is first
+    assert [fake.built for _, _, fake in fakes.values()] == [1, 0, 0]
+
+    # The lifespan warms the rest without rebuilding what exists
+    container.warm()
+    assert [fake.built for _, _, fake in fakes.values()] == [1, 1, 1]
+
+    built = [getattr(container, name) for name in Services.NAMES]
+    asyncio.run(container.close())
+    assert all(service.closed for service in built)
+
+    # A closed service is built afresh on its next use
+    assert container.session_manager is not first
+    assert fakes["session_manager"][2].built == 2
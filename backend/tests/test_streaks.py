@@ -0,0 +1,126 @@
+import threading
+from datetime import date, datetime, timedelta
+
+from app.database import SessionLocal
+from app.models.learning_session import LearningSession, SessionStatus, SessionType
+from app.models.progress import Progress, StudyStreak
+from app.services.learning.streak_engine import StreakEngine
+
+def _snapshot(db, user_id):
+    progress = db.query(Progress).filter(Progress.user_id == user_id).one()
+    streaks = db.query(StudyStreak).filter(
+        StudyStreak.user_id == user_id
+    ).order_by(StudyStreak.start_date).all()
+    return (
+        progress.current_streak,
+        progress.longest_streak,
+        [(s.start_date.date(), s.days, s.is_active, s.freeze_used) for s in streaks]
+    )
+
+def test_nightly_recompute_matches_live_updates(make_user):
+    user, _ = make_user()
+    sessions = [
+        (datetime(2024, 3, 1, 10, 0), datetime(2024, 3, 1, 10, 30), SessionStatus.COMPLETED),
+        # Ends after midnight: the live path credits Mar 3, not Mar 2
+        (datetime(2024, 3, 2, 23, 30), datetime(2024, 3, 3, 0, 20), SessionStatus.COMPLETED),
+        # Abandoned sessions never reach the live path
+        (datetime(2024, 3, 4, 9, 0), datetime(2024, 3, 4, 9, 5), SessionStatus.ABANDONED),
+        (datetime(2024, 3, 5, 18, 0), datetime(2024, 3, 5, 18, 45), SessionStatus.COMPLETED),
+        (datetime(2024, 3, 6, 8, 0), datetime(2024, 3, 6, 8, 20), SessionStatus.COMPLETED),
+        (datetime(2024, 3, 6, 20, 0), datetime(2024, 3, 6, 20, 10), SessionStatus.COMPLETED),
+    ]
+    engine = StreakEngine()
+    db = SessionLocal()
+    try:
+        for i, (started_at, ended_at, status) in enumerate(sessions):
+            db.add(LearningSession(
+                user_id=user.id,
+                omnidim_session_id=f"streak-{user.id}-{i}",
+                type=SessionType.TUTOR,
+                status=status,
+                started_at=started_at,
+                ended_at=ended_at
+            ))
+            if status == SessionStatus.COMPLETED:
+                engine.record_activity(db, user.id, ended_at)
+            db.commit()
+        live = _snapshot(db, user.id)
+
+        engine.recompute_all(db, as_of=date(2024, 3, 6))
+        db.expire_all()
+        nightly = _snapshot(db, user.id)
+    finally:
+        db.close()
+
+    # Mar 1, freeze over Mar 2, Mar 3; the second missed day starts over
+    assert live == (2, 2, [
+        (date(2024, 3, 1), 2, False, True),
+        (date(2024, 3, 5), 2, True, False),
+    ])
+    assert nightly == live
+
+def test_concurrent_session_ends_advance_the_streak_once(make_user):
+    user, _ = make_user()
+    now = datetime(2024, 4, 10, 15, 0)
+    yesterday = now - timedelta(days=1)
+    db = SessionLocal()
+    try:
+        db.add(Progress(user_id=user.id, current_streak=3, longest_streak=3, last_study_date=yesterday))
+        db.add(StudyStreak(
+            user_id=user.id, start_date=yesterday - timedelta(days=2), end_date=yesterday, days=3, is_active=True
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+    engine = StreakEngine()
+    barrier = threading.Barrier(4)
+
+    def end_session(minute):
+        db = SessionLocal()
+        try:
+            barrier.wait()
+            engine.record_activity(db, user.id, now + timedelta(minutes=minute))
+            db.commit()
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=end_session, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    db = SessionLocal()
+    try:
+        assert _snapshot(db, user.id) == (4, 4, [(date(2024, 4, 7), 4, True, False)])
+    finally:
+        db.close()
+
+def test_check_ins_from_the_endpoint_survive_the_nightly_recompute(client, make_user):
+    user, headers = make_user()
+    engine = StreakEngine()
+    yesterday = datetime.utcnow() - timedelta(days=1)
+    db = SessionLocal()
+    try:
+        engine.check_in(db, user.id, yesterday)
+        db.commit()
+    finally:
+        db.close()
+
+    for _ in range(2):
+        response = client.post("/api/learning/progress/update-streak", headers=headers)
+        assert response.status_code == 200
+    assert response.json() == {"current_streak": 2, "longest_streak": 2}
+
+    db = SessionLocal()
+    try:
+        live = _snapshot(db, user.id)
+        engine.recompute_all(db)
+        db.expire_all()
+        nightly = _snapshot(db, user.id)
+    finally:
+        db.close()
+
+    assert live == (2, 2, [(yesterday.date(), 2, True, False)])
+    assert nightly == live
@@ -0,0 +1,49 @@
+import threading
+
+from app.database import SessionLocal
+from app.models.progress import SubjectProgress
+from app.services.learning.progress_tracker import ProgressTracker
+
+WRITERS = 6
+INCREMENTS = 5
+
+def test_concurrent_subject_increments_are_not_lost(make_user):
+    user, _ = make_user()
+    tracker = ProgressTracker()
+    barrier = threading.Barrier(WRITERS)
+    errors = []
+
+    def write():
+        barrier.wait()
+        for _ in range(INCREMENTS):
+            db = SessionLocal()
+            try:
+                tracker.increment_subject(
+                    db, user.id, "math", seconds=60, sessions=1, accuracy=0.5, experience_points=1
+                )
+                db.commit()
+            except Exception as e:
+                errors.append(e)
+            finally:
+                db.close()
+
+    threads = [threading.Thread(target=write) for _ in range(WRITERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    db = SessionLocal()
+    try:
+        rows = db.query(SubjectProgress).filter(SubjectProgress.user_id == user.id).all()
+    finally:
+        db.close()
+
+    total = WRITERS * INCREMENTS
+    assert errors == []
+    assert len(rows) == 1
+    row = rows[0]
+    assert (row.sessions, row.total_time, row.experience_points, row.accuracy_count) == (
+        total, total * 60, total, total
+    )
+    assert row.average_accuracy == 0.5
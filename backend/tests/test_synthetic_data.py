@@ -0,0 +1,71 @@
+import importlib.util
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.models.learning_session import LearningSession, SessionStatus, SessionType
+from app.models.progress import Achievement, AchievementCounter, Progress, SubjectProgress
+from app.models.user import LearningStyle, User
+from app.models.voice_interaction import InteractionType, VoiceInteraction
+
+SCRIPT = Path(__file__).resolve().parents[1] / "scripts" / "generate_synthetic_data.py"
+NOW = datetime(2026, 1, 15, 12, 0)
+
+def load_generator():
+    spec = importlib.util.spec_from_file_location("generate_synthetic_data", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def generate(generator, seed=7, chunk_index=0):
+    volumes = generator.Volumes(sessions_per_user=4, interactions_per_session=5, days=30)
+    return generator.generate_chunk(1, 6, volumes, seed, chunk_index, NOW, "not-a-real-hash")
+
+def test_same_seed_generates_identical_rows():
+    generator = load_generator()
+    first = generate(generator)
+
+    assert first == generate(generator)
+    assert first != generate(generator, seed=8)
+    # Chunks draw from their own streams
+    assert first["learning_sessions"] != generate(generator, chunk_index=1)["learning_sessions"]
+
+def test_generated_rows_load_with_valid_keys_and_enums(tmp_path):
+    generator = load_generator()
+    tables = generate(generator)
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'synthetic.db'}")
+
+    @event.listens_for(engine, "connect")
+    def enforce_foreign_keys(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA foreign_keys = ON")
+
+    Base.metadata.create_all(bind=engine)
+    counts = generator.ChunkWriter(engine, batch_size=50).write(tables)
+    assert counts == {name: len(tables[name]) for name in generator.TABLE_ORDER}
+
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA foreign_key_check")).fetchall() == []
+
+    # Enum columns only load when every stored value is a member
+    with Session(engine) as db:
+        users = db.query(User).all()
+        sessions = db.query(LearningSession).all()
+        interactions = db.query(VoiceInteraction).all()
+        assert len(users) == 6
+        assert all(isinstance(u.learning_style, LearningStyle) for u in users)
+        assert all(isinstance(s.type, SessionType) and s.status == SessionStatus.COMPLETED for s in sessions)
+        assert all(isinstance(i.type, InteractionType) for i in interactions)
+        assert {s.user_id for s in sessions} == {u.id for u in users}
+        assert all(s.ended_at <= NOW and s.started_at <= s.ended_at for s in sessions)
+
+        owner = {s.id: s.user_id for s in sessions}
+        assert all(owner[i.session_id] == i.user_id for i in interactions)
+        assert sum(s.interaction_count for s in sessions) == len(interactions)
+
+        for model in (Progress, SubjectProgress, AchievementCounter, Achievement):
+            assert {row.user_id for row in db.query(model)} <= {u.id for u in users}
+    engine.dispose()
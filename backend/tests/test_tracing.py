@@ -0,0 +1,121 @@
+import functools
+import json
+import uuid
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.core import tracing
+from app.core.tracing import CLIENT, SERVER, SpanExporter, span_processor
+from app.services.container import services
+from app.services.omnidim.voice_session import VoiceSessionManager
+
+REMOTE_TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+REMOTE_PARENT_ID = "00f067aa0ba902b7"
+
+class RecordingExporter(SpanExporter):
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans):
+        self.spans.extend(spans)
+
+@pytest.fixture
+def exporter(monkeypatch):
+    recording = RecordingExporter()
+    monkeypatch.setattr(settings, "TRACE_EXPORTER", "file")
+    monkeypatch.setattr(settings, "TRACE_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(span_processor, "exporter", recording)
+    yield recording
+    span_processor.shutdown()
+
+@pytest.fixture
+def omnidim_requests(monkeypatch):
+    """Requests the tutor session manager sends to Omnidim"""
+    sent = []
+
+    def handler(request):
+        sent.append(request)
+        return httpx.Response(200, json={"session_id": f"omni-{uuid.uuid4().hex}"})
+
+    monkeypatch.setattr(httpx, "AsyncClient", functools.partial(httpx.AsyncClient, transport=httpx.MockTransport(handler)))
+    monkeypatch.setitem(services.__dict__, "session_manager", VoiceSessionManager())
+    return sent
+
+def start_tutor_session(client, headers, **extra_headers):
+    response = client.post(
+        "/api/voice/tutor/start",
+        json={"type": "tutor", "subject": "math"},
+        headers={**headers, **extra_headers}
+    )
+    assert response.status_code == 200
+    # Export what the request queued
+    span_processor.shutdown()
+    return response
+
+def test_request_spans_link_http_sql_and_omnidim(client, make_user, exporter, omnidim_requests):
+    _, headers = make_user()
+    response = start_tutor_session(client, headers)
+
+    [server] = [s for s in exporter.spans if s.kind == SERVER]
+    assert server.name == "POST /api/voice/tutor/start"
+    assert server.parent_id is None
+    assert response.headers["x-trace-id"] == server.trace_id
+    assert {s.trace_id for s in exporter.spans} == {server.trace_id}
+
+    by_id = {s.span_id: s for s in exporter.spans}
+    [auth] = [s for s in exporter.spans if s.name == "auth.get_current_user"]
+    [omnidim] = [s for s in exporter.spans if s.name == "omnidim.sessions.create"]
+    assert auth.parent_id == server.span_id
+    assert omnidim.parent_id == server.span_id and omnidim.kind == CLIENT
+
+    queries = [s for s in exporter.spans if s.name == "db.query"]
+    parents = {by_id[q.parent_id].name for q in queries}
+    # The user lookup runs under auth, the session insert under the request
+    assert parents == {"auth.get_current_user", "POST /api/voice/tutor/start"}
+    assert any("INSERT INTO learning_sessions" in q.attributes["db.statement"] for q in queries)
+
+    # Omnidim sees the client span as the parent of its own work
+    [upstream] = omnidim_requests
+    assert upstream.headers["traceparent"] == omnidim.traceparent
+    assert upstream.headers["x-trace-id"] == server.trace_id
+
+def test_valid_incoming_traceparent_is_continued(client, make_user, exporter, omnidim_requests):
+    _, headers = make_user()
+    response = start_tutor_session(
+        client, headers, traceparent=f"00-{REMOTE_TRACE_ID}-{REMOTE_PARENT_ID}-01"
+    )
+
+    [server] = [s for s in exporter.spans if s.kind == SERVER]
+    assert (server.trace_id, server.parent_id) == (REMOTE_TRACE_ID, REMOTE_PARENT_ID)
+    assert response.headers["x-trace-id"] == REMOTE_TRACE_ID
+    assert omnidim_requests[0].headers["x-trace-id"] == REMOTE_TRACE_ID
+
+@pytest.mark.parametrize("traceparent", [
+    "garbage",
+    f"00-{REMOTE_TRACE_ID}-{REMOTE_PARENT_ID}",
+    f"00-{REMOTE_TRACE_ID[:-1]}-{REMOTE_PARENT_ID}-01",
+    f"00-{'z' * 32}-{REMOTE_PARENT_ID}-01",
+])
+def test_malformed_incoming_traceparent_starts_a_new_trace(client, make_user, exporter, omnidim_requests, traceparent):
+    _, headers = make_user()
+    response = start_tutor_session(client, headers, traceparent=traceparent)
+
+    [server] = [s for s in exporter.spans if s.kind == SERVER]
+    assert server.parent_id is None
+    assert server.trace_id != REMOTE_TRACE_ID
+    assert response.headers["x-trace-id"] == server.trace_id
+
+def test_file_exporter_writes_otlp_spans(tmp_path):
+    path = tmp_path / "spans.ndjson"
+    with tracing.start_span("outer") as outer:
+        with tracing.start_span("inner", CLIENT, {"attempt": 2}) as inner:
+            pass
+    tracing.FileSpanExporter(str(path)).export([inner, outer])
+
+    lines = path.read_text().splitlines()
+    assert len(lines) == 2
+    first = json.loads(lines[0])
+    assert first["parentSpanId"] == outer.span_id
+    assert first["attributes"] == [{"key": "attempt", "value": {"intValue": "2"}}]
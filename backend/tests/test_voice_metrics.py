@@ -0,0 +1,61 @@
+from datetime import datetime
+
+from app.database import SessionLocal
+from app.models.learning_session import LearningSession, SessionType
+from app.models.voice_interaction import InteractionType, VoiceInteraction
+from app.services.analytics.interaction_archive import InteractionArchive
+from app.services.analytics.voice_metrics import VoiceMetricsAnalyzer
+
+INTERACTIONS = [
+    # (timestamp, type, pronunciation, fluency, emotion, confidence, spoken seconds)
+    (datetime(2018, 5, 1, 9), InteractionType.USER_SPEECH, 0.6, 0.5, "confused", 0.8, 4.0),
+    (datetime(2018, 5, 1, 10), InteractionType.AI_RESPONSE, None, None, None, None, 9.0),
+    (datetime(2018, 5, 2, 9), InteractionType.USER_SPEECH, 0.9, 0.7, "happy", 0.6, 6.0),
+    (datetime(2018, 5, 2, 10), InteractionType.USER_SPEECH, 0.9, None, "frustrated", 0.4, None),
+]
+
+def test_metrics_aggregate_in_sql_and_survive_archiving(make_user, tmp_path):
+    user, _ = make_user()
+    archive = InteractionArchive(str(tmp_path))
+    analyzer = VoiceMetricsAnalyzer(archive=archive)
+    db = SessionLocal()
+    try:
+        session = LearningSession(user_id=user.id, omnidim_session_id=f"metrics-{user.id}", type=SessionType.TUTOR)
+        db.add(session)
+        db.flush()
+        session_id = session.id
+        for timestamp, kind, pronunciation, fluency, emotion, confidence, seconds in INTERACTIONS:
+            db.add(VoiceInteraction(
+                session_id=session_id, user_id=user.id, type=kind, timestamp=timestamp,
+                pronunciation_score=pronunciation, fluency_score=fluency,
+                emotion=emotion, emotion_confidence=confidence,
+                interaction_metadata={"duration_seconds": seconds} if seconds else {}
+            ))
+        db.commit()
+
+        days = (datetime.utcnow() - datetime(2018, 4, 30)).days
+        metrics = analyzer.calculate_speaking_metrics(user.id, session_id, db)
+        trends = analyzer.get_voice_trends(user.id, days, db)
+
+        # Nulls are left out of averages; only user speech counts as speaking time
+        assert metrics == {
+            "total_interactions": 4,
+            "speaking_time_seconds": 10.0,
+            "average_pronunciation_score": 0.8,
+            "average_fluency_score": 0.6,
+            "emotion_distribution": {"confused": 1, "happy": 1, "frustrated": 1},
+            "improvement_areas": ["fluency", "confidence"],
+        }
+        assert trends == [
+            {"date": "2018-05-01", "pronunciation_score": 0.6, "fluency_score": 0.5,
+             "confidence_score": 0.8, "sessions": 1},
+            {"date": "2018-05-02", "pronunciation_score": 0.9, "fluency_score": 0.7,
+             "confidence_score": 0.5, "sessions": 1},
+        ]
+
+        assert archive.archive_older_than(db, datetime(2018, 5, 2)) == 2
+        assert analyzer.calculate_speaking_metrics(user.id, session_id, db, include_archived=True) == metrics
+        assert analyzer.get_voice_trends(user.id, days, db, include_archived=True) == trends
+        assert analyzer.calculate_speaking_metrics(user.id, session_id, db)["total_interactions"] == 2
+    finally:
+        db.close()
@@ -0,0 +1,56 @@
+import threading
+from datetime import datetime, timedelta
+
+from app.database import SessionLocal
+from app.models.learning_session import LearningSession, SessionStatus, SessionType
+from app.models.progress import Progress
+from app.services.learning.progress_tracker import ProgressTracker
+from app.services.omnidim.voice_session import VoiceSessionManager
+
+def test_racing_session_ends_credit_progress_once(make_user):
+    user, _ = make_user()
+    db = SessionLocal()
+    try:
+        session = LearningSession(
+            user_id=user.id,
+            omnidim_session_id=f"race-{user.id}",
+            type=SessionType.TUTOR,
+            started_at=datetime.utcnow() - timedelta(minutes=10)
+        )
+        db.add(session)
+        db.commit()
+        session_id = session.id
+    finally:
+        db.close()
+
+    # A client disconnect and an explicit end arriving together
+    barrier = threading.Barrier(2)
+    claimed = []
+
+    def end():
+        db = SessionLocal()
+        try:
+            barrier.wait()
+            session = VoiceSessionManager.claim_end(db, LearningSession.id == session_id)
+            if session:
+                ProgressTracker().record_session(db, session)
+            db.commit()
+            claimed.append(session is not None)
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=end) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(claimed) == [False, True]
+    db = SessionLocal()
+    try:
+        session = db.get(LearningSession, session_id)
+        assert session.status == SessionStatus.COMPLETED
+        assert 590 <= session.duration_seconds <= 610
+        assert db.query(Progress.total_sessions).filter(Progress.user_id == user.id).scalar() == 1
+    finally:
+        db.close()
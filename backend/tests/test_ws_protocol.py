@@ -0,0 +1,145 @@
+import asyncio
+import time
+
+import msgpack
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.api.websocket.admission import admission
+from app.api.websocket.protocol import SUBPROTOCOL_MSGPACK
+from app.api.websocket.resumable import ResumableStream
+from app.database import SessionLocal
+from app.main import app
+from app.models.learning_session import LearningSession, SessionStatus, SessionType
+from app.services.container import services
+
+AUDIO = b"\x00\x01" * 320
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Replace the Omnidim voice stream with a scripted burst of events"""
+    handler = services.voice_stream_handler
+
+    async def connect_voice_stream(session_id, on_message_callback=None):
+        await on_message_callback({"type": "audio", "data": AUDIO})
+        for valence in (0.1, 0.2, 0.3):
+            await on_message_callback({"type": "emotion", "emotion": "calm", "valence": valence})
+        await on_message_callback({"type": "status", "message": "listening"})
+        # Let the coalesced emotion update flush
+        await asyncio.sleep(0.3)
+
+    monkeypatch.setattr(handler.omnidim_client, "connect_voice_stream", connect_voice_stream)
+
+def test_msgpack_clients_get_binary_frames_with_coalesced_updates(client, make_user, upstream):
+    _, headers = make_user()
+    token = headers["Authorization"].split()[1]
+
+    with client.websocket_connect(
+        f"/api/ws/voice/session-1?token={token}", subprotocols=["zenith.msgpack.v1", "zenith.json.v1"]
+    ) as ws:
+        assert ws.accepted_subprotocol == SUBPROTOCOL_MSGPACK
+        frames = [msgpack.unpackb(ws.receive_bytes()) for _ in range(4)]
+
+    assert frames[0]["type"] == "session" and frames[0]["resume_token"]
+    assert frames[1] == {"type": "audio", "data": AUDIO, "seq": 1}
+    assert frames[2] == {"type": "status", "message": "listening", "seq": 2}
+    # Three emotion updates went out once, as the latest value
+    assert frames[3] == {"type": "batch", "events": [{"type": "emotion", "emotion": "calm", "valence": 0.3}]}
+
+def test_clients_without_a_subprotocol_keep_the_json_stream(client, make_user, upstream):
+    _, headers = make_user()
+    token = headers["Authorization"].split()[1]
+
+    with client.websocket_connect(f"/api/ws/voice/session-2?token={token}") as ws:
+        assert ws.accepted_subprotocol is None
+        assert ws.receive_bytes() == AUDIO
+        # Interactive events go ahead of queued telemetry
+        assert ws.receive_json() == {"type": "status", "message": "listening"}
+        emotions = [ws.receive_json()["valence"] for _ in range(3)]
+        assert emotions == [0.1, 0.2, 0.3]
+
+def test_dropped_connections_resume_with_the_missed_events(make_user, monkeypatch):
+    user, headers = make_user()
+    token = headers["Authorization"].split()[1]
+    db = SessionLocal()
+    try:
+        session = LearningSession(user_id=user.id, omnidim_session_id="resume-1", type=list(SessionType)[0])
+        db.add(session)
+        db.commit()
+        session_id = session.id
+    finally:
+        db.close()
+
+    def status(session_id):
+        db = SessionLocal()
+        try:
+            return db.get(LearningSession, session_id).status
+        finally:
+            db.close()
+
+    async def connect_voice_stream(session_id, on_message_callback=None):
+        await on_message_callback({"type": "status", "message": "listening"})
+        # The client is away for these two
+        await asyncio.sleep(0.2)
+        await on_message_callback({"type": "audio", "data": AUDIO})
+        await on_message_callback({"type": "status", "message": "still listening"})
+        await asyncio.sleep(60)
+
+    url = f"/api/ws/voice/{session_id}?token={token}"
+    protocols = ["zenith.msgpack.v1"]
+    # One event loop for both connections, as in a server worker
+    with TestClient(app) as client:
+        monkeypatch.setattr(services.voice_stream_handler.omnidim_client, "connect_voice_stream", connect_voice_stream)
+        with client.websocket_connect(url, subprotocols=protocols) as ws:
+            resume_token = msgpack.unpackb(ws.receive_bytes())["resume_token"]
+            assert msgpack.unpackb(ws.receive_bytes())["seq"] == 1
+        time.sleep(0.4)
+        assert status(session_id) == SessionStatus.ACTIVE
+
+        with client.websocket_connect(url + "&resume_token=nope", subprotocols=protocols) as ws:
+            with pytest.raises(WebSocketDisconnect) as refused:
+                ws.receive_bytes()
+        assert refused.value.code == 4410
+
+        with client.websocket_connect(
+            f"{url}&resume_token={resume_token}&last_seq=1", subprotocols=protocols
+        ) as ws:
+            frames = [msgpack.unpackb(ws.receive_bytes()) for _ in range(3)]
+
+        assert frames == [
+            {"type": "session", "resume_token": resume_token, "resumed": True, "missed": 0},
+            {"type": "audio", "data": AUDIO, "seq": 2},
+            {"type": "status", "message": "still listening", "seq": 3},
+        ]
+        assert status(session_id) == SessionStatus.ACTIVE
+
+    # Shutdown ends the stream nobody came back for
+    assert status(session_id) == SessionStatus.COMPLETED
+
+def test_rejected_streams_are_told_when_to_retry(client, make_user, monkeypatch):
+    _, headers = make_user()
+    token = headers["Authorization"].split()[1]
+    monkeypatch.setattr(admission, "max_per_user", 0)
+
+    with client.websocket_connect(f"/api/ws/voice/session-3?token={token}") as ws:
+        assert ws.receive_json() == {"type": "rejected", "reason": "user_limit", "retry_after": 10}
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+    assert closed.value.code == 1013
+
+def test_failed_attach_gives_back_the_stream_slot(client, make_user, monkeypatch):
+    _, headers = make_user()
+    token = headers["Authorization"].split()[1]
+    admitted = admission.admitted
+
+    async def attach(self, websocket, outbound, last_seq=None):
+        raise RuntimeError("client went away")
+
+    monkeypatch.setattr(ResumableStream, "_attach", attach)
+
+    with client.websocket_connect(f"/api/ws/voice/session-4?token={token}"):
+        pass
+
+    assert admission.admitted == admitted
+    assert "session-4" not in services.voice_stream_handler.streams